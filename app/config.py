@@ -1,6 +1,137 @@
 import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-FILE_PATH = os.path.join(BASE_DIR, "../data/Miloto.csv")
+FILE_PATH = os.getenv(
+    "MILOTO_CSV", os.path.join(BASE_DIR, "../data/Miloto.csv")
+)
+# Guardar y abrir la instantánea binaria del CSV (<nombre>.snapshot/)
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "1") != "0"
 
 COLUMNAS_EXCLUIR = {"Draw Date", "Is Winner"}
+
+# Rango de números del juego (las máscaras por sorteo admiten hasta 63)
+NUMERO_MINIMO = 1
+NUMERO_MAXIMO = 39
+BALOTAS = 5
+
+# Juegos disponibles: el de arriba se llama "miloto"; GAMES_FILE apunta a
+# un JSON {"<juego>": {"archivo": ..., "numero_minimo": ...,
+# "numero_maximo": ..., "balotas": ..., "columnas_excluir": [...]}} con
+# los demás (rutas relativas al JSON)
+JUEGOS_ARCHIVO = os.getenv("GAMES_FILE", "")
+JUEGO_POR_DEFECTO = os.getenv("DEFAULT_GAME", "miloto")
+# Memoria de los juegos cargados; al pasarse se descarga el menos usado
+MEMORIA_JUEGOS_MB = float(os.getenv("DATASET_MEMORY_BUDGET_MB", "512"))
+
+# Registro: archivo rotado por tamaño (vacío = stderr) y cola en memoria
+# hacia el hilo que escribe; con la cola llena los registros se descartan
+LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Los mensajes más largos se recortan a este número de caracteres
+LOG_MAX_MESSAGE = int(os.getenv("LOG_MAX_MESSAGE", "2000"))
+
+# Ejecución del trabajo bloqueante fuera del event loop
+THREAD_POOL_WORKERS = int(os.getenv("THREAD_POOL_WORKERS", "8"))
+PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", "2"))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "1"))
+
+# (en ejecución, en espera) por endpoint; se cambian con variables de
+# entorno LIMIT_<ENDPOINT>="concurrentes,en_cola" (p. ej. LIMIT_BAR_CHART)
+LIMITES_CONCURRENCIA = {
+    "default": (8, 32),
+    "frequent-combinations": (4, 8),
+    "bar-chart": (2, 4),
+    "randomness": (1, 2),
+    "odoo": (2, 4),
+    "amazon": (4, 16),
+    "amazon-batch": (4, 2000),
+}
+
+# Hilos para la E/S bloqueante (Odoo, Amazon), aparte de los de análisis;
+# 0 los ajusta a la suma de los límites de ejecución de esos endpoints
+IO_THREAD_POOL_WORKERS = int(os.getenv("IO_THREAD_POOL_WORKERS", "0"))
+
+# Navegadores de Selenium reutilizables; SELENIUM_POOL_SIZE=0 ajusta el
+# tamaño a la memoria disponible (SELENIUM_BROWSER_MB por navegador)
+SELENIUM_POOL_SIZE = int(os.getenv("SELENIUM_POOL_SIZE", "0"))
+SELENIUM_BROWSER_MB = int(os.getenv("SELENIUM_BROWSER_MB", "350"))
+SELENIUM_POOL_WARM = int(os.getenv("SELENIUM_POOL_WARM", "1"))
+SELENIUM_MAX_USES = int(os.getenv("SELENIUM_MAX_USES", "50"))
+SELENIUM_ACQUIRE_TIMEOUT = float(os.getenv("SELENIUM_ACQUIRE_TIMEOUT", "30"))
+
+# Caché de productos de Amazon por ASIN: segundos frescos, segundos en
+# que se sirve vencido mientras se actualiza y máximo de productos
+AMAZON_CACHE_TTL = float(os.getenv("AMAZON_CACHE_TTL", "3600"))
+AMAZON_CACHE_STALE = float(os.getenv("AMAZON_CACHE_STALE", "86400"))
+AMAZON_CACHE_SIZE = int(os.getenv("AMAZON_CACHE_SIZE", "10000"))
+# Páginas de producto de Amazon. Primero se piden por HTTP y solo se abre
+# el navegador si la página es un reto anti-bots o le faltan los campos
+# obligatorios; AMAZON_HTTP_FIRST=0 usa siempre el navegador
+AMAZON_BASE_URL = os.getenv("AMAZON_BASE_URL", "https://www.amazon.com/dp/")
+AMAZON_HTTP_FIRST = os.getenv("AMAZON_HTTP_FIRST", "1") != "0"
+AMAZON_HTTP_TIMEOUT = float(os.getenv("AMAZON_HTTP_TIMEOUT", "10"))
+AMAZON_HTTP_POOL_SIZE = int(os.getenv("AMAZON_HTTP_POOL_SIZE", "10"))
+AMAZON_REQUIRED_FIELDS = [
+    campo.strip()
+    for campo in os.getenv("AMAZON_REQUIRED_FIELDS", "title,price").split(",")
+    if campo.strip()
+]
+# ASINs por lote; cuántos se consultan a la vez lo fija el carril
+# "amazon-batch" de LIMITES_CONCURRENCIA
+AMAZON_BATCH_MAX = int(os.getenv("AMAZON_BATCH_MAX", "500"))
+
+# Boletos por consulta en los endpoints que reciben lotes de boletos
+TICKETS_BATCH_MAX = int(os.getenv("TICKETS_BATCH_MAX", "10000"))
+
+# Pruebas de aleatoriedad: históricos simulados por defecto, semilla de
+# la SeedSequence y simulaciones por tarea del pool de procesos
+MONTE_CARLO_SIMULACIONES = int(os.getenv("MONTE_CARLO_SIMULATIONS", "1000"))
+MONTE_CARLO_SEMILLA = int(os.getenv("MONTE_CARLO_SEED", "0"))
+SIMULACIONES_POR_TAREA = int(os.getenv("MONTE_CARLO_TASK_SIZE", "100"))
+
+# Respuestas JSON ya serializadas (por endpoint, versión y ventana)
+JSON_CACHE_SIZE = int(os.getenv("JSON_CACHE_SIZE", "64"))
+
+# Gráficos ya renderizados que se guardan en memoria
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "256"))
+
+# Conexión con Odoo
+ODOO_URL = os.getenv("ODOO_URL")
+DB_NAME = os.getenv("DB_NAME")
+ODOO_USER = os.getenv("ODOO_USER")
+ODOO_PASSWORD = os.getenv("ODOO_PASSWORD")
+# Conexiones keep-alive abiertas a la vez hacia Odoo
+ODOO_POOL_SIZE = int(os.getenv("ODOO_POOL_SIZE", "4"))
+ODOO_TIMEOUT = float(os.getenv("ODOO_TIMEOUT", "30"))
+# Segundos que se reutilizan los campos del modelo y los ids de catálogo
+ODOO_METADATA_TTL = float(os.getenv("ODOO_METADATA_TTL", "3600"))
+
+# Sincronización de lottery.baloto hacia el almacén local
+ODOO_STORE_PATH = os.getenv(
+    "ODOO_STORE_PATH", os.path.join(BASE_DIR, "../data/odoo_sync.sqlite")
+)
+ODOO_LOTTERY_TYPE = os.getenv("ODOO_LOTTERY_TYPE", "MiLoto")
+ODOO_PAGE_SIZE = int(os.getenv("ODOO_PAGE_SIZE", "500"))
+ODOO_SYNC_INTERVAL = float(os.getenv("ODOO_SYNC_INTERVAL", "60"))
+# Campos a sincronizar separados por comas; vacío = todos los campos
+# simples del modelo (sin binarios ni relaciones x2many)
+ODOO_FIELDS = [
+    campo.strip()
+    for campo in os.getenv("ODOO_FIELDS", "").split(",")
+    if campo.strip()
+]
+# Campos de fecha y números de cada sorteo; si se configuran, los sorteos
+# nuevos de Odoo se agregan también a los datos del análisis
+ODOO_DRAW_DATE_FIELD = os.getenv("ODOO_DRAW_DATE_FIELD", "")
+ODOO_NUMBER_FIELDS = [
+    campo.strip()
+    for campo in os.getenv("ODOO_NUMBER_FIELDS", "").split(",")
+    if campo.strip()
+]
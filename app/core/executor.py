@@ -0,0 +1,340 @@
+"""
+Execution layer for blocking work.
+
+Handlers run pandas/NumPy work in a thread pool and CPU-heavy work
+(combination counting, chart rendering) in a process pool, so the event
+loop stays free. Calls that mostly wait on the network (Odoo, Amazon)
+get a thread pool of their own, so slow upstreams cannot take the
+threads the analysis endpoints need. Every endpoint gets a lane with a
+concurrency limit and a bounded wait queue; when both are full the
+request is rejected with a 503 and a ``Retry-After`` header instead of
+piling up.
+"""
+
+import asyncio
+import contextvars
+import multiprocessing
+import os
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import (
+    Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+)
+
+from fastapi import HTTPException
+
+from app.config import (
+    IO_THREAD_POOL_WORKERS,
+    LIMITES_CONCURRENCIA,
+    PROCESS_POOL_WORKERS,
+    RETRY_AFTER_SECONDS,
+    THREAD_POOL_WORKERS,
+)
+from app.core import metrics
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_io_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_lanes: Dict[str, "Lane"] = {}
+
+# Lanes whose work runs in the I/O thread pool
+IO_LANES = ("odoo", "amazon", "amazon-batch")
+
+
+def _lane_limits(name: str) -> Tuple[int, int]:
+    """
+    Read the (concurrent, queued) limits of a lane.
+
+    Args:
+        name: Lane name, usually the endpoint path
+
+    Returns:
+        tuple: Maximum running and waiting requests
+    """
+    override = os.getenv(f"LIMIT_{name.upper().replace('-', '_')}")
+    if override:
+        concurrent, queued = (int(value) for value in override.split(","))
+        return concurrent, queued
+    return LIMITES_CONCURRENCIA.get(name, LIMITES_CONCURRENCIA["default"])
+
+
+class Lane:
+    """
+    Concurrency limit with a bounded wait queue for one endpoint.
+
+    Attributes:
+        name: Lane name
+        max_concurrent: Requests allowed to run at the same time
+        max_queued: Requests allowed to wait for a free slot
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queued: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.pending = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def running(self) -> int:
+        """Requests currently holding a slot."""
+        if self._semaphore is None:
+            return 0
+        return self.max_concurrent - self._semaphore._value
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop that first uses them
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._loop = loop
+        return self._semaphore
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold one of the lane's slots for the ``async with`` block.
+
+        The wait for the slot is timed as the request's ``queue`` stage.
+
+        Raises:
+            HTTPException: 503 if the lane and its queue are full
+        """
+        if self.pending >= self.max_concurrent + self.max_queued:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server busy ({self.name}), retry later",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
+
+        self.pending += 1
+        try:
+            semaphore = self._get_semaphore()
+            with metrics.stage("queue"):
+                await semaphore.acquire()
+            try:
+                yield
+            finally:
+                semaphore.release()
+        finally:
+            self.pending -= 1
+
+    async def run(
+        self,
+        executor,
+        func: Callable,
+        *args: Any,
+        stage: Optional[str] = None
+    ) -> Any:
+        """
+        Run ``func(*args)`` in ``executor`` once a slot is free.
+
+        If ``stage`` is given, the work is timed as that stage.
+
+        Raises:
+            HTTPException: 503 if the lane and its queue are full
+        """
+        async with self.slot():
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(executor, partial(func, *args))
+            if stage is None:
+                return await future
+            with metrics.stage(stage):
+                return await future
+
+
+def get_lane(name: str) -> Lane:
+    """Return the lane for ``name``, creating it on first use."""
+    lane = _lanes.get(name)
+    if lane is None:
+        lane = _lanes[name] = Lane(name, *_lane_limits(name))
+    return lane
+
+
+def _lane_samples() -> List[metrics.Sample]:
+    samples = []
+    for lane in list(_lanes.values()):
+        labels = {"lane": lane.name}
+        running = lane.running
+        samples += [
+            ("executor_lane_running", "Requests holding a lane slot",
+             labels, running),
+            ("executor_lane_queued", "Requests waiting for a lane slot",
+             labels, max(lane.pending - running, 0)),
+            ("executor_lane_utilization", "Share of the lane slots in use",
+             labels, running / lane.max_concurrent),
+        ]
+    return samples
+
+
+metrics.register_collector(_lane_samples)
+
+
+def _get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(
+            max_workers=THREAD_POOL_WORKERS, thread_name_prefix="analysis"
+        )
+    return _thread_pool
+
+
+def _get_io_thread_pool() -> ThreadPoolExecutor:
+    global _io_thread_pool
+    if _io_thread_pool is None:
+        workers = IO_THREAD_POOL_WORKERS or sum(
+            _lane_limits(name)[0] for name in IO_LANES
+        )
+        _io_thread_pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="io"
+        )
+    return _io_thread_pool
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # spawn: forking a process that already runs threads is unsafe
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PROCESS_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+async def run_in_thread(
+    lane: str, func: Callable, *args: Any, stage: Optional[str] = None
+) -> Any:
+    """
+    Run light blocking work in the shared thread pool.
+
+    ``func`` runs in a copy of the caller's context, so the stages it
+    times are added to the current request.
+
+    Args:
+        lane: Name of the endpoint lane that limits concurrency
+        func: Blocking callable
+        *args: Positional arguments for ``func``
+        stage: Request stage to time the whole call as, if any
+
+    Returns:
+        Any: The value returned by ``func``
+    """
+    context = contextvars.copy_context()
+    return await get_lane(lane).run(
+        _get_thread_pool(), context.run, func, *args, stage=stage
+    )
+
+
+async def run_in_io_thread(
+    lane: str, func: Callable, *args: Any, stage: Optional[str] = None
+) -> Any:
+    """
+    Run blocking network I/O in the I/O thread pool.
+
+    Same as :func:`run_in_thread`, but the threads are not shared with
+    the analysis endpoints. By default the pool has one thread per slot
+    of the :data:`IO_LANES`, so those lanes never wait for a thread.
+
+    Args:
+        lane: Name of the endpoint lane that limits concurrency
+        func: Blocking callable
+        *args: Positional arguments for ``func``
+        stage: Request stage to time the whole call as, if any
+
+    Returns:
+        Any: The value returned by ``func``
+    """
+    context = contextvars.copy_context()
+    return await get_lane(lane).run(
+        _get_io_thread_pool(), context.run, func, *args, stage=stage
+    )
+
+
+async def run_in_process(lane: str, func: Callable, *args: Any) -> Any:
+    """
+    Run CPU-heavy work in the process pool.
+
+    ``func`` and its arguments must be picklable (module-level functions
+    and NumPy arrays). The work is timed as the request's ``compute``
+    stage.
+
+    Args:
+        lane: Name of the endpoint lane that limits concurrency
+        func: Module-level callable
+        *args: Positional arguments for ``func``
+
+    Returns:
+        Any: The value returned by ``func``
+    """
+    pool = _get_process_pool()
+    try:
+        return await get_lane(lane).run(pool, func, *args, stage="compute")
+    except BrokenProcessPool:
+        _discard_process_pool(pool)
+        raise
+
+
+async def run_in_process_map(
+    lane: str, func: Callable, calls: Sequence[Tuple]
+) -> List[Any]:
+    """
+    Run several calls of ``func`` in the process pool at once.
+
+    The calls share a single slot of the lane, so one request split into
+    many tasks counts once against the lane limits. At most
+    ``PROCESS_POOL_WORKERS`` of them are submitted at a time, so work
+    from other lanes waits for one task, not for the whole batch. The
+    whole batch is timed as the ``compute`` stage.
+
+    Args:
+        lane: Name of the endpoint lane that limits concurrency
+        func: Module-level callable
+        calls: Positional arguments of each call
+
+    Returns:
+        list: The value of each call, in the order of ``calls``
+    """
+    pool = _get_process_pool()
+    try:
+        async with get_lane(lane).slot():
+            loop = asyncio.get_running_loop()
+            submitted = asyncio.Semaphore(PROCESS_POOL_WORKERS)
+
+            async def submit(args: Tuple) -> Any:
+                async with submitted:
+                    return await loop.run_in_executor(
+                        pool, partial(func, *args)
+                    )
+
+            with metrics.stage("compute"):
+                return await asyncio.gather(
+                    *(submit(args) for args in calls)
+                )
+    except BrokenProcessPool:
+        _discard_process_pool(pool)
+        raise
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """A worker died; the next request gets a fresh pool."""
+    global _process_pool
+    if _process_pool is pool:
+        _process_pool = None
+
+
+def shutdown() -> None:
+    """Stop the pools; called when the application shuts down."""
+    global _thread_pool, _io_thread_pool, _process_pool
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+        _thread_pool = None
+    if _io_thread_pool is not None:
+        _io_thread_pool.shutdown(wait=False, cancel_futures=True)
+        _io_thread_pool = None
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
@@ -0,0 +1,309 @@
+"""
+Request instrumentation and Prometheus metrics.
+
+:class:`TimingMiddleware` times every request and keeps a per-request
+table of stage timings. Code on the request path wraps its parts in
+:func:`stage` (waiting for a lane, loading data, computing, serializing,
+calling Odoo or a browser). The table is sent back in a ``Server-Timing``
+header and, with the request latency, feeds the histograms that
+:func:`render` serves as Prometheus text at ``/metrics``, next to the
+in-flight requests, cache hit ratios and pool gauges of the registered
+collectors.
+
+Recording is a dictionary update per stage and a short lock per
+histogram observation, cheap enough to leave on in production.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+)
+
+from fastapi.responses import JSONResponse
+
+# Upper bounds in seconds, as in the Prometheus client libraries
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0,
+    7.5, 10.0,
+)
+
+# (metric, help, labels, value) produced by a collector
+Sample = Tuple[str, str, Dict[str, str], float]
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "request_timings", default=None
+)
+_caches: Dict[str, Any] = {}
+_collectors: List[Callable[[], Iterable[Sample]]] = []
+_in_flight = 0
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Add the time spent in the ``with`` block to the current request's
+    ``name`` stage. Outside a request it does nothing.
+
+    Args:
+        name: Stage name, a token such as ``load`` or ``odoo``
+    """
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (
+            time.perf_counter() - start
+        )
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    )
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{key}="{_escape(str(value))}"' for key, value in labels.items()
+    )
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """
+    Thread-safe Prometheus histogram with fixed buckets.
+
+    Args:
+        name: Metric name
+        help: Description shown in ``# HELP``
+        labelnames: Names of the labels every observation carries
+        buckets: Increasing upper bounds, without ``+Inf``
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...],
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        """
+        Record one observation.
+
+        Args:
+            labels: Label values, in ``labelnames`` order
+            value: Observed value in seconds
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [
+                    [0] * (len(self.buckets) + 1), 0.0
+                ]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        """Prometheus text lines of every series."""
+        with self._lock:
+            series = {
+                labels: (list(counts), total)
+                for labels, (counts, total) in self._series.items()
+            }
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} histogram",
+        ]
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for values, (counts, total) in sorted(series.items()):
+            labels = dict(zip(self.labelnames, values))
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                bucket = _format_labels({**labels, "le": bound})
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            suffix = _format_labels(labels)
+            lines.append(f"{self.name}_sum{suffix} {total!r}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the end of the response",
+    ("method", "route", "status"),
+)
+stage_seconds = Histogram(
+    "http_request_stage_seconds",
+    "Time spent in each stage of a request",
+    ("route", "stage"),
+)
+
+
+def register_cache(name: str, cache: Any) -> None:
+    """
+    Report the hits, misses and size of a cache.
+
+    Args:
+        name: Value of the ``cache`` label
+        cache: Object with ``hits`` and ``misses`` counters and a length
+    """
+    _caches[name] = cache
+
+
+def register_collector(collect: Callable[[], Iterable[Sample]]) -> None:
+    """
+    Add gauges read when ``/metrics`` is scraped.
+
+    Args:
+        collect: Returns ``(metric, help, labels, value)`` samples
+    """
+    _collectors.append(collect)
+
+
+def _cache_samples() -> List[Sample]:
+    samples = []
+    for name, cache in list(_caches.items()):
+        hits, misses = cache.hits, cache.misses
+        lookups = hits + misses
+        labels = {"cache": name}
+        samples += [
+            ("cache_hits_total", "Cache lookups that found a value",
+             labels, hits),
+            ("cache_misses_total", "Cache lookups that found nothing",
+             labels, misses),
+            ("cache_hit_ratio", "Hits over lookups since start",
+             labels, hits / lookups if lookups else 0.0),
+            ("cache_entries", "Entries currently cached",
+             labels, len(cache)),
+        ]
+    return samples
+
+
+def render() -> str:
+    """
+    All metrics in the Prometheus text exposition format.
+
+    Returns:
+        str: Text body for ``/metrics``
+    """
+    lines = request_seconds.render() + stage_seconds.render()
+    lines += [
+        "# HELP http_requests_in_flight Requests being served",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {_in_flight}",
+    ]
+
+    families: Dict[str, Tuple[str, List[str]]] = {}
+    collectors = [_cache_samples] + _collectors
+    for collect in collectors:
+        for name, help, labels, value in collect():
+            _, samples = families.setdefault(name, (help, []))
+            samples.append(
+                f"{name}{_format_labels(labels)} {_format_value(value)}"
+            )
+    for name, (help, samples) in families.items():
+        kind = "counter" if name.endswith("_total") else "gauge"
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        lines += samples
+    return "\n".join(lines) + "\n"
+
+
+def server_timing(timings: Dict[str, float], total: float) -> str:
+    """
+    ``Server-Timing`` header value for the stage timings of a request.
+
+    Args:
+        timings: Seconds per stage
+        total: Seconds since the request started
+
+    Returns:
+        str: Header value, durations in milliseconds
+    """
+    parts = [
+        f"{name};dur={seconds * 1000:.2f}"
+        for name, seconds in list(timings.items())
+    ]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSON response whose encoding is timed as the ``serialize`` stage."""
+
+    def render(self, content: Any) -> bytes:
+        with stage("serialize"):
+            return super().render(content)
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware that times requests and their stages.
+
+    The route label is the matched path template (``/api/frequency``,
+    ``/amazon/product2/{asin}``) so the number of series stays bounded;
+    requests that match no route are labeled ``unmatched``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        global _in_flight
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                value = server_timing(timings, time.perf_counter() - start)
+                message = dict(message)
+                message["headers"] = list(message.get("headers", ())) + [
+                    (b"server-timing", value.encode("latin-1"))
+                ]
+            await send(message)
+
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _in_flight -= 1
+            _timings.reset(token)
+            elapsed = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", "unmatched")
+            request_seconds.observe(
+                (scope["method"], route, str(status)), elapsed
+            )
+            # Stages recorded by threads still running are not waited for
+            for name, seconds in list(timings.items()):
+                stage_seconds.observe((route, name), seconds)
@@ -0,0 +1,410 @@
+"""
+Odoo XML-RPC client.
+
+One client is shared by the whole process: the user id is authenticated
+once and reused until Odoo rejects it, calls go through a bounded pool of
+keep-alive transports instead of a new TCP/TLS connection per call, and
+model metadata (field lists, catalogue ids) is cached for
+``ODOO_METADATA_TTL`` seconds. Every round trip is counted and timed.
+"""
+
+import queue
+import threading
+import time
+import xmlrpc.client
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from fastapi import HTTPException
+
+from app.config import (
+    DB_NAME,
+    ODOO_METADATA_TTL,
+    ODOO_PASSWORD,
+    ODOO_POOL_SIZE,
+    ODOO_TIMEOUT,
+    ODOO_URL,
+    ODOO_USER,
+)
+from app.core import metrics
+from app.utils.cache import TTLCache
+
+_client: Optional["OdooClient"] = None
+_client_lock = threading.Lock()
+
+
+class _TimeoutMixin:
+    """Apply a socket timeout to the connections a transport opens."""
+
+    timeout: float
+
+    def make_connection(self, host):
+        connection = super().make_connection(host)
+        connection.timeout = self.timeout
+        return connection
+
+
+class _Transport(_TimeoutMixin, xmlrpc.client.Transport):
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+
+class _SafeTransport(_TimeoutMixin, xmlrpc.client.SafeTransport):
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+
+class TransportPool:
+    """
+    Bounded pool of keep-alive XML-RPC transports.
+
+    A transport holds one persistent HTTP connection and is not safe to
+    share between threads, so each call checks one out for its duration.
+
+    Args:
+        size: Maximum number of transports (open connections)
+        secure: Use HTTPS transports
+        timeout: Socket timeout in seconds, also the wait for a free slot
+    """
+
+    def __init__(self, size: int, secure: bool, timeout: float):
+        self.size = size
+        self.secure = secure
+        self.timeout = timeout
+        self.created = 0
+        self._idle: "queue.LifoQueue[xmlrpc.client.Transport]" = (
+            queue.LifoQueue()
+        )
+        self._lock = threading.Lock()
+
+    def _new(self) -> xmlrpc.client.Transport:
+        transport_class = _SafeTransport if self.secure else _Transport
+        return transport_class(self.timeout)
+
+    @contextmanager
+    def acquire(self) -> Iterator[xmlrpc.client.Transport]:
+        """
+        Check out a transport, creating one while below ``size``.
+
+        A transport whose call failed is closed before going back to the
+        pool, so the next call starts on a fresh connection.
+
+        Raises:
+            HTTPException: 503 if no transport frees up within ``timeout``
+        """
+        transport = None
+        with self._lock:
+            if self._idle.empty() and self.created < self.size:
+                self.created += 1
+                transport = self._new()
+        if transport is None:
+            try:
+                transport = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise HTTPException(
+                    status_code=503,
+                    detail="No Odoo connection available"
+                )
+        try:
+            yield transport
+        except xmlrpc.client.Fault:
+            raise
+        except BaseException:
+            transport.close()
+            raise
+        finally:
+            self._idle.put(transport)
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def stats(self) -> Dict[str, int]:
+        """Pool size, transports created and transports idle."""
+        return {
+            "size": self.size,
+            "created": self.created,
+            "idle": self._idle.qsize(),
+        }
+
+
+def _is_auth_error(fault: xmlrpc.client.Fault) -> bool:
+    """Whether Odoo rejected the call because of the credentials."""
+    text = f"{fault.faultCode} {fault.faultString}"
+    return "AccessDenied" in text or "Access Denied" in text
+
+
+class OdooClient:
+    """
+    Pooled XML-RPC client for the Odoo external API.
+
+    Args:
+        url: Base URL of the Odoo server
+        db: Database name
+        user: Login of the API user
+        password: Password or API key
+        pool_size: Maximum number of open connections
+        timeout: Socket timeout in seconds
+        metadata_ttl: Seconds field lists and ids are cached
+    """
+
+    def __init__(
+        self,
+        url: str = None,
+        db: str = None,
+        user: str = None,
+        password: str = None,
+        pool_size: int = None,
+        timeout: float = None,
+        metadata_ttl: float = None
+    ):
+        self.url = (url or ODOO_URL or "").rstrip("/")
+        self.db = db or DB_NAME
+        self.user = user or ODOO_USER
+        self.password = password or ODOO_PASSWORD
+        self.uid: Optional[int] = None
+        self.pool = TransportPool(
+            pool_size or ODOO_POOL_SIZE,
+            secure=self.url.startswith("https"),
+            timeout=timeout or ODOO_TIMEOUT,
+        )
+        self.metadata = TTLCache(metadata_ttl or ODOO_METADATA_TTL)
+        self._auth_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._calls: Dict[str, Dict[str, float]] = {}
+        self._reauthentications = 0
+
+    def _record(self, name: str, seconds: float, failed: bool) -> None:
+        with self._metrics_lock:
+            entry = self._calls.setdefault(name, {
+                "calls": 0, "errors": 0, "seconds_total": 0.0,
+                "seconds_max": 0.0,
+            })
+            entry["calls"] += 1
+            entry["errors"] += failed
+            entry["seconds_total"] += seconds
+            entry["seconds_max"] = max(entry["seconds_max"], seconds)
+
+    def _call(self, service: str, method: str, name: str, *args) -> Any:
+        """
+        Make one round trip to ``/xmlrpc/2/<service>``.
+
+        Args:
+            service: ``common`` or ``object``
+            method: Remote method
+            name: Metric name of the call
+            *args: Remote method arguments
+
+        Returns:
+            Any: The value returned by Odoo
+        """
+        start = time.perf_counter()
+        failed = True
+        try:
+            with metrics.stage("odoo"), self.pool.acquire() as transport:
+                proxy = xmlrpc.client.ServerProxy(
+                    f"{self.url}/xmlrpc/2/{service}",
+                    transport=transport,
+                    allow_none=True
+                )
+                result = getattr(proxy, method)(*args)
+            failed = False
+            return result
+        finally:
+            self._record(name, time.perf_counter() - start, failed)
+
+    def authenticate(self) -> int:
+        """
+        Authenticate and remember the user id.
+
+        Returns:
+            int: Odoo user id
+
+        Raises:
+            HTTPException: If Odoo rejects the credentials
+        """
+        uid = self._call(
+            "common", "authenticate", "authenticate",
+            self.db, self.user, self.password, {}
+        )
+        if not uid:
+            raise HTTPException(
+                status_code=401,
+                detail="Failed to authenticate with Odoo"
+            )
+        self.uid = uid
+        return uid
+
+    def _get_uid(self) -> int:
+        uid = self.uid
+        if uid is None:
+            with self._auth_lock:
+                uid = self.uid or self.authenticate()
+        return uid
+
+    def execute_kw(self, model: str, method: str, args: list,
+                   kwargs: dict = None):
+        """
+        Call ``method`` on ``model`` through ``execute_kw``.
+
+        The cached user id is used; if Odoo rejects it (e.g. the API key
+        was rotated) the client authenticates again and retries once.
+
+        Args:
+            model: Odoo model name, e.g. ``lottery.baloto``
+            method: Model method, e.g. ``search_read``
+            args: Positional arguments of the method
+            kwargs: Keyword arguments of the method
+
+        Returns:
+            Any: The value returned by Odoo
+        """
+        name = f"{model}.{method}"
+        uid = self._get_uid()
+        try:
+            return self._call(
+                "object", "execute_kw", name, self.db, uid, self.password,
+                model, method, args, kwargs or {}
+            )
+        except xmlrpc.client.Fault as fault:
+            if not _is_auth_error(fault):
+                raise
+        with self._auth_lock:
+            if self.uid == uid:
+                self.uid = None
+                self._reauthentications += 1
+        return self._call(
+            "object", "execute_kw", name, self.db, self._get_uid(),
+            self.password, model, method, args, kwargs or {}
+        )
+
+    def fields(self, model: str, exclude_types=()) -> List[str]:
+        """
+        Names of the fields of ``model``, cached for ``metadata_ttl``.
+
+        Args:
+            model: Odoo model name
+            exclude_types: Field types left out, e.g. ``binary``
+
+        Returns:
+            list: Sorted field names
+        """
+        key = ("fields", model, tuple(sorted(exclude_types)))
+        names = self.metadata.get(key)
+        if names is None:
+            definitions = self.execute_kw(
+                model, "fields_get", [], {"attributes": ["type"]}
+            )
+            names = sorted(
+                name for name, definition in definitions.items()
+                if definition.get("type") not in exclude_types
+            )
+            self.metadata.put(key, names)
+        return names
+
+    def lookup_id(self, model: str, name: str) -> Optional[int]:
+        """
+        Id of the ``model`` record called ``name``, cached for
+        ``metadata_ttl``.
+
+        Args:
+            model: Odoo model name, e.g. ``lottery.baloto.type``
+            name: Value of the record's ``name`` field
+
+        Returns:
+            int: Record id, or None if there is no such record
+        """
+        key = ("id", model, name)
+        record_id = self.metadata.get(key)
+        if record_id is None:
+            records = self.execute_kw(
+                model, "search_read", [[["name", "=", name]]],
+                {"fields": ["id"], "limit": 1}
+            )
+            if not records:
+                return None
+            record_id = records[0]["id"]
+            self.metadata.put(key, record_id)
+        return record_id
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Round trips and latency per remote call, plus pool and cache use.
+
+        Returns:
+            dict: Metrics snapshot
+        """
+        with self._metrics_lock:
+            calls = {name: dict(entry) for name, entry in self._calls.items()}
+        for entry in calls.values():
+            entry["seconds_avg"] = entry["seconds_total"] / entry["calls"]
+        return {
+            "round_trips": sum(entry["calls"] for entry in calls.values()),
+            "reauthentications": self._reauthentications,
+            "calls": calls,
+            "pool": self.pool.stats(),
+            "metadata_cache": {
+                "hits": self.metadata.hits,
+                "misses": self.metadata.misses,
+            },
+        }
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.pool.close()
+
+
+def get_odoo_client() -> OdooClient:
+    """
+    Return the process-wide Odoo client, creating it on first use.
+
+    Returns:
+        OdooClient: Shared client
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OdooClient()
+                metrics.register_cache("odoo_metadata", _client.metadata)
+    return _client
+
+
+def _odoo_samples() -> List[metrics.Sample]:
+    if _client is None:
+        return []
+    stats = _client.pool.stats()
+    samples = [
+        ("odoo_pool_size", "Maximum open Odoo connections", {},
+         stats["size"]),
+        ("odoo_pool_connections", "Odoo connections opened", {},
+         stats["created"]),
+        ("odoo_pool_idle", "Odoo connections waiting for a call", {},
+         stats["idle"]),
+    ]
+    for name, entry in _client.metrics()["calls"].items():
+        labels = {"call": name}
+        samples += [
+            ("odoo_calls_total", "Odoo round trips", labels,
+             entry["calls"]),
+            ("odoo_call_errors_total", "Odoo round trips that failed",
+             labels, entry["errors"]),
+            ("odoo_call_seconds_total", "Time spent in Odoo round trips",
+             labels, entry["seconds_total"]),
+        ]
+    return samples
+
+
+metrics.register_collector(_odoo_samples)
+
+
+def close_odoo_client() -> None:
+    """Close the shared client's connections, if it was created."""
+    if _client is not None:
+        _client.close()
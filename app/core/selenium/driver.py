@@ -2,28 +2,66 @@ from selenium import webdriver
 from selenium.webdriver.chrome.service import Service  # type: ignore
 from selenium.webdriver.chrome.options import Options  # type: ignore
 from fake_useragent import UserAgent  # type: ignore
+from functools import lru_cache
+import shutil
 import tempfile
 
 CHROMEDRIVER_PATH = "/usr/bin/chromedriver"
 
+# Resources that only affect rendering and are never scraped
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+]
 
-def get_selenium_driver():
+
+@lru_cache(maxsize=1)
+def get_user_agent() -> UserAgent:
+    """Load the user agent database once per process."""
+    return UserAgent()
+
+
+def get_selenium_driver(temp_dir: str = None):
     """
     Configure and return a Chrome WebDriver instance with custom options.
 
+    Args:
+        temp_dir: Chrome profile directory; a new temporary one if omitted.
+            The caller owns it and must remove it after ``quit()``.
+
     Returns:
         webdriver.Chrome: Configured Chrome WebDriver instance
-    """
-    ua = UserAgent()
-    temp_dir = tempfile.mkdtemp()
-    options = _get_chrome_options(ua, temp_dir)
 
-    service = Service(CHROMEDRIVER_PATH)
-    driver = webdriver.Chrome(service=service, options=options)
+    If the setup fails after Chrome has started, the browser is quit
+    before the error is re-raised, and a profile directory created here is
+    removed.
+    """
+    ua = get_user_agent()
+    own_dir = temp_dir is None
+    temp_dir = temp_dir or tempfile.mkdtemp()
+    driver = None
+    try:
+        options = _get_chrome_options(ua, temp_dir)
+        service = Service(CHROMEDRIVER_PATH)
+        driver = webdriver.Chrome(service=service, options=options)
 
-    driver.execute_script(
-        "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-    )
+        driver.execute_script(
+            "Object.defineProperty(navigator, 'webdriver', "
+            "{get: () => undefined})"
+        )
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs", {"urls": BLOCKED_URLS}
+        )
+    except BaseException:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        if own_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
     return driver
 
 
@@ -49,5 +87,12 @@ def _get_chrome_options(ua: UserAgent, temp_dir: str) -> Options:
     options.add_argument("--disable-popup-blocking")
     options.add_argument("--headless")
     options.add_argument(f"--user-data-dir={temp_dir}")
+    # Return from get() at DOMContentLoaded instead of after every
+    # subresource, and skip images altogether
+    options.page_load_strategy = "eager"
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option(
+        "prefs", {"profile.managed_default_content_settings.images": 2}
+    )
 
     return options
@@ -0,0 +1,371 @@
+"""
+Pool of warm Chrome WebDriver instances.
+
+Starting Chrome dominates scraping latency, so browsers are kept alive
+between requests: a request checks one out, uses it and checks it back
+in. Browsers are health-checked on checkout, recycled after
+``SELENIUM_MAX_USES`` pages or when they crash, and their profile
+directories are deleted when they are retired. The number of live
+browsers is bounded by ``SELENIUM_POOL_SIZE``, or by the available memory
+when it is 0.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastapi import HTTPException
+from selenium.common.exceptions import WebDriverException  # type: ignore
+
+from app.config import (
+    SELENIUM_ACQUIRE_TIMEOUT,
+    SELENIUM_BROWSER_MB,
+    SELENIUM_MAX_USES,
+    SELENIUM_POOL_SIZE,
+    SELENIUM_POOL_WARM,
+)
+from app.core import metrics
+from app.core.selenium.driver import get_selenium_driver
+from app.utils.logger import get_logger
+
+logger = get_logger("selenium_pool")
+
+_pool: Optional["DriverPool"] = None
+_pool_lock = threading.Lock()
+
+
+def _available_memory_mb() -> Optional[int]:
+    """Available physical memory in MB, if the platform reports it."""
+    try:
+        pages = os.sysconf("SC_AVPHYS_PAGES")
+        page_size = os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+    return pages * page_size // (1024 * 1024)
+
+
+def default_pool_size() -> int:
+    """
+    Browsers that fit in the available memory, capped by the CPU count.
+
+    Returns:
+        int: Pool size, at least 1
+    """
+    if SELENIUM_POOL_SIZE > 0:
+        return SELENIUM_POOL_SIZE
+    cpus = os.cpu_count() or 1
+    memory = _available_memory_mb()
+    if memory is None:
+        return min(cpus, 2)
+    return max(1, min(cpus, memory // SELENIUM_BROWSER_MB))
+
+
+class _PooledDriver:
+    """A live browser with its profile directory and usage count."""
+
+    def __init__(self, driver: Any, profile_dir: str):
+        self.driver = driver
+        self.profile_dir = profile_dir
+        self.uses = 0
+
+
+class DriverPool:
+    """
+    Bounded pool of reusable WebDriver instances.
+
+    Args:
+        size: Maximum number of live browsers
+        max_uses: Checkouts after which a browser is replaced
+        acquire_timeout: Seconds to wait for a free browser
+        factory: Creates a driver for a profile directory; defaults to
+            :func:`get_selenium_driver`. If it fails after starting the
+            browser it must quit it; the pool removes the directory.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_uses: int = SELENIUM_MAX_USES,
+        acquire_timeout: float = SELENIUM_ACQUIRE_TIMEOUT,
+        factory: Callable[[str], Any] = get_selenium_driver
+    ):
+        self.size = size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self._factory = factory
+        self._idle: List[_PooledDriver] = []
+        self._live = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "created": 0,
+            "retired": 0,
+            "health_failures": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    def _create(self) -> _PooledDriver:
+        profile_dir = tempfile.mkdtemp(prefix="chrome-profile-")
+        driver = None
+        try:
+            driver = self._factory(profile_dir)
+            entry = _PooledDriver(driver, profile_dir)
+            with self._cond:
+                self._stats["created"] += 1
+        except BaseException:
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception as e:
+                    logger.warning("Error closing browser: %s", e)
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            raise
+        return entry
+
+    def _destroy(self, entry: _PooledDriver) -> None:
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            logger.warning("Error closing browser: %s", e)
+        shutil.rmtree(entry.profile_dir, ignore_errors=True)
+        with self._cond:
+            self._stats["retired"] += 1
+
+    def _healthy(self, entry: _PooledDriver) -> bool:
+        try:
+            entry.driver.window_handles
+            return True
+        except Exception:
+            with self._cond:
+                self._stats["health_failures"] += 1
+            return False
+
+    def _reserve(self) -> Optional[_PooledDriver]:
+        """
+        Take an idle browser or a free slot, waiting if the pool is full.
+
+        Returns:
+            _PooledDriver: An idle browser, or None if a new one must be
+            created in the reserved slot
+
+        Raises:
+            HTTPException: 503 if nothing frees up within the timeout
+        """
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise HTTPException(
+                        status_code=503, detail="Browser pool is closed"
+                    )
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._live < self.size:
+                    self._live += 1
+                    entry = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise HTTPException(
+                        status_code=503,
+                        detail="No browser available, try again later"
+                    )
+                self._cond.wait(remaining)
+
+            waited = time.perf_counter() - start
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(
+                self._stats["wait_seconds_max"], waited
+            )
+        return entry
+
+    def _release_slot(self, entry: Optional[_PooledDriver]) -> None:
+        """Give back a checked-out slot, keeping ``entry`` if not None."""
+        with self._cond:
+            self._in_use -= 1
+            if entry is None:
+                self._live -= 1
+            else:
+                self._idle.append(entry)
+            self._cond.notify()
+
+    def _checkout(self) -> _PooledDriver:
+        entry = self._reserve()
+        try:
+            if entry is not None and not self._healthy(entry):
+                self._destroy(entry)
+                entry = None
+            if entry is None:
+                entry = self._create()
+        except BaseException:
+            self._release_slot(None)
+            raise
+        entry.uses += 1
+        return entry
+
+    def _checkin(self, entry: _PooledDriver, failed: bool) -> None:
+        keep = (
+            not self._closed
+            and entry.uses < self.max_uses
+            and (not failed or self._healthy(entry))
+        )
+        if keep:
+            try:
+                # Free the page's memory while the browser sits idle
+                entry.driver.get("about:blank")
+            except WebDriverException:
+                keep = False
+        if not keep:
+            self._destroy(entry)
+        self._release_slot(entry if keep else None)
+
+    @contextmanager
+    def driver(self) -> Iterator[Any]:
+        """
+        Check out a browser for the duration of the ``with`` block.
+
+        Yields:
+            webdriver.Chrome: A healthy browser
+
+        Raises:
+            HTTPException: 503 if no browser frees up in time
+        """
+        entry = self._checkout()
+        failed = False
+        try:
+            yield entry.driver
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._checkin(entry, failed)
+
+    def warm(self, count: int) -> None:
+        """
+        Start browsers until ``count`` are idle or the pool is full.
+
+        Args:
+            count: Browsers to have ready
+        """
+        while True:
+            with self._cond:
+                if (
+                    self._closed
+                    or len(self._idle) >= count
+                    or self._live >= self.size
+                ):
+                    return
+                self._live += 1
+            try:
+                entry = self._create()
+            except BaseException:
+                with self._cond:
+                    self._live -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def close(self) -> None:
+        """Quit the idle browsers; busy ones are quit on checkin."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._destroy(entry)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Pool utilization and checkout wait times.
+
+        Returns:
+            dict: Metrics snapshot
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                size=self.size,
+                live=self._live,
+                idle=len(self._idle),
+                in_use=self._in_use,
+                utilization=self._in_use / self.size,
+            )
+        checkouts = stats["checkouts"]
+        stats["wait_seconds_avg"] = (
+            stats["wait_seconds_total"] / checkouts if checkouts else 0.0
+        )
+        return stats
+
+
+def get_driver_pool() -> DriverPool:
+    """
+    Return the process-wide browser pool, creating it on first use.
+
+    Returns:
+        DriverPool: Shared pool
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DriverPool(default_pool_size())
+    return _pool
+
+
+def warm_driver_pool() -> None:
+    """Start ``SELENIUM_POOL_WARM`` browsers in the background."""
+    def _warm():
+        try:
+            get_driver_pool().warm(SELENIUM_POOL_WARM)
+        except Exception as e:
+            logger.warning("Could not pre-start browsers: %s", e)
+
+    if SELENIUM_POOL_WARM > 0:
+        threading.Thread(
+            target=_warm, name="selenium-warmup", daemon=True
+        ).start()
+
+
+def _pool_samples() -> List[metrics.Sample]:
+    if _pool is None:
+        return []
+    stats = _pool.metrics()
+    return [
+        ("selenium_pool_size", "Maximum browsers", {}, stats["size"]),
+        ("selenium_pool_live", "Browsers started", {}, stats["live"]),
+        ("selenium_pool_in_use", "Browsers checked out", {},
+         stats["in_use"]),
+        ("selenium_pool_utilization", "Share of the browsers in use", {},
+         stats["utilization"]),
+        ("selenium_pool_checkouts_total", "Browser checkouts", {},
+         stats["checkouts"]),
+        ("selenium_pool_timeouts_total", "Checkouts that timed out", {},
+         stats["timeouts"]),
+        ("selenium_pool_wait_seconds_total", "Time waiting for a browser",
+         {}, stats["wait_seconds_total"]),
+    ]
+
+
+metrics.register_collector(_pool_samples)
+
+
+def close_driver_pool() -> None:
+    """Quit the pooled browsers, if the pool was created."""
+    if _pool is not None:
+        _pool.close()
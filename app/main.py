@@ -7,17 +7,47 @@ This module serves as the entry point for the Lottery Analyzer API application.
 It configures the FastAPI instance and includes all route modules.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Response
+from app.core import executor, metrics
+from app.core.odoo.client import close_odoo_client
+from app.core.selenium.pool import warm_driver_pool, close_driver_pool
+from app.routes.amazon.fetcher import close_http_session
 from app.routes.endpoints import router
 from app.routes.password_key import router_password_key
 from app.routes.amazon.router import router_amazon
+from app.utils.logger import (
+    configure_logging, logging_samples, shutdown_logging
+)
+
+configure_logging()
+metrics.register_collector(logging_samples)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Pre-start browsers, and release the worker pools, Odoo and Amazon
+    connections and browsers on shutdown, then flush the log queue.
+    """
+    warm_driver_pool()
+    yield
+    executor.shutdown()
+    close_odoo_client()
+    close_driver_pool()
+    close_http_session()
+    shutdown_logging()
+
 
 # Initialize FastAPI application with metadata
 app = FastAPI(
     title="Lottery Analyzer",
     description="API for analyzing lottery draws and statistics",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan,
+    default_response_class=metrics.TimedJSONResponse
 )
+app.add_middleware(metrics.TimingMiddleware)
 
 # Include routers from different modules
 app.include_router(router)
@@ -42,3 +72,18 @@ def home() -> Response:
         content="<h1>Welcome to the Lottery Analyzer</h1>",
         media_type="text/html"
     )
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics() -> Response:
+    """
+    Prometheus metrics: request and stage latency histograms, in-flight
+    requests, cache hit ratios and lane, browser and Odoo pool use.
+
+    Returns:
+        Response: Prometheus text exposition format
+    """
+    return Response(
+        content=metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
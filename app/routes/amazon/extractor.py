@@ -0,0 +1,132 @@
+"""
+Product field extraction for Amazon product pages.
+
+The same selectors are applied in one pass either inside the browser
+(:data:`EXTRACT_SCRIPT` through ``execute_script``) or to saved HTML
+(:func:`parse_product_html`), so both paths return identical fields.
+"""
+
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+# CSS selectors tried in order for each field
+PRODUCT_SELECTORS: Dict[str, List[str]] = {
+    "title": ["#productTitle"],
+    # Scoped to the product's price blocks: an unscoped a-price also
+    # matches the prices of related-product carousels
+    "price": [
+        "#corePriceDisplay_desktop_feature_div span.a-price > .a-offscreen",
+        "#corePrice_feature_div span.a-price > .a-offscreen",
+        "span#price_inside_buybox",
+        "#centerCol span.a-price > span.a-offscreen",
+    ],
+    "availability": ["#availability"],
+    "reviews": ["span#acrCustomerReviewText"],
+}
+
+# Value reported when none of a field's selectors match
+PRODUCT_DEFAULTS: Dict[str, str] = {
+    "title": "Not found",
+    "price": "Not available",
+    "availability": "Not specified",
+    "reviews": "Not available",
+}
+
+# Elements whose presence means the page is ready to be read
+READY_SELECTORS = "#productTitle, form[action*='validateCaptcha']"
+
+# Markers of Amazon's robot check and error pages
+CHALLENGE_MARKERS = (
+    "/errors/validateCaptcha",
+    "Robot Check",
+    "api-services-support@amazon.com",
+)
+
+EXTRACT_SCRIPT = """
+const selectors = arguments[0];
+const result = {};
+for (const [field, candidates] of Object.entries(selectors)) {
+    result[field] = null;
+    for (const selector of candidates) {
+        const element = document.querySelector(selector);
+        const text = element
+            ? element.textContent.replace(/\\s+/g, " ").trim() : "";
+        if (text) {
+            result[field] = text;
+            break;
+        }
+    }
+}
+return result;
+"""
+
+
+def with_defaults(fields: Dict[str, Optional[str]]) -> Dict[str, str]:
+    """
+    Replace missing fields with their default value.
+
+    Args:
+        fields: Extracted text per field, None where nothing matched
+
+    Returns:
+        dict: One value per field of :data:`PRODUCT_SELECTORS`
+    """
+    return {
+        field: fields.get(field) or PRODUCT_DEFAULTS[field]
+        for field in PRODUCT_SELECTORS
+    }
+
+
+def looks_like_challenge(html: str) -> bool:
+    """
+    Whether a page is a bot challenge instead of a product page.
+
+    Args:
+        html: Page source
+
+    Returns:
+        bool: True if any challenge marker is present
+    """
+    return any(marker in html for marker in CHALLENGE_MARKERS)
+
+
+def missing_fields(fields: Dict[str, str], required) -> List[str]:
+    """
+    Required fields that were not found.
+
+    Args:
+        fields: Output of :func:`with_defaults`
+        required: Field names that must be present
+
+    Returns:
+        list: Names of the required fields left at their default
+    """
+    return [
+        field for field in required
+        if fields.get(field, PRODUCT_DEFAULTS.get(field))
+        == PRODUCT_DEFAULTS.get(field)
+    ]
+
+
+def parse_product_html(html: str) -> Dict[str, str]:
+    """
+    Extract the product fields from a page's HTML.
+
+    Args:
+        html: Product page source
+
+    Returns:
+        dict: title, price, availability and reviews
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    fields: Dict[str, Optional[str]] = {}
+    for field, candidates in PRODUCT_SELECTORS.items():
+        fields[field] = None
+        for selector in candidates:
+            element = soup.select_one(selector)
+            text = " ".join(element.get_text().split()) if element else ""
+            if text:
+                fields[field] = text
+                break
+    return with_defaults(fields)
@@ -0,0 +1,167 @@
+"""
+Plain HTTP fetch of Amazon product pages.
+
+Many product pages carry title, price and availability in their static
+HTML, so a pooled ``requests.Session`` is tried before starting a
+browser. :func:`fetch_product_http` says why it could not serve a page,
+and :data:`fetch_stats` counts which tier served each product.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import (
+    AMAZON_HTTP_POOL_SIZE,
+    AMAZON_HTTP_TIMEOUT,
+    AMAZON_REQUIRED_FIELDS,
+)
+from app.core import metrics
+from app.core.selenium.driver import get_user_agent
+from app.routes.amazon.extractor import (
+    looks_like_challenge,
+    missing_fields,
+    parse_product_html,
+)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class FetchStats:
+    """Thread-safe counters of the tier that served each product."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.served: Dict[str, int] = {"http": 0, "browser": 0}
+        self.escalations: Dict[str, int] = {}
+
+    def record(self, tier: str, escalation: Optional[str] = None) -> None:
+        """
+        Count a product served by ``tier``.
+
+        Args:
+            tier: ``http`` or ``browser``
+            escalation: Why the HTTP tier could not serve it, if tried
+        """
+        with self._lock:
+            self.served[tier] = self.served.get(tier, 0) + 1
+            if escalation:
+                self.escalations[escalation] = (
+                    self.escalations.get(escalation, 0) + 1
+                )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Served products per tier and escalation reasons.
+
+        Returns:
+            dict: Counters plus the share served without a browser
+        """
+        with self._lock:
+            served = dict(self.served)
+            escalations = dict(self.escalations)
+        total = sum(served.values())
+        return {
+            "served": served,
+            "escalations": escalations,
+            "http_ratio": served.get("http", 0) / total if total else 0.0,
+        }
+
+
+fetch_stats = FetchStats()
+
+
+def _fetch_samples() -> List[metrics.Sample]:
+    stats = fetch_stats.snapshot()
+    samples = [
+        ("amazon_products_served_total", "Products served per tier",
+         {"tier": tier}, count)
+        for tier, count in stats["served"].items()
+    ]
+    samples += [
+        ("amazon_browser_escalations_total",
+         "Products the HTTP tier handed to a browser", {"reason": reason},
+         count)
+        for reason, count in stats["escalations"].items()
+    ]
+    return samples
+
+
+metrics.register_collector(_fetch_samples)
+
+
+def get_http_session() -> requests.Session:
+    """
+    Return the shared session, whose adapter keeps up to
+    ``AMAZON_HTTP_POOL_SIZE`` connections alive per host.
+
+    Returns:
+        requests.Session: Shared session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=AMAZON_HTTP_POOL_SIZE,
+                    pool_maxsize=AMAZON_HTTP_POOL_SIZE,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({
+                    "Accept": (
+                        "text/html,application/xhtml+xml,"
+                        "application/xml;q=0.9,*/*;q=0.8"
+                    ),
+                    "Accept-Language": "en-US,en;q=0.9",
+                })
+                _session = session
+    return _session
+
+
+def fetch_product_http(
+    url: str
+) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+    """
+    Fetch and parse a product page without a browser.
+
+    Args:
+        url: Product page URL
+
+    Returns:
+        tuple: ``(fields, None)`` when the page could be served, or
+        ``(None, reason)`` when the browser is needed. ``reason`` is
+        ``error``, ``status_<code>``, ``challenge`` or
+        ``missing_<field>``.
+    """
+    try:
+        response = get_http_session().get(
+            url,
+            headers={"User-Agent": get_user_agent().random},
+            timeout=AMAZON_HTTP_TIMEOUT,
+        )
+    except requests.RequestException:
+        return None, "error"
+
+    if response.status_code != 200:
+        return None, f"status_{response.status_code}"
+
+    html = response.text
+    if looks_like_challenge(html):
+        return None, "challenge"
+
+    fields = parse_product_html(html)
+    missing = missing_fields(fields, AMAZON_REQUIRED_FIELDS)
+    if missing:
+        return None, f"missing_{missing[0]}"
+    return fields, None
+
+
+def close_http_session() -> None:
+    """Close the pooled connections, if the session was created."""
+    if _session is not None:
+        _session.close()
@@ -1,5 +1,11 @@
+from typing import Any, AsyncIterator, Dict
 from fastapi import APIRouter, HTTPException
-from app.routes.amazon.schemas import AmazonProductResponse
+from fastapi.responses import StreamingResponse
+from app.core.selenium.pool import get_driver_pool
+from app.routes.amazon.fetcher import fetch_stats
+from app.routes.amazon.schemas import (
+    AmazonBatchRequest, AmazonProductResponse
+)
 from app.routes.amazon.service import AmazonScraperService
 from app.utils.logger import get_logger
 
@@ -26,6 +32,55 @@ async def get_product_info(asin: str) -> AmazonProductResponse:
     try:
         scraper = AmazonScraperService()
         return await scraper.get_product_info(asin)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching product {asin}: {str(e)}")
+        logger.error("Error fetching product %s: %s", asin, e)
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router_amazon.post("/products")
+async def get_products_info(request: AmazonBatchRequest) -> StreamingResponse:
+    """
+    Get Amazon product information for a list of ASINs.
+
+    Products are scraped concurrently and streamed as newline-delimited
+    JSON, one ``{"asin", "cached", "product", "error"}`` object per ASIN
+    in completion order. Cached products are sent first.
+
+    Args:
+        request: ASINs to look up (duplicates are ignored)
+
+    Returns:
+        StreamingResponse: ``application/x-ndjson`` stream of results
+    """
+    scraper = AmazonScraperService()
+
+    async def lines() -> AsyncIterator[str]:
+        async for item in scraper.stream_products(request.asins):
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router_amazon.get("/pool-metrics")
+def get_pool_metrics() -> Dict[str, Any]:
+    """
+    Get the browser pool utilization and checkout wait times.
+
+    Returns:
+        dict: Live, idle and busy browsers, utilization, and wait seconds
+    """
+    return get_driver_pool().metrics()
+
+
+@router_amazon.get("/fetch-metrics")
+def get_fetch_metrics() -> Dict[str, Any]:
+    """
+    Get how many products each fetch tier served.
+
+    Returns:
+        dict: Products served over plain HTTP and by the browser, why the
+        HTTP tier escalated, and the share served without a browser
+    """
+    return fetch_stats.snapshot()
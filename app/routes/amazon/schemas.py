@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from app.config import AMAZON_BATCH_MAX
 
 
 class AmazonProductResponse(BaseModel):
@@ -7,8 +8,29 @@ class AmazonProductResponse(BaseModel):
     price: Optional[str] = None
     availability: Optional[str] = None
     reviews: Optional[str] = None
+    # Tier that fetched the page: "http" or "browser"
+    source: Optional[str] = None
 
 
 class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
+
+
+class AmazonBatchRequest(BaseModel):
+    asins: List[str] = Field(..., min_length=1, max_length=AMAZON_BATCH_MAX)
+
+    @field_validator("asins")
+    @classmethod
+    def normalize_asins(cls, asins: List[str]) -> List[str]:
+        """Upper-case, strip and de-duplicate ASINs keeping their order."""
+        return list(dict.fromkeys(
+            asin.strip().upper() for asin in asins if asin.strip()
+        ))
+
+
+class AmazonBatchItem(BaseModel):
+    asin: str
+    cached: bool = False
+    product: Optional[AmazonProductResponse] = None
+    error: Optional[str] = None
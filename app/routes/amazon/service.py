@@ -1,81 +1,174 @@
-from app.core.selenium.driver import get_selenium_driver
-from app.routes.amazon.schemas import AmazonProductResponse
+import asyncio
+from typing import AsyncIterator, Dict, List, Tuple
+from fastapi import HTTPException
+from app.config import (
+    AMAZON_BASE_URL,
+    AMAZON_CACHE_SIZE,
+    AMAZON_CACHE_STALE,
+    AMAZON_CACHE_TTL,
+    AMAZON_HTTP_FIRST,
+)
+from app.core import metrics
+from app.core.executor import run_in_io_thread
+from app.core.selenium.pool import get_driver_pool
+from app.routes.amazon.schemas import AmazonBatchItem, AmazonProductResponse
+from app.utils.cache import TTLCache
+from app.utils.logger import get_logger
+from app.routes.amazon.fetcher import fetch_product_http, fetch_stats
+from app.routes.amazon.extractor import (
+    EXTRACT_SCRIPT, PRODUCT_SELECTORS, READY_SELECTORS, with_defaults
+)
 from selenium.webdriver.common.by import By  # type: ignore
 from selenium.webdriver.support.ui import WebDriverWait  # type: ignore
 from selenium.webdriver.support import (  # type: ignore
     expected_conditions as EC
 )
-from selenium.common.exceptions import (  # type: ignore
-    TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException  # type: ignore
+
+logger = get_logger("amazon_service")
+
+# Products by ASIN, shared by the single and batch endpoints
+product_cache = TTLCache(
+    AMAZON_CACHE_TTL, stale=AMAZON_CACHE_STALE, maxsize=AMAZON_CACHE_SIZE
 )
+metrics.register_cache("amazon_products", product_cache)
+# Scrapes in progress, so concurrent lookups of an ASIN share one browser
+_in_flight: Dict[str, "asyncio.Task[AmazonProductResponse]"] = {}
 
 
 class AmazonScraperService:
-    BASE_URL = "https://www.amazon.com/dp/"
+    BASE_URL = AMAZON_BASE_URL
 
     async def get_product_info(self, asin: str) -> AmazonProductResponse:
-        driver = get_selenium_driver()
-        try:
-            product_info = self._scrape_product_data(
-                driver, f"{self.BASE_URL}{asin}"
-            )
-            return AmazonProductResponse(**product_info)
-        finally:
-            driver.quit()
+        product, _ = await self.get_cached_product(asin)
+        return product
 
-    def _scrape_product_data(self, driver, url: str) -> dict:
-        driver.get(url)
-        wait = WebDriverWait(driver, 10)
+    async def get_cached_product(
+        self, asin: str, lane: str = "amazon"
+    ) -> Tuple[AmazonProductResponse, bool]:
+        """
+        Return the product and whether it came from the cache.
+
+        A stale entry is returned at once and refreshed in the background.
+        """
+        found = product_cache.lookup(asin)
+        if found is not None:
+            product, fresh = found
+            if not fresh:
+                self._refresh(asin)
+            return product, True
+        return await asyncio.shield(self._scrape_shared(asin, lane)), False
 
-        return {
-            "title": self._get_title(wait),
-            "price": self._get_price(wait, driver),
-            "availability": self._get_availability(wait),
-            "reviews": self._get_reviews(wait)
-        }
+    async def stream_products(
+        self, asins: List[str]
+    ) -> AsyncIterator[AmazonBatchItem]:
+        """
+        Yield one item per ASIN as soon as it is available: cached products
+        first, then scraped ones in completion order. Scrapes run in the
+        ``amazon-batch`` lane, which bounds how many run at a time.
+        """
+        pending = []
+        for asin in asins:
+            found = product_cache.lookup(asin)
+            if found is None:
+                pending.append(asin)
+                continue
+            product, fresh = found
+            if not fresh:
+                self._refresh(asin)
+            yield AmazonBatchItem(asin=asin, cached=True, product=product)
 
-    def _get_title(self, wait: WebDriverWait) -> str:
+        tasks = [
+            asyncio.ensure_future(self._batch_item(asin)) for asin in pending
+        ]
         try:
-            element = wait.until(
-                EC.presence_of_element_located((By.ID, "productTitle"))
-            )
-            return element.text.strip()
-        except TimeoutException:
-            return "Not found"
+            for next_item in asyncio.as_completed(tasks):
+                yield await next_item
+        finally:
+            for task in tasks:
+                task.cancel()
 
-    def _get_price(self, wait: WebDriverWait, driver) -> str:
+    async def _batch_item(self, asin: str) -> AmazonBatchItem:
         try:
-            element = wait.until(
-                EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, "span.a-price > span.a-offscreen")
-                )
+            product, cached = await self.get_cached_product(
+                asin, lane="amazon-batch"
             )
-            return element.text.strip()
-        except TimeoutException:
-            try:
-                element = driver.find_element(
-                    By.CSS_SELECTOR, "span#price_inside_buybox"
+            return AmazonBatchItem(asin=asin, cached=cached, product=product)
+        except HTTPException as e:
+            return AmazonBatchItem(asin=asin, error=str(e.detail))
+        except Exception as e:
+            logger.error("Error fetching product %s: %s", asin, e)
+            return AmazonBatchItem(asin=asin, error=str(e))
+
+    def _scrape_shared(
+        self, asin: str, lane: str
+    ) -> "asyncio.Task[AmazonProductResponse]":
+        task = _in_flight.get(asin)
+        if task is None:
+            task = asyncio.ensure_future(self._scrape_and_cache(asin, lane))
+            _in_flight[asin] = task
+            task.add_done_callback(lambda _: _in_flight.pop(asin, None))
+        return task
+
+    def _refresh(self, asin: str) -> None:
+        def log_error(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(
+                    "Refreshing product %s failed: %s", asin, task.exception()
                 )
-                return element.text.strip()
-            except NoSuchElementException:
-                return "Not available"
 
-    def _get_availability(self, wait: WebDriverWait) -> str:
-        try:
-            element = wait.until(
-                EC.presence_of_element_located((By.ID, "availability"))
+        if asin not in _in_flight:
+            self._scrape_shared(asin, "amazon-batch").add_done_callback(
+                log_error
             )
-            return element.text.strip()
-        except TimeoutException:
-            return "Not specified"
 
-    def _get_reviews(self, wait: WebDriverWait) -> str:
+    async def _scrape_and_cache(
+        self, asin: str, lane: str
+    ) -> AmazonProductResponse:
+        product = await run_in_io_thread(lane, self._fetch_product, asin)
+        # A page without title is usually a captcha; retry it next time
+        if product.title != "Not found":
+            product_cache.put(asin, product)
+        return product
+
+    def _fetch_product(self, asin: str) -> AmazonProductResponse:
+        """
+        Fetch the page over plain HTTP and fall back to a browser only if
+        it is a bot challenge or lacks required fields.
+        """
+        url = f"{self.BASE_URL}{asin}"
+        escalation = None
+        if AMAZON_HTTP_FIRST:
+            with metrics.stage("amazon_http"):
+                product_info, escalation = fetch_product_http(url)
+            if product_info is not None:
+                fetch_stats.record("http")
+                return AmazonProductResponse(**product_info, source="http")
+            logger.info("Product %s needs a browser: %s", asin, escalation)
+
+        with metrics.stage("selenium"), get_driver_pool().driver() as driver:
+            product_info = self._scrape_product_data(driver, url)
+        fetch_stats.record("browser", escalation)
+        return AmazonProductResponse(**product_info, source="browser")
+
+    def _scrape_product_data(self, driver, url: str) -> dict:
+        driver.get(url)
         try:
-            element = wait.until(
-                EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, "span#acrCustomerReviewText")
+            # Wait once for the product (or captcha) markup, then read
+            # every field in a single round trip
+            WebDriverWait(driver, 10).until(
+                EC.any_of(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, READY_SELECTORS)
+                    ),
+                    lambda d: d.execute_script(
+                        "return document.readyState"
+                    ) == "complete"
                 )
             )
-            return element.text.strip()
         except TimeoutException:
-            return "Not available"
+            pass
+
+        return with_defaults(
+            driver.execute_script(EXTRACT_SCRIPT, PRODUCT_SELECTORS)
+        )
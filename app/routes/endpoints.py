@@ -4,36 +4,53 @@ This module provides REST API endpoints for lottery number
 analysis and Odoo integration.
 """
 
-from fastapi import APIRouter, Query, Response, HTTPException
-from app.services.data_loader import cargar_datos
+from fastapi import (
+    APIRouter, Depends, Header, Query, Response, HTTPException
+)
+from app.services.data_loader import (
+    cargar_datos, agregar_sorteo, juegos_cargados
+)
+from app.services.juegos import JUEGOS, Juego, obtener_juego
 from app.services.analisys import (
     calcular_frecuencia,
+    frecuencia_numero,
     obtener_combinaciones_comunes,
+    buscar_boletos,
+    puntuar_boletos,
     calcular_probabilidades,
-    obtener_combinaciones_frecuentes
+    calcular_recencia,
+    ORDENES_RECENCIA,
+    obtener_combinaciones_frecuentes,
+    combinaciones_frecuentes_en,
+    contar_coocurrencias,
+    serie_mensual
 )
-from app.services.grafic import graficBarras
-import logging
-import xmlrpc.client
-from dotenv import load_dotenv
-import os
-from typing import Dict, Any
-
-# Load environment variables
-load_dotenv()
-
-# Odoo connection configuration
-ODOO_URL = os.getenv("ODOO_URL")
-DB_NAME = os.getenv("DB_NAME")
-ODOO_USER = os.getenv("ODOO_USER")
-ODOO_PASSWORD = os.getenv("ODOO_PASSWORD")
-
-# Configure logging
-logging.basicConfig(
-    filename="logs/app.log",
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    level=logging.INFO
+from app.core import metrics
+from app.core.executor import (
+    run_in_thread, run_in_io_thread, run_in_process, run_in_process_map
+)
+from app.services.aleatoriedad import (
+    estadisticos_observados,
+    simular_estadisticos,
+    tareas_simulacion,
+    resumir_pruebas
 )
+from app.services.grafic import graficBarras, cache_graficos, etag_grafico
+from app.services.sorteos import dia_de_fecha
+from app.routes.schemas import DrawRequest, DrawResponse, TicketsRequest
+from app.utils.cache import LRUCache
+from app.utils.precomputed import PrecomputedJSON, etag_matches
+from app.config import (
+    JSON_CACHE_SIZE, MONTE_CARLO_SIMULACIONES, MONTE_CARLO_SEMILLA
+)
+from app.services.odoo_sync import sincronizar_odoo, leer_registros
+from app.core.odoo.client import get_odoo_client
+import asyncio
+import logging
+from datetime import date
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api",
@@ -45,26 +62,196 @@ router = APIRouter(
 )
 
 
-def load_lottery_data():
+DATASET_VERSION_HEADER = "X-Dataset-Version"
+
+
+def selected_game(
+    game: Optional[str] = Query(
+        None, description="Game to analyze (default: the configured game)"
+    )
+) -> Juego:
+    """
+    Resolve the ``game`` query parameter.
+
+    Raises:
+        HTTPException: If the game is not registered
+    """
+    return obtener_juego(game)
+
+
+def load_lottery_data(game: Juego, response: Response = None):
     """
     Helper function to load lottery data with error handling.
 
+    Args:
+        game: Game whose draws are loaded
+        response: Optional response whose headers receive the version of
+            the dataset snapshot that served the request
+
     Returns:
-        tuple: DataFrame and dates of lottery draws
+        Sorteos: Cached compact representation of the lottery draws
 
     Raises:
         HTTPException: If there's an error loading the data
     """
     try:
-        df, dates = cargar_datos()
-        return df, dates
+        with metrics.stage("load"):
+            sorteos = cargar_datos(game.nombre)
     except Exception as e:
-        logging.error(f"Error loading data: {e}")
+        logger.error("Error loading data: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Internal error while loading data"
         )
 
+    if response is not None:
+        response.headers[DATASET_VERSION_HEADER] = sorteos.version
+    return sorteos
+
+
+def check_number(game: Juego, num: int) -> None:
+    """
+    Check that a number belongs to the game's range.
+
+    Raises:
+        HTTPException: 422 if ``num`` is outside the range
+    """
+    if not game.numero_minimo <= num <= game.numero_maximo:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"Number must be between {game.numero_minimo} and "
+                f"{game.numero_maximo} for {game.nombre}"
+            )
+        )
+
+
+# Serialized bodies keyed by endpoint, game, dataset version and window
+json_cache = LRUCache(JSON_CACHE_SIZE)
+metrics.register_cache("json", json_cache)
+# Randomness reports being computed, so identical requests share one run
+_randomness_in_flight: Dict[Tuple, "asyncio.Task[PrecomputedJSON]"] = {}
+
+
+def precomputed_json(
+    name: str, game: Juego, sorteos, window: Optional[Tuple], build
+) -> PrecomputedJSON:
+    """
+    Return the serialized response of an analysis endpoint, building it
+    only once per game, dataset version and draw window.
+
+    Args:
+        name: Endpoint name
+        game: Game the data belongs to
+        sorteos: Dataset snapshot serving the request
+        window: Resolved draw window or other parameters the response
+            depends on, or None
+        build: Callable returning the response data
+
+    Returns:
+        PrecomputedJSON: Encoded body with its ETag and variants
+    """
+    key = (name, game.nombre, sorteos.version, window)
+    body = json_cache.get(key)
+    if body is None:
+        with metrics.stage("compute"):
+            data = build()
+        with metrics.stage("serialize"):
+            body = PrecomputedJSON(data, sorteos.version)
+        json_cache.put(key, body)
+    return body
+
+
+def date_window(
+    date_from: Optional[date] = Query(
+        None, alias="from", description="First draw date to include"
+    ),
+    date_to: Optional[date] = Query(
+        None, alias="to", description="Last draw date to include"
+    ),
+    last_n_draws: Optional[int] = Query(
+        None, ge=1, description="Keep only the latest N draws of the window"
+    )
+) -> Dict[str, Any]:
+    """
+    Collect the optional date window query parameters.
+
+    Raises:
+        HTTPException: If ``from`` is later than ``to``
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=400,
+            detail="'from' must not be later than 'to'"
+        )
+    return {"from": date_from, "to": date_to, "last_n_draws": last_n_draws}
+
+
+def resolve_window(sorteos, window: Dict[str, Any]) -> Optional[Tuple]:
+    """
+    Translate window parameters into chronological draw positions.
+
+    Args:
+        sorteos: Dataset snapshot serving the request
+        window: Parameters collected by ``date_window``
+
+    Returns:
+        tuple: ``(start, end)`` positions, or None when no window was given
+    """
+    if not any(value is not None for value in window.values()):
+        return None
+    return sorteos.indice_fechas.rango(
+        desde=dia_de_fecha(window["from"]) if window["from"] else None,
+        hasta=dia_de_fecha(window["to"]) if window["to"] else None,
+        ultimos=window["last_n_draws"]
+    )
+
+
+@router.post(
+    "/draws",
+    status_code=201,
+    response_model=DrawResponse,
+    summary="Append a new draw",
+    response_description="Returns the stored draw and the dataset version"
+)
+async def add_draw(
+    draw: DrawRequest,
+    response: Response,
+    game: Juego = Depends(selected_game)
+) -> DrawResponse:
+    """
+    Append a new draw to the dataset.
+
+    The draw is written to the CSV and every in-memory statistic is
+    updated incrementally, without reloading the file.
+
+    Args:
+        draw: Date and numbers of the new draw
+        game: Game the draw belongs to
+
+    Returns:
+        DrawResponse: Position of the draw in the history and the new
+        dataset version
+
+    Raises:
+        HTTPException: If the draw is invalid or dated before the latest one
+    """
+    sorteos = await run_in_thread(
+        "draws", agregar_sorteo, draw.numbers, draw.date, game.nombre
+    )
+    response.headers[DATASET_VERSION_HEADER] = sorteos.version
+    logger.info(
+        "Draw appended to %s: %s %s",
+        game.nombre, draw.date, sorted(draw.numbers)
+    )
+    return DrawResponse(
+        game=game.nombre,
+        draw=len(sorteos) - 1,
+        date=draw.date,
+        numbers=sorted(draw.numbers),
+        version=sorteos.version
+    )
+
 
 @router.get(
     "/frequency",
@@ -73,15 +260,41 @@ def load_lottery_data():
         "Returns frequency distribution of all lottery numbers"
     )
 )
-async def get_number_frequency() -> Dict[str, Any]:
+async def get_number_frequency(
+    game: Juego = Depends(selected_game),
+    window: Dict[str, Any] = Depends(date_window),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+) -> Response:
     """
     Get the frequency distribution of all numbers in lottery draws.
 
+    The JSON body is built once per dataset version and window and served
+    with a strong ETag (``If-None-Match`` gives a 304) and, if accepted,
+    precompressed.
+
+    Args:
+        game: Game to analyze
+        window: Optional ``from``/``to``/``last_n_draws`` draw window
+        if_none_match: ETag of the copy the client already has
+        accept_encoding: Encodings the client accepts
+
     Returns:
-        dict: Frequency data for all numbers
+        Response: Frequency data for all numbers
     """
-    df, dates = load_lottery_data()
-    return {"frequency": calcular_frecuencia(df, dates)}
+    def compute() -> PrecomputedJSON:
+        sorteos = load_lottery_data(game)
+        rango = resolve_window(sorteos, window)
+        return precomputed_json(
+            "frequency", game, sorteos, rango,
+            lambda: {"frequency": calcular_frecuencia(sorteos, rango)}
+        )
+
+    body = await run_in_thread("frequency", compute)
+    return body.response(
+        if_none_match, accept_encoding,
+        {DATASET_VERSION_HEADER: body.version}
+    )
 
 
 @router.get(
@@ -92,26 +305,37 @@ async def get_number_frequency() -> Dict[str, Any]:
 async def get_specific_number_frequency(
     num: int = Query(
         ge=1,
-        le=39,
-        description="Lottery number between 1 and 39"
-    )
+        description="Lottery number within the game's range"
+    ),
+    game: Juego = Depends(selected_game),
+    response: Response = None
 ) -> Dict[str, Any]:
     """
     Get frequency data for a specific lottery number.
 
     Args:
-        num: The lottery number to analyze (1-39)
+        num: The lottery number to analyze (1-39 for the default game)
+        game: Game to analyze
 
     Returns:
         dict: Frequency data for the specified number
+
+    Raises:
+        HTTPException: If ``num`` is outside the game's range
     """
-    df, dates = load_lottery_data()
-    frequency = calcular_frecuencia(df, dates)
+    check_number(game, num)
 
-    if str(num) not in frequency:
+    def compute() -> Optional[Dict[str, Any]]:
+        sorteos = load_lottery_data(game, response)
+        with metrics.stage("compute"):
+            return frecuencia_numero(sorteos, num)
+
+    data = await run_in_thread("frequency", compute)
+
+    if data is None:
         return {"message": f"Number {num} has not appeared in any draw"}
 
-    return {"number": num, "data": frequency[str(num)]}
+    return {"number": num, "data": data}
 
 
 @router.get(
@@ -119,15 +343,47 @@ async def get_specific_number_frequency(
     summary="Get most common number combinations",
     response_description="Returns most frequent number combinations"
 )
-async def get_common_combinations() -> Dict[str, Any]:
+async def get_common_combinations(
+    game: Juego = Depends(selected_game),
+    limit: Optional[int] = Query(
+        None, ge=1, description="Return only the N most common (default: all)"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+) -> Response:
     """
     Get the most common combinations of numbers in lottery draws.
 
+    Combinations are ordered by count, ties by first appearance, and keyed
+    by their numbers in ascending order. Served like ``/frequency``:
+    precomputed per dataset version and limit, with ETag revalidation and
+    precompressed bodies.
+
+    Args:
+        game: Game to analyze
+        limit: Maximum number of combinations to return
+        if_none_match: ETag of the copy the client already has
+        accept_encoding: Encodings the client accepts
+
     Returns:
-        dict: Most common number combinations
+        Response: Most common number combinations
     """
-    df, _ = load_lottery_data()
-    return {"common_combinations": obtener_combinaciones_comunes(df)}
+    def compute() -> PrecomputedJSON:
+        sorteos = load_lottery_data(game)
+        return precomputed_json(
+            "common-combinations", game, sorteos, (limit,) if limit else None,
+            lambda: {
+                "common_combinations": obtener_combinaciones_comunes(
+                    sorteos, limit
+                )
+            }
+        )
+
+    body = await run_in_thread("common-combinations", compute)
+    return body.response(
+        if_none_match, accept_encoding,
+        {DATASET_VERSION_HEADER: body.version}
+    )
 
 
 @router.get(
@@ -135,15 +391,194 @@ async def get_common_combinations() -> Dict[str, Any]:
     summary="Calculate number probabilities",
     response_description="Returns probability calculations for numbers"
 )
-async def get_probabilities() -> Dict[str, Any]:
+async def get_probabilities(
+    game: Juego = Depends(selected_game),
+    window: Dict[str, Any] = Depends(date_window),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+) -> Response:
     """
     Calculate probabilities for numbers based on historical data.
 
+    Served like ``/frequency``: precomputed per dataset version and
+    window, with ETag revalidation and precompressed bodies.
+
+    Args:
+        game: Game to analyze
+        window: Optional ``from``/``to``/``last_n_draws`` draw window
+        if_none_match: ETag of the copy the client already has
+        accept_encoding: Encodings the client accepts
+
+    Returns:
+        Response: Probability calculations for each number
+    """
+    def compute() -> PrecomputedJSON:
+        sorteos = load_lottery_data(game)
+        rango = resolve_window(sorteos, window)
+        return precomputed_json(
+            "probabilities", game, sorteos, rango,
+            lambda: {
+                "probabilities": calcular_probabilidades(sorteos, rango)
+            }
+        )
+
+    body = await run_in_thread("probabilities", compute)
+    return body.response(
+        if_none_match, accept_encoding,
+        {DATASET_VERSION_HEADER: body.version}
+    )
+
+
+@router.get(
+    "/recency",
+    summary="Get last appearance, gaps and overdue numbers",
+    response_description=(
+        "Returns recency and gap statistics of every number"
+    )
+)
+async def get_recency(
+    game: Juego = Depends(selected_game),
+    sort: str = Query(
+        "overdue", pattern=f"^({'|'.join(ORDENES_RECENCIA)})$",
+        description=(
+            "overdue, gap, recent, hot, cold or number (default overdue)"
+        )
+    ),
+    top: Optional[int] = Query(
+        None, ge=1, description="Return only the first N numbers"
+    ),
+    histogram: bool = Query(
+        False, description="Include the gap histogram of each number"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+) -> Response:
+    """
+    Get when each number was last drawn and how overdue it is.
+
+    Read from the recency index, which is built in one pass over the
+    draws and updated incrementally when draws are added. Served like
+    ``/frequency``: precomputed per dataset version and parameters, with
+    ETag revalidation and precompressed bodies.
+
+    Args:
+        game: Game to analyze
+        sort: Order of the numbers: ``overdue`` (draws since last seen
+            over the mean gap), ``gap`` (draws since last seen),
+            ``recent``, ``hot`` / ``cold`` (most / fewest appearances)
+            or ``number``
+        top: Maximum number of numbers to return
+        histogram: Whether to include each number's gap histogram
+        if_none_match: ETag of the copy the client already has
+        accept_encoding: Encodings the client accepts
+
+    Returns:
+        Response: Last draw date, draws since, appearances, mean and
+        maximum gap and overdue ratio of each number
+    """
+    def compute() -> PrecomputedJSON:
+        sorteos = load_lottery_data(game)
+        return precomputed_json(
+            "recency", game, sorteos, (sort, top, histogram),
+            lambda: {
+                "draws": len(sorteos),
+                "recency": calcular_recencia(sorteos, sort, top, histogram)
+            }
+        )
+
+    body = await run_in_thread("recency", compute)
+    return body.response(
+        if_none_match, accept_encoding,
+        {DATASET_VERSION_HEADER: body.version}
+    )
+
+
+@router.get(
+    "/randomness",
+    summary="Test the draw history for randomness",
+    response_description=(
+        "Returns chi-square statistics and Monte Carlo p-values"
+    )
+)
+async def get_randomness_tests(
+    game: Juego = Depends(selected_game),
+    simulations: int = Query(
+        MONTE_CARLO_SIMULACIONES, ge=100, le=20000,
+        description="Simulated fair histories to compare against"
+    ),
+    seed: int = Query(
+        MONTE_CARLO_SEMILLA, ge=0, description="Seed of the simulations"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+) -> Response:
+    """
+    Compare the history with simulated histories of fair draws.
+
+    Three chi-square statistics are computed for the history and for
+    each simulated history of the same length: number frequencies, pair
+    frequencies and the gaps between consecutive appearances of a
+    number. The p-value of each test is the share of simulations at
+    least as extreme as the history. Simulations run in the process pool
+    in seeded tasks, so a seed always gives the same result, and the
+    body is cached per dataset version, simulation count and seed.
+
+    Args:
+        game: Game to analyze
+        simulations: Number of simulated histories
+        seed: Seed of the ``SeedSequence`` the task streams derive from
+        if_none_match: ETag of the copy the client already has
+        accept_encoding: Encodings the client accepts
+
     Returns:
-        dict: Probability calculations for each number
+        Response: Statistic, degrees of freedom, simulated mean and
+        p-value of each test
     """
-    df, _ = load_lottery_data()
-    return {"probabilities": calcular_probabilidades(df)}
+    # The game cache answers at once; the randomness lane is only taken
+    # by the task that runs the simulations
+    sorteos = await run_in_thread("default", load_lottery_data, game)
+    key = ("randomness", game.nombre, sorteos.version, (simulations, seed))
+    body = json_cache.get(key)
+    if body is None:
+        task = _randomness_in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                _randomness_report(key, sorteos, simulations, seed)
+            )
+            _randomness_in_flight[key] = task
+            task.add_done_callback(
+                lambda _: _randomness_in_flight.pop(key, None)
+            )
+        body = await asyncio.shield(task)
+
+    return body.response(
+        if_none_match, accept_encoding,
+        {DATASET_VERSION_HEADER: body.version}
+    )
+
+
+async def _randomness_report(
+    key: Tuple, sorteos, simulations: int, seed: int
+) -> PrecomputedJSON:
+    """
+    Run the randomness tests and cache the serialized report.
+
+    Concurrent requests for the same ``key`` await this one task, so the
+    simulations run once; only this task takes ``randomness`` lane
+    slots, while duplicates and cache hits do not wait for them.
+    """
+    observed = await run_in_thread(
+        "randomness", estadisticos_observados, sorteos, stage="compute"
+    )
+    simulated = await run_in_process_map(
+        "randomness", simular_estadisticos,
+        tareas_simulacion(sorteos, simulations, seed)
+    )
+    data = resumir_pruebas(sorteos, observed, simulated, seed)
+    with metrics.stage("serialize"):
+        body = PrecomputedJSON(data, sorteos.version)
+    json_cache.put(key, body)
+    return body
 
 
 @router.get(
@@ -152,21 +587,174 @@ async def get_probabilities() -> Dict[str, Any]:
     response_description="Returns most frequent combinations of specified size"
 )
 async def get_frequent_combinations(
-    n: int = Query(ge=2, le=5, description="Size of number combinations (2-5)")
+    n: int = Query(
+        ge=2, le=5, description="Size of number combinations (2-5)"
+    ),
+    top: int = Query(
+        10, ge=1, le=1000, description="Number of combinations to return"
+    ),
+    game: Juego = Depends(selected_game),
+    window: Dict[str, Any] = Depends(date_window),
+    response: Response = None
 ) -> Dict[str, Any]:
     """
     Get the most frequent combinations of numbers of specified size.
 
     Args:
         n: Number of elements in each combination (2-5)
+        top: Number of combinations to return (1-1000)
+        game: Game to analyze
+        window: Optional ``from``/``to``/``last_n_draws`` draw window
 
     Returns:
         dict: Most frequent combinations of the specified size
     """
-    df, _ = load_lottery_data()
-    return {
-        "frequent_combinations": obtener_combinaciones_frecuentes(df, n)
-    }
+    sorteos = await run_in_thread(
+        "frequent-combinations", load_lottery_data, game, response
+    )
+    ventana = resolve_window(sorteos, window)
+
+    if ventana is not None and n >= 3:
+        # Recount of the window rows: CPU-bound, run in the process pool
+        result = await run_in_process(
+            "frequent-combinations",
+            combinaciones_frecuentes_en,
+            sorteos.bolas_ventana(ventana),
+            n,
+            top,
+            sorteos.numero_maximo
+        )
+    else:
+        result = await run_in_thread(
+            "frequent-combinations",
+            obtener_combinaciones_frecuentes,
+            sorteos,
+            n,
+            top,
+            ventana,
+            stage="compute"
+        )
+    return {"frequent_combinations": result}
+
+
+@router.get(
+    "/co-occurrence",
+    summary="Count draws containing a group of numbers",
+    response_description=(
+        "Returns how many draws contained all the given numbers"
+    )
+)
+async def get_co_occurrence(
+    numbers: List[int] = Query(
+        min_length=2,
+        max_length=3,
+        description="Two or three distinct lottery numbers"
+    ),
+    game: Juego = Depends(selected_game),
+    response: Response = None
+) -> Dict[str, Any]:
+    """
+    Count how many draws contained every one of the given numbers.
+
+    Args:
+        numbers: Two or three distinct lottery numbers
+        game: Game to analyze
+
+    Returns:
+        dict: The numbers and the number of draws they shared
+    """
+    def compute() -> Dict[str, Any]:
+        sorteos = load_lottery_data(game, response)
+        with metrics.stage("compute"):
+            count = contar_coocurrencias(sorteos, numbers)
+        return {"numbers": sorted(set(numbers)), "count": count}
+
+    return await run_in_thread("co-occurrence", compute)
+
+
+@router.post(
+    "/tickets/drawn",
+    summary="Check whether tickets were ever drawn",
+    response_description=(
+        "Returns, for each ticket, whether and when it was drawn exactly"
+    )
+)
+async def check_tickets_drawn(
+    request: TicketsRequest,
+    game: Juego = Depends(selected_game),
+    response: Response = None
+) -> Dict[str, Any]:
+    """
+    Look up a batch of tickets in the history of exact draws.
+
+    Each ticket is a hash lookup of its number mask in the exact
+    combination index, so the cost does not depend on the history size.
+
+    Args:
+        request: Tickets to check, each with one number per ball
+        game: Game to analyze
+
+    Returns:
+        dict: For each ticket, in request order, its sorted numbers,
+        whether it was drawn, how many times and the draw dates
+
+    Raises:
+        HTTPException: If a ticket has repeated numbers, the wrong count
+            or numbers outside the game range
+    """
+    def compute() -> Dict[str, Any]:
+        sorteos = load_lottery_data(game, response)
+        with metrics.stage("compute"):
+            tickets = buscar_boletos(sorteos, request.tickets)
+        return {"game": game.nombre, "tickets": tickets}
+
+    return await run_in_thread("tickets", compute)
+
+
+@router.post(
+    "/tickets/score",
+    summary="Score tickets against the draw history",
+    response_description=(
+        "Returns, for each ticket, its overlap with every past draw"
+    )
+)
+async def score_tickets(
+    request: TicketsRequest,
+    game: Juego = Depends(selected_game),
+    response: Response = None
+) -> Dict[str, Any]:
+    """
+    Compare a batch of tickets with every draw in the history.
+
+    Ticket and draw numbers are 64-bit masks; the matches of a ticket are
+    the popcount of its mask ANDed with each draw mask, computed for
+    blocks of tickets at a time.
+
+    Args:
+        request: Tickets to score, each with one number per ball
+        game: Game to analyze
+
+    Returns:
+        dict: For each ticket, in request order, its sorted numbers, the
+        most numbers it shared with a single draw, how many draws matched
+        2, 3, ... numbers and its frequency score (mean frequency of its
+        numbers over the mean of all numbers; 1.0 is average)
+
+    Raises:
+        HTTPException: If a ticket has repeated numbers, the wrong count
+            or numbers outside the game range
+    """
+    def compute() -> Dict[str, Any]:
+        sorteos = load_lottery_data(game, response)
+        with metrics.stage("compute"):
+            tickets = puntuar_boletos(sorteos, request.tickets)
+        return {"game": game.nombre, "draws": len(sorteos),
+                "tickets": tickets}
+
+    return await run_in_thread("tickets", compute)
+
+
+CHART_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
 
 
 @router.get(
@@ -175,39 +763,105 @@ async def get_frequent_combinations(
     response_description="Returns PNG image of frequency bar chart"
 )
 async def generate_bar_chart(
-    num: int = Query(ge=1, le=39, description="Lottery number to analyze")
+    num: int = Query(ge=1, description="Lottery number to analyze"),
+    game: Juego = Depends(selected_game),
+    width: float = Query(12, ge=2, le=40, description="Width in inches"),
+    height: float = Query(6, ge=2, le=40, description="Height in inches"),
+    format: str = Query(
+        "png", pattern="^(png|svg)$", description="Image format (png, svg)"
+    ),
+    if_none_match: Optional[str] = Header(None)
 ) -> Response:
     """
     Generate a bar chart showing monthly frequency for a specific number.
 
+    Rendered images are cached per game, number, dataset version, size
+    and format, and served with a strong ETag so clients can revalidate
+    with ``If-None-Match`` and get a 304.
+
     Args:
-        num: The lottery number to analyze (1-39)
+        num: The lottery number to analyze (1-39 for the default game)
+        game: Game to analyze
+        width: Figure width in inches
+        height: Figure height in inches
+        format: Image format, ``png`` or ``svg``
+        if_none_match: ETag of the copy the client already has
 
     Returns:
-        Response: PNG image of the bar chart
+        Response: Image of the bar chart, or 304 if it did not change
 
     Raises:
-        HTTPException: If no data is available for the number
+        HTTPException: If the number is outside the game's range or has no
+            data
     """
-    df, dates = load_lottery_data()
-    frequency = calcular_frecuencia(df, dates)
-    number_dates = frequency.get(str(num))
+    check_number(game, num)
+    sorteos = await run_in_thread("bar-chart", load_lottery_data, game)
+    key = (game.nombre, num, sorteos.version, width, height, format)
+    headers = {
+        DATASET_VERSION_HEADER: sorteos.version,
+        "ETag": etag_grafico(key)
+    }
 
-    if not number_dates:
-        raise HTTPException(
-            status_code=404,
-            detail=f"No data available for number {num}"
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    content = cache_graficos.get(key)
+    if content is None:
+        if not sorteos.conteos[num]:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No data available for number {num}"
+            )
+
+        with metrics.stage("compute"):
+            months, counts = serie_mensual(sorteos, num)
+        if not months:
+            raise HTTPException(
+                status_code=404,
+                detail="No dates available for this number"
+            )
+
+        buf = await run_in_process(
+            "bar-chart", graficBarras, months, counts, str(num),
+            width, height, format
         )
+        content = buf.getvalue()
+        cache_graficos.put(key, content)
 
-    dates_list = number_dates.get("fechas", [])
-    if not dates_list:
-        raise HTTPException(
-            status_code=404,
-            detail="No dates available for this number"
-        )
+    return Response(
+        content=content,
+        media_type=CHART_MEDIA_TYPES[format],
+        headers=headers
+    )
 
-    buf = graficBarras(dates_list, str(num))
-    return Response(content=buf.getvalue(), media_type="image/png")
+
+@router.get(
+    "/games",
+    summary="List the available games",
+    response_description="Returns each game's range and memory use"
+)
+def list_games() -> Dict[str, Any]:
+    """
+    List the registered games and which of them are loaded.
+
+    Games load on first use and the least recently used ones are evicted
+    when the loaded datasets exceed the configured memory budget.
+
+    Returns:
+        dict: Games with their number range, balls per draw and, if
+        loaded, approximate memory use in bytes
+    """
+    loaded = juegos_cargados()
+    return {
+        "games": [
+            {
+                **juego.describir(),
+                "loaded": juego.nombre in loaded,
+                "memory_bytes": loaded.get(juego.nombre),
+            }
+            for juego in JUEGOS.values()
+        ]
+    }
 
 
 @router.get(
@@ -215,9 +869,21 @@ async def generate_bar_chart(
     summary="Connect to Odoo and retrieve lottery data",
     response_description="Returns lottery data from Odoo"
 )
-async def connect_to_odoo() -> Dict[str, Any]:
+async def connect_to_odoo(
+    limit: Optional[int] = Query(
+        None, ge=1, description="Maximum number of records to return"
+    ),
+    offset: int = Query(0, ge=0, description="Number of records to skip")
+) -> Dict[str, Any]:
     """
-    Connect to Odoo server and retrieve lottery-related data.
+    Retrieve lottery-related data synchronized from Odoo.
+
+    Only records created or modified since the previous sync are fetched
+    from Odoo; the response is read from the local store.
+
+    Args:
+        limit: Maximum number of records to return
+        offset: Number of records to skip
 
     Returns:
         dict: Lottery data from Odoo
@@ -225,68 +891,61 @@ async def connect_to_odoo() -> Dict[str, Any]:
     Note:
         Requires valid Odoo credentials in environment variables
     """
-    # Connect to Odoo
-    common = xmlrpc.client.ServerProxy(f"{ODOO_URL}/xmlrpc/2/common")
-    user_id = common.authenticate(DB_NAME, ODOO_USER, ODOO_PASSWORD, {})
-
-    if not user_id:
-        logging.error("Authentication failed")
-        raise HTTPException(
-            status_code=401,
-            detail="Failed to authenticate with Odoo"
-        )
-
-    logging.info(f"User authenticated with ID: {user_id}")
+    return await run_in_io_thread(
+        "odoo", fetch_odoo_lottery_data, limit, offset
+    )
 
-    # Connect to Odoo model
-    models = xmlrpc.client.ServerProxy(f"{ODOO_URL}/xmlrpc/2/object")
 
-    # Get all fields from lottery.baloto model
-    fields_lottery = models.execute_kw(
-        DB_NAME,
-        user_id,
-        ODOO_PASSWORD,
-        "lottery.baloto",
-        "fields_get",
-        [],
-        {"attributes": ["string", "type"]}
-    )
+def fetch_odoo_lottery_data(
+    limit: Optional[int], offset: int
+) -> Dict[str, Any]:
+    """
+    Sync Odoo deltas and read the requested page from the local store.
 
-    all_fields = list(fields_lottery.keys())
-
-    # Get lottery types
-    lottery_types = models.execute_kw(
-        DB_NAME,
-        user_id,
-        ODOO_PASSWORD,
-        "lottery.baloto.type",
-        "search_read",
-        [[["name", "=", "MiLoto"]]],
-        {"fields": ["id"]}
-    )
+    If the sync fails, the records already in the local store are
+    served; the error is only raised when the store has nothing.
 
-    if not lottery_types:
-        raise HTTPException(
-            status_code=404,
-            detail="Lottery type 'MiLoto' not found"
-        )
+    Args:
+        limit: Maximum number of records to return
+        offset: Number of records to skip
 
-    # Search lottery data
-    lottery_data = models.execute_kw(
-        DB_NAME,
-        user_id,
-        ODOO_PASSWORD,
-        "lottery.baloto",
-        "search_read",
-        [[["lottery_type_id", "=", lottery_types[0]["id"]]]],
-        {"fields": all_fields}
-    )
+    Returns:
+        dict: Lottery data from Odoo
+    """
+    error = None
+    try:
+        synced = sincronizar_odoo()
+    except Exception as e:
+        logger.warning("Odoo sync failed, serving the local store: %s", e)
+        synced, error = 0, e
+    with metrics.stage("load"):
+        lottery_data = leer_registros(limit, offset)
 
     if not lottery_data:
+        if error is not None:
+            raise error
         raise HTTPException(
             status_code=404,
             detail="No lottery data found"
         )
 
-    logging.info(f"Retrieved lottery data: {lottery_data}")
+    logger.info(
+        "Odoo records served: %d (%d synced)", len(lottery_data), synced
+    )
     return {"result": lottery_data}
+
+
+@router.get(
+    "/odoo/metrics",
+    summary="Odoo client metrics",
+    response_description="Round trips, latency and pool usage"
+)
+def odoo_metrics() -> Dict[str, Any]:
+    """
+    Report the shared Odoo client's round trips and per-call latency.
+
+    Returns:
+        dict: Calls per remote method with count, errors and latency in
+        seconds, plus connection pool and metadata cache usage
+    """
+    return get_odoo_client().metrics()
@@ -24,14 +24,6 @@ import logging
 import random
 import string
 
-# Configure logging with UTF-8 encoding for proper character handling
-logging.basicConfig(
-    filename="logs/app.log",
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-    encoding='utf-8'
-)
-
 logger = logging.getLogger(__name__)
 
 router_password_key = APIRouter(
@@ -184,12 +176,12 @@ async def api_generate_password(
         HTTPException: If the length parameter is invalid.
     """
     try:
-        logger.info(f"Generating password of length {length}")
+        logger.info("Generating password of length %d", length)
         password = generate_password(length)
         logger.info("Password generated successfully")
         return {"password": password}
     except ValueError as e:
-        logger.error(f"Password generation failed: {str(e)}")
+        logger.error("Password generation failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 
@@ -229,5 +221,5 @@ async def api_validate_password(password: str) -> Dict[str, str]:
     """
     logger.info("Processing password validation request")
     result = validate_password(password)
-    logger.info(f"Password validation completed: {result['valid']}")
+    logger.info("Password validation completed: %s", result["valid"])
     return result
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from datetime import date
+from typing import List
+from app.config import TICKETS_BATCH_MAX
+
+
+class DrawRequest(BaseModel):
+    date: date
+    numbers: List[int]
+
+
+class DrawResponse(BaseModel):
+    game: str
+    draw: int
+    date: date
+    numbers: List[int]
+    version: str
+
+
+class TicketsRequest(BaseModel):
+    tickets: List[List[int]] = Field(
+        ..., min_length=1, max_length=TICKETS_BATCH_MAX
+    )
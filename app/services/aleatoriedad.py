@@ -0,0 +1,226 @@
+"""
+Pruebas de aleatoriedad del histórico por Monte Carlo.
+
+Se comparan tres estadísticos chi-cuadrado del histórico con los de
+muchos históricos simulados de sorteos justos del mismo tamaño: la
+frecuencia de cada número, la de cada par y la distribución de las
+distancias (en sorteos) entre apariciones consecutivas de un número. El
+p-valor empírico es la fracción de simulaciones con un estadístico igual
+o mayor que el observado.
+
+Las simulaciones se reparten en tareas de ``SIMULACIONES_POR_TAREA``
+históricos, cada una con su flujo de ``SeedSequence``. El reparto no
+depende del número de procesos, así que la misma semilla da siempre el
+mismo resultado.
+"""
+
+import math
+import numpy as np
+from app.config import MONTE_CARLO_SEMILLA, SIMULACIONES_POR_TAREA
+
+PRUEBAS = ("frequency", "pairs", "gaps")
+
+# Celdas (históricos × números × sorteos) por lote de simulaciones
+CELDAS_LOTE = 1 << 23
+
+# Probabilidad que deja la cola de distancias agrupada en el último tramo
+COLA_DISTANCIAS = 0.01
+
+
+def _limite_distancias(balotas, numeros):
+    """
+    Tramos del histograma de distancias: 1, 2, ..., y uno final para las
+    distancias iguales o mayores.
+    """
+    p = balotas / numeros
+    return max(2, math.ceil(1 + math.log(COLA_DISTANCIAS) / math.log(1 - p)))
+
+
+def _chi_cuadrado(observados, esperados):
+    """Chi-cuadrado por fila de ``observados`` (históricos × celdas)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terminos = (observados - esperados) ** 2 / esperados
+    return np.nan_to_num(terminos).sum(axis=1)
+
+
+def _estadisticos(historias, minimo, maximo, limite):
+    """
+    Estadísticos de frecuencia, pares y distancias de cada histórico.
+
+    Args:
+        historias: Arreglo (históricos × sorteos × balotas) en orden
+            cronológico; 0 indica celda vacía.
+        minimo: Menor número del juego.
+        maximo: Mayor número del juego.
+        limite: Tramos del histograma de distancias.
+
+    Returns:
+        np.ndarray: Matriz (históricos × 3) con los chi-cuadrado.
+    """
+    cantidad, sorteos, balotas = historias.shape
+    base = maximo + 1
+    numeros = maximo - minimo + 1
+    valores = historias.astype(np.int64)
+    historia = np.arange(cantidad, dtype=np.int64)[:, np.newaxis, np.newaxis]
+
+    conteos = np.bincount(
+        (valores + historia * base).ravel(), minlength=cantidad * base
+    ).reshape(cantidad, base)[:, minimo:]
+    frecuencia = _chi_cuadrado(
+        conteos, conteos.sum(axis=1, keepdims=True) / numeros
+    )
+
+    ordenadas = np.sort(valores, axis=2)
+    claves = [
+        ordenadas[:, :, i] * base + ordenadas[:, :, j]
+        for i in range(balotas) for j in range(i + 1, balotas)
+    ]
+    claves = np.stack(claves, axis=2) + historia * base * base
+    pares = np.bincount(
+        claves.ravel(), minlength=cantidad * base * base
+    ).reshape(cantidad, base, base)
+    filas, columnas = np.triu_indices(numeros, 1)
+    pares = pares[:, filas + minimo, columnas + minimo]
+    pares_chi = _chi_cuadrado(
+        pares, pares.sum(axis=1, keepdims=True) / len(filas)
+    )
+
+    # Posiciones de cada número agrupadas por (histórico, número)
+    posicion = np.arange(sorteos, dtype=np.int64)[np.newaxis, :, np.newaxis]
+    planos = (historia * base + valores) * sorteos + posicion
+    planos = np.sort(planos[valores > 0])
+    grupos = planos // sorteos
+    mismo = grupos[1:] == grupos[:-1]
+    distancias = np.minimum(np.diff(planos)[mismo], limite)
+    origen = grupos[1:][mismo] // base
+    histograma = np.bincount(
+        origen * (limite + 1) + distancias,
+        minlength=cantidad * (limite + 1)
+    ).reshape(cantidad, limite + 1)[:, 1:]
+
+    p = balotas / numeros
+    probabilidades = p * (1 - p) ** np.arange(limite - 1)
+    probabilidades = np.append(probabilidades, (1 - p) ** (limite - 1))
+    distancias_chi = _chi_cuadrado(
+        histograma,
+        histograma.sum(axis=1, keepdims=True) * probabilidades
+    )
+    return np.stack((frecuencia, pares_chi, distancias_chi), axis=1)
+
+
+def _simular(rng, cantidad, sorteos, balotas, minimo, maximo):
+    """
+    Históricos de sorteos justos: cada sorteo elige ``balotas`` números
+    distintos de forma uniforme, uno a uno entre los que quedan.
+    """
+    numeros = maximo - minimo + 1
+    total = cantidad * sorteos
+    elegidos = np.empty((total, balotas), dtype=np.int16)
+    for i in range(balotas):
+        valor = rng.integers(0, numeros - i, size=total, dtype=np.int16)
+        # Saltar los ya elegidos, en orden ascendente
+        for previo in np.sort(elegidos[:, :i], axis=1).T:
+            valor += valor >= previo
+        elegidos[:, i] = valor
+    return (elegidos + minimo).astype(np.uint8).reshape(
+        cantidad, sorteos, balotas
+    )
+
+
+def simular_estadisticos(semilla, cantidad, sorteos, balotas, minimo,
+                         maximo):
+    """
+    Estadísticos de ``cantidad`` históricos simulados.
+
+    Es la tarea que se ejecuta en el pool de procesos.
+
+    Args:
+        semilla: ``SeedSequence`` propia de la tarea.
+        cantidad: Históricos a simular.
+        sorteos: Sorteos por histórico.
+        balotas: Números por sorteo.
+        minimo: Menor número del juego.
+        maximo: Mayor número del juego.
+
+    Returns:
+        np.ndarray: Matriz (cantidad × 3) con los chi-cuadrado.
+    """
+    rng = np.random.default_rng(semilla)
+    limite = _limite_distancias(balotas, maximo - minimo + 1)
+    lote = max(1, CELDAS_LOTE // max(1, sorteos * (maximo + 1)))
+    resultados = []
+    for inicio in range(0, cantidad, lote):
+        historias = _simular(
+            rng, min(lote, cantidad - inicio), sorteos, balotas, minimo,
+            maximo
+        )
+        resultados.append(_estadisticos(historias, minimo, maximo, limite))
+    return np.concatenate(resultados)
+
+
+def tareas_simulacion(sorteos, simulaciones, semilla=MONTE_CARLO_SEMILLA):
+    """
+    Argumentos de cada tarea de ``simular_estadisticos``.
+
+    Returns:
+        list: Una tupla de argumentos por tarea.
+    """
+    tareas = math.ceil(simulaciones / SIMULACIONES_POR_TAREA)
+    semillas = np.random.SeedSequence(semilla).spawn(tareas)
+    balotas = sorteos.bolas.shape[1]
+    return [
+        (
+            hija,
+            min(SIMULACIONES_POR_TAREA,
+                simulaciones - i * SIMULACIONES_POR_TAREA),
+            len(sorteos), balotas, sorteos.numero_minimo,
+            sorteos.numero_maximo,
+        )
+        for i, hija in enumerate(semillas)
+    ]
+
+
+def estadisticos_observados(sorteos):
+    """Chi-cuadrado de frecuencia, pares y distancias del histórico."""
+    historia = sorteos.bolas_ventana((0, len(sorteos)))
+    limite = _limite_distancias(
+        sorteos.bolas.shape[1],
+        sorteos.numero_maximo - sorteos.numero_minimo + 1
+    )
+    return _estadisticos(
+        historia[np.newaxis], sorteos.numero_minimo, sorteos.numero_maximo,
+        limite
+    )[0]
+
+
+def resumir_pruebas(sorteos, observados, simulados, semilla):
+    """
+    Reporte de las pruebas: estadístico observado, grados de libertad,
+    media simulada y p-valor empírico ``(1 + mayores) / (1 + total)``.
+
+    ``simulados`` son los resultados de las tareas, en orden.
+    """
+    simulados = np.concatenate(simulados)
+    numeros = sorteos.numero_maximo - sorteos.numero_minimo + 1
+    libertad = (
+        numeros - 1,
+        numeros * (numeros - 1) // 2 - 1,
+        _limite_distancias(sorteos.bolas.shape[1], numeros) - 1,
+    )
+    pruebas = {}
+    for columna, nombre in enumerate(PRUEBAS):
+        valores = simulados[:, columna]
+        mayores = int(np.count_nonzero(valores >= observados[columna]))
+        pruebas[nombre] = {
+            "chi_square": round(float(observados[columna]), 4),
+            "degrees_of_freedom": libertad[columna],
+            "simulated_mean": round(float(valores.mean()), 4),
+            "p_value": round((1 + mayores) / (1 + len(valores)), 6),
+        }
+    return {
+        "draws": len(sorteos),
+        "simulations": len(simulados),
+        "simulated_draws": len(simulados) * len(sorteos),
+        "seed": semilla,
+        "tests": pruebas,
+    }
@@ -1,49 +1,288 @@
-import pandas as pd
-from collections import Counter, defaultdict
+import numpy as np
 from fastapi import HTTPException
-from itertools import combinations
+from app.services.combinaciones import (
+    contar_combinaciones, contar_subconjuntos, mayores_combinaciones
+)
+from app.services.sorteos import calcular_mascaras
 
+# Celdas (boletos × sorteos) de cada bloque al cruzar boletos con sorteos
+ELEMENTOS_BLOQUE = 1 << 18
 
-def calcular_frecuencia(df, fechas):
-    """Calcula la frecuencia y fechas de aparición de cada número."""
-    frecuencia = defaultdict(lambda: {"cantidad": 0, "fechas": []})
-    total_numeros = 0
+# Órdenes de calcular_recencia
+ORDENES_RECENCIA = ("overdue", "gap", "recent", "hot", "cold", "number")
 
-    for col in df.columns:
-        for index, num in df[col].items():
-            if pd.notna(num):
-                frecuencia[num]["cantidad"] += 1
-                frecuencia[num]["fechas"].append(fechas.iloc[index])
-                total_numeros += 1
 
-    for num in frecuencia:
-        frecuencia[num]["fechas"].sort(reverse=True)
-        frecuencia[num]["porcentaje"] = round(
-            (frecuencia[num]["cantidad"] / total_numeros) * 100, 2
-        )
+def _conteos_ventana(sorteos, ventana):
+    """Conteo por número de todo el histórico o de una ventana."""
+    if ventana is None:
+        return sorteos.conteos
+    return sorteos.indice_fechas.conteos(*ventana)
 
-    return dict(
-        sorted(
-            frecuencia.items(), key=lambda x: x[1]["cantidad"], reverse=True
+
+def _primera_aparicion(sorteos):
+    """
+    Posición de la primera aparición de cada número al recorrer las
+    balotas columna por columna, en el orden del archivo.
+    """
+    valores = sorteos.bolas.T.ravel()
+    numeros, primeras = np.unique(valores, return_index=True)
+    posicion = np.full(sorteos.numero_maximo + 1, len(valores), np.int64)
+    posicion[numeros] = primeras
+    return posicion
+
+
+def _datos_numero(sorteos, num, cantidad, total_numeros, ventana=None):
+    """Arma la entrada de frecuencia de un número a partir del índice."""
+    filas = sorteos.filas_numero(num)
+    if ventana is not None:
+        posiciones = sorteos.indice_fechas.posiciones[filas]
+        filas = filas[(posiciones >= ventana[0]) & (posiciones < ventana[1])]
+
+    return {
+        "cantidad": cantidad,
+        "fechas": sorteos.fechas(filas),
+        "porcentaje": round((cantidad / total_numeros) * 100, 2),
+    }
+
+
+def calcular_frecuencia(sorteos, ventana=None):
+    """
+    Calcula la frecuencia y fechas de aparición de cada número.
+
+    Args:
+        sorteos: Histórico de sorteos.
+        ventana: Posiciones cronológicas ``(inicio, fin)`` de
+            ``IndiceFechas.rango``; ``None`` para todo el histórico.
+    """
+    conteo = _conteos_ventana(sorteos, ventana)
+    total_numeros = int(conteo[1:].sum())
+
+    # Orden descendente por cantidad; a igualdad, el que aparece primero
+    # recorriendo el CSV columna por columna, como antes
+    numeros = np.flatnonzero(conteo[1:]) + 1
+    numeros = numeros[np.lexsort(
+        (_primera_aparicion(sorteos)[numeros], -conteo[numeros])
+    )]
+
+    return {
+        str(num): _datos_numero(
+            sorteos, num, int(conteo[num]), total_numeros, ventana
         )
+        for num in numeros.tolist()
+    }
+
+
+def frecuencia_numero(sorteos, num):
+    """
+    Calcula la frecuencia y fechas de aparición de un solo número.
+
+    Solo convierte a texto las fechas de ese número. Devuelve ``None`` si
+    el número nunca salió.
+    """
+    if not 0 < num <= sorteos.numero_maximo or not sorteos.conteos[num]:
+        return None
+    return _datos_numero(
+        sorteos, num, int(sorteos.conteos[num]),
+        int(sorteos.conteos[1:].sum())
     )
 
 
-def obtener_combinaciones_comunes(df):
-    """Obtiene las combinaciones más comunes de los sorteos."""
-    combinaciones = df.apply(
-        lambda row: tuple(sorted(map(str, row.dropna()))), axis=1
+def serie_mensual(sorteos, num):
+    """
+    Meses ("YYYY-MM") en los que salió ``num`` y cuántas veces en cada uno,
+    leídos de la matriz mensual precalculada.
+    """
+    matriz, primer_mes = sorteos.conteo_mensual
+    fila = matriz[num]
+    columnas = np.flatnonzero(fila)
+    meses = np.datetime_as_string(
+        (primer_mes + columnas).astype("datetime64[M]")
+    )
+    return meses.tolist(), fila[columnas].tolist()
+
+
+def obtener_combinaciones_comunes(sorteos, limite=None):
+    """
+    Obtiene las combinaciones más comunes de los sorteos, todas o las
+    ``limite`` primeras.
+    """
+    filas, conteos = sorteos.conteo_exactas()
+    # Orden estable: a igualdad de conteo, la que salió primero
+    orden = np.argsort(-conteos, kind="stable")[:limite]
+    combinaciones = np.sort(sorteos.bolas[filas[orden]], axis=1)
+
+    # Convertir claves de tupla a string para JSON, en orden numérico
+    return {
+        str(tuple(str(num) for num in fila if num)): veces
+        for fila, veces in zip(
+            combinaciones.tolist(), conteos[orden].tolist()
+        )
+    }
+
+
+def _validar_boletos(sorteos, boletos):
+    """
+    Convierte los boletos en una matriz con los números de cada uno en
+    orden ascendente.
+
+    Raises:
+        HTTPException: Si un boleto no tiene tantos números distintos como
+            balotas el sorteo o alguno está fuera del rango del juego.
+    """
+    balotas = sorteos.bolas.shape[1]
+    for posicion, boleto in enumerate(boletos):
+        if len(boleto) != balotas or len(set(boleto)) != balotas:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"Boleto {posicion}: debe tener {balotas} números "
+                    f"distintos"
+                )
+            )
+    if not boletos:
+        return np.empty((0, balotas), dtype=np.int64)
+
+    try:
+        numeros = np.sort(np.array(boletos, dtype=np.int64), axis=1)
+    except OverflowError:
+        # Algún número no cabe en int64: ya está fuera del rango del juego
+        fuera = np.array([
+            not all(-2 ** 63 <= n < 2 ** 63 for n in boleto)
+            for boleto in boletos
+        ])
+    else:
+        fuera = (
+            (numeros[:, 0] < sorteos.numero_minimo)
+            | (numeros[:, -1] > sorteos.numero_maximo)
+        )
+    if fuera.any():
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Boleto {int(np.argmax(fuera))}: los números deben estar "
+                f"entre {sorteos.numero_minimo} y {sorteos.numero_maximo}"
+            )
+        )
+    return numeros
+
+
+def buscar_boletos(sorteos, boletos):
+    """
+    Indica para cada boleto si salió exacto en algún sorteo y cuándo.
+
+    Cada boleto se resuelve con una búsqueda en ``indice_exactas``.
+
+    Raises:
+        HTTPException: Si algún boleto no es válido para el juego.
+    """
+    numeros = _validar_boletos(sorteos, boletos)
+    resultado = []
+    for fila, mascara in zip(
+        numeros.tolist(), calcular_mascaras(numeros).tolist()
+    ):
+        filas = sorteos.sorteos_exactos(mascara)
+        resultado.append({
+            "numbers": fila,
+            "drawn": len(filas) > 0,
+            "count": len(filas),
+            "dates": sorteos.fechas(filas) if len(filas) else [],
+        })
+    return resultado
+
+
+def aciertos_boletos(mascaras_boletos, mascaras, balotas):
+    """
+    Cruza cada boleto con todos los sorteos: ``AND`` de las máscaras y
+    conteo de bits encendidos.
+
+    Los boletos se procesan por bloques de ``ELEMENTOS_BLOQUE`` celdas
+    (boletos × sorteos) sobre los mismos arreglos intermedios, que así
+    caben en la caché del procesador.
+
+    Returns:
+        tuple: ``(mejor, conteo)``: el mayor número de aciertos de cada
+        boleto y la matriz (boletos × ``balotas + 1``) con los sorteos que
+        acertaron 0, 1, ..., ``balotas`` números.
+    """
+    total = len(mascaras_boletos)
+    mejor = np.zeros(total, dtype=np.int64)
+    conteo = np.zeros((total, balotas + 1), dtype=np.int64)
+    if not len(mascaras) or not total:
+        return mejor, conteo
+
+    paso = min(total, max(1, ELEMENTOS_BLOQUE // len(mascaras)))
+    cruce = np.empty((paso, len(mascaras)), dtype=np.uint64)
+    aciertos = np.empty((paso, len(mascaras)), dtype=np.uint8)
+    iguales = np.empty((paso, len(mascaras)), dtype=np.bool_)
+    for inicio in range(0, total, paso):
+        fin = min(inicio + paso, total)
+        filas = fin - inicio
+        np.bitwise_and(
+            mascaras_boletos[inicio:fin, np.newaxis], mascaras,
+            out=cruce[:filas]
+        )
+        np.bitwise_count(cruce[:filas], out=aciertos[:filas])
+        mejor[inicio:fin] = aciertos[:filas].max(axis=1)
+        for cantidad in range(1, balotas + 1):
+            np.equal(aciertos[:filas], cantidad, out=iguales[:filas])
+            conteo[inicio:fin, cantidad] = iguales[:filas].view(
+                np.uint8
+            ).sum(axis=1, dtype=np.int32)
+    conteo[:, 0] = len(mascaras) - conteo[:, 1:].sum(axis=1)
+    return mejor, conteo
+
+
+def puntuar_boletos(sorteos, boletos):
+    """
+    Compara cada boleto con todo el histórico.
+
+    Para cada boleto devuelve el mayor número de aciertos en un sorteo,
+    cuántos sorteos acertaron de 2 números en adelante y un puntaje por
+    frecuencia: la frecuencia media de sus números sobre la frecuencia
+    media de todos (1.0 = un boleto promedio).
+
+    Raises:
+        HTTPException: Si algún boleto no es válido para el juego.
+    """
+    numeros = _validar_boletos(sorteos, boletos)
+    balotas = numeros.shape[1]
+    mejor, conteo = aciertos_boletos(
+        calcular_mascaras(numeros), sorteos.mascaras, balotas
     )
-    conteo = dict(Counter(combinaciones).most_common(1000))
 
-    # Convertir claves de tupla a string para JSON
-    return {str(k): v for k, v in conteo.items()}
+    frecuencias = sorteos.conteos[
+        sorteos.numero_minimo:sorteos.numero_maximo + 1
+    ]
+    media = frecuencias.mean() if len(sorteos) else 0.0
+    if media:
+        puntajes = sorteos.conteos[numeros].mean(axis=1) / media
+    else:
+        puntajes = np.zeros(len(numeros))
+
+    return [
+        {
+            "numbers": fila,
+            "best_match": aciertos,
+            "matches": {
+                str(cantidad): veces
+                for cantidad, veces in enumerate(conteos) if cantidad >= 2
+            },
+            "frequency_score": round(puntaje, 4),
+        }
+        for fila, aciertos, conteos, puntaje in zip(
+            numeros.tolist(), mejor.tolist(), conteo.tolist(),
+            puntajes.tolist()
+        )
+    ]
 
 
-def calcular_probabilidades(df):
-    """Calcula las probabilidades de cada número en la lotería."""
-    frecuencia = df.apply(pd.value_counts).sum(axis=1).to_dict()
-    total_numeros = sum(frecuencia.values())
+def calcular_probabilidades(sorteos, ventana=None):
+    """
+    Calcula las probabilidades de cada número en la lotería, en todo el
+    histórico o en una ventana ``(inicio, fin)``.
+    """
+    conteo = _conteos_ventana(sorteos, ventana)
+    total_numeros = int(conteo[1:].sum())
 
     if total_numeros == 0:
         raise HTTPException(
@@ -51,28 +290,197 @@ def calcular_probabilidades(df):
             detail="No hay datos suficientes para calcular probabilidades"
         )
 
+    # A igualdad de probabilidad, los números en orden de texto ("10"
+    # antes que "9"), como los dejaba pandas
     return dict(
         sorted(
             {
-                num: round(
-                    (freq / total_numeros) * 100, 2
-                ) for num, freq in frecuencia.items()
+                str(num): round(
+                    float(conteo[num] / total_numeros) * 100, 2
+                ) for num in sorted(
+                    (np.flatnonzero(conteo[1:]) + 1).tolist(), key=str
+                )
             }.items(), key=lambda x: x[1], reverse=True)
         )
 
 
-def obtener_combinaciones_frecuentes(df, tamano=5):
-    """Obtiene las combinaciones más comunes con el tamaño especificado."""
-    todas_combinaciones = []
+def calcular_recencia(sorteos, orden="overdue", top=None, histograma=False):
+    """
+    Última aparición, sorteos sin salir y distancias de cada número.
+
+    Se lee del índice ``recencia``, sin recorrer el histórico. El retraso
+    (``overdue_ratio``) es la cantidad de sorteos sin salir sobre la
+    distancia media entre apariciones.
+
+    Args:
+        sorteos: Histórico de sorteos.
+        orden: ``overdue`` (más retrasados), ``gap`` (más sorteos sin
+            salir), ``recent`` (salidos hace menos), ``hot`` / ``cold``
+            (más / menos apariciones) o ``number``.
+        top: Cantidad de números a devolver (todos si es None).
+        histograma: Incluir el histograma de distancias de cada número.
+    """
+    recencia = sorteos.recencia
+    numeros = np.arange(sorteos.numero_minimo, sorteos.numero_maximo + 1)
+    ultima = recencia.ultima[numeros]
+    desde = np.where(
+        ultima >= 0, recencia.sorteos - 1 - ultima, recencia.sorteos
+    )
+    distancias = recencia.distancias[numeros]
+    cantidad = distancias.sum(axis=1)
+    con_distancias = cantidad > 0
+    media = np.full(len(numeros), np.nan)
+    media[con_distancias] = (
+        distancias[con_distancias] @ np.arange(distancias.shape[1])
+        / cantidad[con_distancias]
+    )
+    maxima = distancias.shape[1] - 1 - np.argmax(
+        distancias[:, ::-1] > 0, axis=1
+    )
+    retraso = desde / media
+    apariciones = sorteos.conteos[numeros]
+
+    claves = {
+        "overdue": -np.nan_to_num(retraso, nan=-1.0),
+        "gap": -desde,
+        "recent": desde,
+        "hot": -apariciones,
+        "cold": apariciones,
+        "number": numeros,
+    }
+    # A igualdad, el número menor primero
+    seleccion = np.lexsort((numeros, claves[orden]))[:top]
+    fechas = sorteos.fechas(recencia.ultima_fila[numeros[seleccion]])
+
+    resultado = []
+    for i, fecha in zip(seleccion.tolist(), fechas):
+        datos = {
+            "number": int(numeros[i]),
+            "last_seen": fecha if ultima[i] >= 0 else None,
+            "draws_since": int(desde[i]),
+            "appearances": int(apariciones[i]),
+            "mean_gap": (
+                round(float(media[i]), 2) if con_distancias[i] else None
+            ),
+            "max_gap": int(maxima[i]) if con_distancias[i] else None,
+            "overdue_ratio": (
+                round(float(retraso[i]), 3) if con_distancias[i] else None
+            ),
+        }
+        if histograma:
+            saltos = np.flatnonzero(distancias[i])
+            datos["gap_histogram"] = dict(zip(
+                map(str, saltos.tolist()), distancias[i, saltos].tolist()
+            ))
+        resultado.append(datos)
+    return resultado
+
+
+def _mayores_conteos(conteos, top):
+    """
+    Índices planos de los ``top`` mayores conteos positivos, de mayor a
+    menor y, a igualdad, en orden de índice.
+    """
+    plano = conteos.ravel()
+    top = min(top, int(np.count_nonzero(plano)))
+    if top == 0:
+        return np.empty(0, dtype=np.intp)
+
+    umbral = plano[np.argpartition(plano, -top)[-top]]
+    candidatos = np.flatnonzero(plano >= umbral)
+    orden = np.lexsort((candidatos, -plano[candidatos]))
+    return candidatos[orden[:top]]
+
+
+def _combinaciones_precalculadas(conteos, top):
+    """
+    Lee el top de un tensor de co-ocurrencia con solo las posiciones
+    ordenadas llenas (``[a, b]`` con ``a < b``, ``[a, b, c]``...).
+    """
+    indices = _mayores_conteos(conteos, top)
+    combinaciones = np.column_stack(np.unravel_index(indices, conteos.shape))
+    return _formatear_combinaciones(combinaciones, conteos.ravel()[indices])
+
+
+def _formatear_combinaciones(combinaciones, conteos):
+    return [
+        (tuple(sorted(map(str, combinacion))), int(conteo))
+        for combinacion, conteo in zip(combinaciones.tolist(), conteos)
+    ]
+
+
+def combinaciones_frecuentes_en(bolas, tamano, top, numero_maximo):
+    """
+    Cuenta desde cero las combinaciones de un subconjunto de sorteos.
+
+    Solo depende de arreglos, así que puede ejecutarse en otro proceso.
+    """
+    if tamano == 2 or tamano == 3:
+        return _combinaciones_precalculadas(
+            contar_subconjuntos(bolas, tamano, numero_maximo), top
+        )
+    conteo = contar_combinaciones(bolas, tamano, numero_maximo)
+    return _formatear_combinaciones(
+        *mayores_combinaciones(conteo, tamano, numero_maximo, top)
+    )
+
+
+def obtener_combinaciones_frecuentes(sorteos, tamano=5, top=10,
+                                     ventana=None):
+    """
+    Obtiene las combinaciones más comunes con el tamaño especificado.
 
-    # Recorremos cada fila (sorteo) y generamos combinaciones
-    for _, row in df.iterrows():
-        numeros = row.dropna().tolist()  # Eliminamos valores NaN
-        combinaciones_fila = list(combinations(sorted(numeros), tamano))
-        todas_combinaciones.extend(combinaciones_fila)
+    Con ``ventana`` los pares salen de los acumulados del índice de fechas;
+    los demás tamaños recuentan solo los sorteos de la ventana.
+    """
+    if ventana is not None:
+        if tamano == 2:
+            pares = sorteos.indice_fechas.pares(sorteos.bolas, *ventana)
+            return _combinaciones_precalculadas(np.triu(pares, 1), top)
+        return combinaciones_frecuentes_en(
+            sorteos.bolas_ventana(ventana), tamano, top,
+            sorteos.numero_maximo
+        )
 
-    # Contamos las combinaciones más comunes (convertimos las listas en tuplas)
-    conteo = Counter(map(tuple, todas_combinaciones))
+    if tamano == 2:
+        return _combinaciones_precalculadas(np.triu(sorteos.pares, 1), top)
+    if tamano == 3:
+        return _combinaciones_precalculadas(sorteos.triples, top)
 
-    # Contamos las combinaciones más comunes
-    return conteo.most_common(10)
+    return _formatear_combinaciones(
+        *mayores_combinaciones(
+            sorteos.conteo_combinaciones(tamano),
+            tamano,
+            sorteos.numero_maximo,
+            top
+        )
+    )
+
+
+def contar_coocurrencias(sorteos, numeros):
+    """
+    Cuenta los sorteos en los que salieron juntos dos o tres números.
+
+    Raises:
+        HTTPException: Si los números no son 2 o 3 valores distintos dentro
+            del rango del juego.
+    """
+    numeros = sorted(set(numeros))
+    if any(not sorteos.numero_minimo <= num <= sorteos.numero_maximo
+           for num in numeros):
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Los números deben estar entre {sorteos.numero_minimo} "
+                f"y {sorteos.numero_maximo}"
+            )
+        )
+    if len(numeros) == 2:
+        return int(sorteos.pares[numeros[0], numeros[1]])
+    if len(numeros) == 3:
+        return int(sorteos.triples[numeros[0], numeros[1], numeros[2]])
+
+    raise HTTPException(
+        status_code=400,
+        detail="Se requieren 2 o 3 números distintos"
+    )
@@ -0,0 +1,114 @@
+import numpy as np
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+
+# Sorteos procesados por bloque al contar combinaciones
+TAMANO_BLOQUE = 65536
+
+
+@lru_cache(maxsize=None)
+def _tabla_binomial(numero_maximo, tamano):
+    """Tabla ``C(x, i)`` para ``x < numero_maximo`` e ``i <= tamano``."""
+    return np.array([
+        [comb(x, i) for i in range(tamano + 1)]
+        for x in range(numero_maximo)
+    ], dtype=np.int64)
+
+
+def total_combinaciones(numero_maximo, tamano):
+    """Cantidad de combinaciones posibles de ``tamano`` números."""
+    return comb(numero_maximo, tamano)
+
+
+def rangos(combos, numero_maximo):
+    """
+    Codifica combinaciones ordenadas (una por fila, números desde 1) como un
+    único entero: su rango en el sistema combinatorio colexicográfico.
+
+    Los rangos son densos en ``[0, C(numero_maximo, tamano))``, así que los
+    conteos caben en un arreglo cuyo tamaño no depende del histórico.
+    """
+    tamano = combos.shape[1]
+    tabla = _tabla_binomial(numero_maximo, tamano)
+    x = combos.astype(np.intp) - 1
+    return tabla[x, np.arange(1, tamano + 1)].sum(axis=1)
+
+
+def desrangos(valores, numero_maximo, tamano):
+    """Decodifica rangos a combinaciones ordenadas (números desde 1)."""
+    tabla = _tabla_binomial(numero_maximo, tamano)
+    restos = np.asarray(valores, dtype=np.int64).copy()
+    combos = np.empty((len(restos), tamano), dtype=np.int64)
+
+    for i in range(tamano, 0, -1):
+        x = np.searchsorted(tabla[:, i], restos, side="right") - 1
+        restos -= tabla[x, i]
+        combos[:, i - 1] = x + 1
+
+    return combos
+
+
+def contar_combinaciones(bolas, tamano, numero_maximo):
+    """
+    Cuenta las combinaciones de ``tamano`` números de todos los sorteos.
+
+    Recorre la matriz por bloques y acumula en un arreglo denso indexado por
+    rango, de modo que la memoria pico no crece con el histórico.
+    """
+    posiciones = list(combinations(range(bolas.shape[1]), tamano))
+    conteo = np.zeros(total_combinaciones(numero_maximo, tamano), np.int64)
+    if not posiciones:
+        return conteo
+
+    for inicio in range(0, len(bolas), TAMANO_BLOQUE):
+        bloque = np.sort(bolas[inicio:inicio + TAMANO_BLOQUE], axis=1)
+        combos = bloque[:, posiciones].reshape(-1, tamano)
+        combos = combos[(combos != 0).all(axis=1)]
+        conteo += np.bincount(
+            rangos(combos, numero_maximo), minlength=len(conteo)
+        )
+
+    return conteo
+
+
+def contar_subconjuntos(bolas, tamano, numero_maximo):
+    """
+    Cuenta los subconjuntos de ``tamano`` números de todos los sorteos en
+    un arreglo denso ``(numero_maximo + 1) ** tamano`` indexado por los
+    números en orden ascendente.
+    """
+    base = numero_maximo + 1
+    pesos = base ** np.arange(tamano - 1, -1, -1, dtype=np.int64)
+    posiciones = list(combinations(range(bolas.shape[1]), tamano))
+    conteo = np.zeros(base ** tamano, dtype=np.int64)
+
+    for inicio in range(0, len(bolas), TAMANO_BLOQUE):
+        bloque = np.sort(bolas[inicio:inicio + TAMANO_BLOQUE], axis=1)
+        combos = bloque[:, posiciones].reshape(-1, tamano)
+        combos = combos[(combos != 0).all(axis=1)]
+        conteo += np.bincount(combos @ pesos, minlength=base ** tamano)
+
+    return conteo.reshape((base,) * tamano)
+
+
+def mayores_combinaciones(conteo, tamano, numero_maximo, top):
+    """
+    Devuelve las ``top`` combinaciones con más apariciones como
+    ``(combos, conteos)``, de mayor a menor y, a igualdad, en orden
+    lexicográfico.
+    """
+    top = min(top, int(np.count_nonzero(conteo)))
+    if top == 0:
+        return np.empty((0, tamano), dtype=np.int64), conteo[:0]
+
+    # Umbral del top a partir del histograma de conteos: los conteos son
+    # enteros pequeños con muchos empates, donde argpartition es lento
+    acumulado = np.cumsum(np.bincount(conteo)[::-1])
+    umbral = len(acumulado) - 1 - np.searchsorted(acumulado, top)
+    candidatos = np.flatnonzero(conteo >= umbral)
+    combos = desrangos(candidatos, numero_maximo, tamano)
+
+    orden = np.lexsort(tuple(combos.T[::-1]) + (-conteo[candidatos],))
+    orden = orden[:top]
+    return combos[orden], conteo[candidatos[orden]]
@@ -1,28 +1,300 @@
+import csv
+import io
+import logging
+import numpy as np
 import pandas as pd
 import os
+import threading
+from collections import OrderedDict
 from fastapi import HTTPException
-from app.config import FILE_PATH, COLUMNAS_EXCLUIR
+from pandas.tseries.api import guess_datetime_format
+from app.config import SNAPSHOT_ENABLED, MEMORIA_JUEGOS_MB
+from app.core import metrics
+from app.services.juegos import obtener_juego
+from app.services.sorteos import Sorteos, DIA_INVALIDO, dia_de_fecha
+from app.services.instantanea import leer_instantanea, escribir_instantanea
 
+logger = logging.getLogger(__name__)
 
-def cargar_datos():
-    """Carga y limpia los datos del archivo CSV."""
-    if not os.path.exists(FILE_PATH):
+_lock = threading.RLock()
+# Sorteos cargados por juego, del menos al más recientemente usado
+_sorteos = OrderedDict()
+_memoria = {}
+_candados = {}
+
+
+def _version_archivo(juego):
+    """
+    Identifica el contenido del CSV por su fecha de modificación y tamaño.
+
+    Raises:
+        HTTPException: Si el archivo no existe.
+    """
+    try:
+        stat = os.stat(juego.archivo)
+    except FileNotFoundError:
         raise HTTPException(
-            status_code=404, detail="Archivo Miloto.csv no encontrado"
+            status_code=404,
+            detail=(
+                f"Archivo {os.path.basename(juego.archivo)} no encontrado"
+            )
         )
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
 
-    df = pd.read_csv(FILE_PATH, dtype=str)
+def _leer_csv(juego, version):
+    """Parsea el CSV y construye la representación compacta."""
+    df = pd.read_csv(juego.archivo, dtype=str)
 
     if "Draw Date" not in df.columns:
         raise HTTPException(
             status_code=400, detail="No se encontró la columna 'Draw Date'"
         )
 
-    df["Draw Date"] = pd.to_datetime(
-        df["Draw Date"], errors="coerce"
-    ).dt.strftime('%Y-%m-%d')
+    fechas = pd.to_datetime(df["Draw Date"], errors="coerce")
+    dias = fechas.values.astype("datetime64[D]").astype(np.int64)
+    dias[fechas.isna().values] = DIA_INVALIDO
+
+    columnas = [
+        col for col in df.columns if col not in juego.columnas_excluir
+    ]
+    if len(columnas) != juego.balotas:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Se esperaban {juego.balotas} columnas de números y hay "
+                f"{len(columnas)}"
+            )
+        )
+    bolas = df[columnas].apply(pd.to_numeric, errors="coerce").fillna(0)
+
+    fuera_de_rango = (bolas != 0) & (
+        (bolas < juego.numero_minimo) | (bolas > juego.numero_maximo)
+    )
+    if fuera_de_rango.values.any():
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Hay números fuera del rango "
+                f"{juego.numero_minimo}-{juego.numero_maximo}"
+            )
+        )
+
+    return Sorteos(
+        bolas=np.ascontiguousarray(bolas.values, dtype=np.uint8),
+        dias=dias.astype(np.int32),
+        version=version,
+        numero_minimo=juego.numero_minimo,
+        numero_maximo=juego.numero_maximo,
+    )
+
+
+def _leer_sorteos(juego, version):
+    """
+    Abre la instantánea binaria si corresponde al CSV actual; si no,
+    parsea el CSV y la vuelve a escribir.
+    """
+    if SNAPSHOT_ENABLED:
+        arreglos = leer_instantanea(juego.archivo)
+        if (
+            arreglos is not None
+            and arreglos["bolas"].shape[1] == juego.balotas
+        ):
+            return Sorteos(
+                version=version,
+                numero_minimo=juego.numero_minimo,
+                numero_maximo=juego.numero_maximo,
+                **arreglos
+            )
+
+    sorteos = _leer_csv(juego, version)
+    if SNAPSHOT_ENABLED:
+        escribir_instantanea(sorteos, juego.archivo)
+    return sorteos
+
+
+def construir_instantanea(nombre=None):
+    """Parsea el CSV de un juego y escribe su instantánea binaria."""
+    juego = obtener_juego(nombre)
+    sorteos = _leer_csv(juego, _version_archivo(juego))
+    escribir_instantanea(sorteos, juego.archivo)
+    return sorteos
+
+
+def _candado(nombre):
+    """Candado que serializa la carga y las escrituras de un juego."""
+    with _lock:
+        return _candados.setdefault(nombre, threading.RLock())
+
+
+def _registrar(nombre, sorteos):
+    """
+    Guarda los sorteos de un juego como los más recientes y descarga los
+    menos usados mientras se pase del presupuesto de memoria. El juego
+    recién guardado nunca se descarga.
+    """
+    memoria = sorteos.memoria()
+    presupuesto = MEMORIA_JUEGOS_MB * 1024 * 1024
+    with _lock:
+        _sorteos[nombre] = sorteos
+        _sorteos.move_to_end(nombre)
+        _memoria[nombre] = memoria
+        while len(_sorteos) > 1 and sum(_memoria.values()) > presupuesto:
+            descartado, _ = _sorteos.popitem(last=False)
+            liberados = _memoria.pop(descartado)
+            logger.info(
+                "Dataset %s evicted (%d MiB)", descartado, liberados >> 20
+            )
+
+
+def juegos_cargados():
+    """Bytes aproximados de cada juego en memoria, del menos usado al más."""
+    with _lock:
+        return {nombre: _memoria[nombre] for nombre in _sorteos}
+
+
+def _muestras_juegos():
+    """Memoria de cada juego cargado, para ``/metrics``."""
+    return [
+        ("dataset_memory_bytes", "Approximate memory of a loaded game",
+         {"game": nombre}, memoria)
+        for nombre, memoria in juegos_cargados().items()
+    ]
+
+
+metrics.register_collector(_muestras_juegos)
+
+
+def cargar_datos(nombre=None):
+    """
+    Devuelve los sorteos actuales del juego ``nombre`` (el juego por
+    defecto si es None).
+
+    Cada juego se carga la primera vez que se pide y su CSV solo se
+    vuelve a leer cuando cambia su fecha de modificación o su tamaño; el
+    resto de llamadas reutilizan la copia en memoria. Al cargar se usa la
+    instantánea binaria si sigue vigente. Las peticiones en curso
+    conservan los sorteos que obtuvieron aunque el archivo se recargue o
+    el juego se descargue entre tanto.
+
+    Raises:
+        HTTPException: Si el juego no existe o su archivo no es válido.
+    """
+    juego = obtener_juego(nombre)
+    version = _version_archivo(juego)
+
+    sorteos = _sorteos.get(juego.nombre)
+    if sorteos is not None and sorteos.version == version:
+        with _lock:
+            if juego.nombre in _sorteos:
+                _sorteos.move_to_end(juego.nombre)
+        return sorteos
+
+    with _candado(juego.nombre):
+        # Otro hilo pudo cargar el juego mientras esperábamos el candado
+        sorteos = _sorteos.get(juego.nombre)
+        if sorteos is None or sorteos.version != version:
+            sorteos = _leer_sorteos(juego, version).precalcular()
+            _registrar(juego.nombre, sorteos)
+        return sorteos
+
+
+def _validar_sorteo(juego, sorteos, numeros, fecha):
+    """Comprueba que un sorteo nuevo encaje en el histórico actual."""
+    balotas = juego.balotas
+    if len(numeros) != balotas or len(set(numeros)) != balotas:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El sorteo debe tener {balotas} números distintos"
+        )
+
+    if any(not juego.numero_minimo <= num <= juego.numero_maximo
+           for num in numeros):
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Los números deben estar entre "
+                f"{juego.numero_minimo} y {juego.numero_maximo}"
+            )
+        )
+
+    dia = dia_de_fecha(fecha)
+    ultimo_dia = sorteos.ultimo_dia()
+    if ultimo_dia is not None and dia <= ultimo_dia:
+        raise HTTPException(
+            status_code=400,
+            detail="La fecha debe ser posterior al último sorteo"
+        )
+    return dia
+
+
+def _escribir_fila(juego, numeros, fecha):
+    """
+    Agrega el sorteo al final del CSV con una sola escritura.
+
+    La fecha se escribe en el mismo formato que la primera fila para que
+    el parseo del archivo completo siga siendo uniforme.
+    """
+    with open(juego.archivo, newline="", encoding="utf-8") as archivo:
+        lector = csv.reader(archivo)
+        columnas = next(lector)
+        primera = next(lector, None)
+
+    formato = "%Y-%m-%d"
+    if primera:
+        muestra = primera[columnas.index("Draw Date")]
+        formato = guess_datetime_format(muestra) or formato
+
+    valores = iter(numeros)
+    fila = [
+        fecha.strftime(formato) if col == "Draw Date"
+        else "" if col in juego.columnas_excluir
+        else next(valores)
+        for col in columnas
+    ]
+    texto = io.StringIO()
+    csv.writer(texto, lineterminator="\n").writerow(fila)
+
+    descriptor = os.open(juego.archivo, os.O_RDWR | os.O_APPEND)
+    try:
+        # Si el archivo no termina en salto de línea, la fila va en su
+        # propia línea
+        contenido = texto.getvalue()
+        if os.lseek(descriptor, 0, os.SEEK_END) > 0:
+            os.lseek(descriptor, -1, os.SEEK_END)
+            if os.read(descriptor, 1) != b"\n":
+                contenido = "\n" + contenido
+        os.write(descriptor, contenido.encode("utf-8"))
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def agregar_sorteo(numeros, fecha, nombre=None):
+    """
+    Agrega un sorteo al CSV y a los datos en memoria sin volver a parsear.
+
+    Los conteos, co-ocurrencias, combinaciones y últimas apariciones se
+    actualizan a partir de la instantánea actual.
+
+    Args:
+        numeros: Números del sorteo.
+        fecha: Fecha del sorteo (``datetime.date``).
+        nombre: Juego al que pertenece (el juego por defecto si es None).
+
+    Returns:
+        Sorteos: La nueva instantánea, que ya incluye el sorteo.
+
+    Raises:
+        HTTPException: Si el sorteo no es válido para el histórico actual.
+    """
+    juego = obtener_juego(nombre)
+    numeros = sorted(int(num) for num in numeros)
+    with _candado(juego.nombre):
+        sorteos = cargar_datos(juego.nombre)
+        dia = _validar_sorteo(juego, sorteos, numeros, fecha)
+        _escribir_fila(juego, numeros, fecha)
 
-    return df.drop(
-        columns=[col for col in COLUMNAS_EXCLUIR if col in df.columns],
-        errors="ignore"
-    ), df["Draw Date"]
+        sorteos = sorteos.agregar(numeros, dia, _version_archivo(juego))
+        _registrar(juego.nombre, sorteos)
+        return sorteos
@@ -1,37 +1,48 @@
-import matplotlib.pyplot as plt
 import io
-import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from app.config import CHART_CACHE_SIZE
+from app.core import metrics
+from app.utils.cache import LRUCache
 
+# Imágenes ya renderizadas por (juego, número, versión, ancho, alto,
+# formato)
+cache_graficos = LRUCache(CHART_CACHE_SIZE)
+metrics.register_cache("charts", cache_graficos)
 
-def graficBarras(fechas_lista, num):
+
+def etag_grafico(clave):
+    """ETag fuerte de un gráfico, derivado de su clave en la caché."""
+    juego, num, version, ancho, alto, formato = clave
+    return f'"{juego}-{version}-{num}-{ancho:g}x{alto:g}.{formato}"'
+
+
+def graficBarras(meses, frecuencias, num, ancho=12, alto=6, formato="png"):
     """
     Genera un gráfico de barras con la frecuencia de aparición de un número
     por mes. Devuelve la imagen en un buffer de memoria (BytesIO).
-    """
-    if not fechas_lista:
-        raise ValueError("No hay datos disponibles para generar el gráfico.")
 
-    # 📌 Convertir fechas a DataFrame
-    df_fechas = pd.DataFrame(fechas_lista, columns=["fecha"])
-    df_fechas["fecha"] = pd.to_datetime(df_fechas["fecha"], errors="coerce")
-    df_fechas = df_fechas.dropna(subset=["fecha"])  # Eliminar fechas inválidas
+    Usa directamente una ``Figure`` con lienzo Agg, sin el estado global de
+    pyplot, así que se pueden generar varios gráficos a la vez.
 
-    if df_fechas.empty:
-        raise ValueError("No hay fechas válidas después del procesamiento.")
-
-    # 📌 Crear columna Año-Mes en formato "YYYY-MM" para asegurar orden correcto
-    df_fechas["año_mes"] = df_fechas["fecha"].dt.strftime("%Y-%m")
-
-    # 📌 Contar frecuencia de cada mes
-    conteo_mensual = df_fechas["año_mes"].value_counts().reset_index()
-    conteo_mensual.columns = ["año_mes", "frecuencia"]
-    conteo_mensual = conteo_mensual.sort_values("año_mes")
+    Args:
+        meses: Etiquetas "YYYY-MM" en orden cronológico.
+        frecuencias: Apariciones del número en cada mes.
+        num: Número graficado (para el título).
+        ancho: Ancho de la figura en pulgadas.
+        alto: Alto de la figura en pulgadas.
+        formato: Formato de imagen que entiende matplotlib ("png", "svg").
+    """
+    if not meses:
+        raise ValueError("No hay datos disponibles para generar el gráfico.")
 
     # 📌 Crear gráfico de barras
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig = Figure(figsize=(ancho, alto))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
     ax.bar(
-        conteo_mensual["año_mes"],
-        conteo_mensual["frecuencia"],
+        meses,
+        frecuencias,
         color="skyblue",
         edgecolor="black"
     )
@@ -41,16 +52,15 @@ def graficBarras(fechas_lista, num):
     ax.set_ylabel("Frecuencia")
 
     # 📌 Mejorar formato del eje X
-    ax.set_xticks(range(len(conteo_mensual["año_mes"])))
-    ax.set_xticklabels(conteo_mensual["año_mes"], rotation=45, ha="right")
+    ax.set_xticks(range(len(meses)))
+    ax.set_xticklabels(meses, rotation=45, ha="right")
 
     # 📌 Ajustar diseño para evitar cortes de texto
-    plt.tight_layout()
+    fig.tight_layout()
 
     # 📌 Guardar imagen en memoria
     buf = io.BytesIO()
-    plt.savefig(buf, format="png", bbox_inches="tight")
-    plt.close(fig)
+    fig.savefig(buf, format=formato, bbox_inches="tight")
     buf.seek(0)
 
     return buf
@@ -0,0 +1,160 @@
+"""
+Instantánea binaria del CSV de sorteos.
+
+Junto al CSV se guarda un directorio ``<nombre>.snapshot`` con la matriz
+de bolas, los días y las máscaras en archivos ``.npy`` y un encabezado
+JSON con el hash del CSV del que salieron. Si el CSV no cambió, los
+arreglos se abren con ``mmap`` en vez de volver a parsear el texto.
+
+Construirla a mano (sin argumento, la del juego por defecto)::
+
+    python -m app.services.instantanea [juego]
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMATO = 1
+ARREGLOS = ("bolas", "dias", "mascaras")
+
+
+def ruta_instantanea(ruta_csv):
+    """Directorio de la instantánea de ``ruta_csv``."""
+    return os.path.splitext(ruta_csv)[0] + ".snapshot"
+
+
+def hash_archivo(ruta):
+    """Hash BLAKE2b del contenido de un archivo."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(ruta, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(1 << 20), b""):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def _leer_encabezado(directorio):
+    try:
+        with open(os.path.join(directorio, "header.json")) as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+
+def leer_instantanea(ruta_csv):
+    """
+    Abre la instantánea de ``ruta_csv`` si corresponde al CSV actual.
+
+    La comparación de tamaño y fecha de modificación evita leer el CSV;
+    solo si el tamaño coincide pero la fecha no (p. ej. tras copiarlo)
+    se compara el hash del contenido.
+
+    Returns:
+        dict: Arreglos ``bolas``, ``dias`` y ``mascaras`` mapeados en
+        memoria (solo lectura), o None si no hay instantánea vigente.
+    """
+    directorio = ruta_instantanea(ruta_csv)
+    encabezado = _leer_encabezado(directorio)
+    if not encabezado or encabezado.get("formato") != FORMATO:
+        return None
+
+    stat = os.stat(ruta_csv)
+    if stat.st_size != encabezado["csv_tamano"]:
+        return None
+    if stat.st_mtime_ns != encabezado["csv_mtime_ns"]:
+        if hash_archivo(ruta_csv) != encabezado["csv_hash"]:
+            return None
+
+    try:
+        arreglos = {
+            nombre: np.load(
+                os.path.join(directorio, f"{nombre}.npy"), mmap_mode="r"
+            )
+            for nombre in ARREGLOS
+        }
+    except (OSError, ValueError) as e:
+        logger.warning("Snapshot %s unreadable: %s", directorio, e)
+        return None
+
+    # Un escritor concurrente pudo dejar arreglos de otra versión
+    if any(len(arreglo) != encabezado["sorteos"]
+           for arreglo in arreglos.values()):
+        return None
+    return arreglos
+
+
+def escribir_instantanea(sorteos, ruta_csv):
+    """
+    Guarda los arreglos de ``sorteos`` como instantánea de ``ruta_csv``.
+
+    Cada archivo se escribe aparte y se mueve a su lugar con
+    ``os.replace``; el encabezado va al final, así que una instantánea a
+    medio escribir nunca parece vigente. Los errores solo se registran:
+    sin instantánea, la carga vuelve al CSV.
+    """
+    directorio = ruta_instantanea(ruta_csv)
+    try:
+        stat = os.stat(ruta_csv)
+        if f"{stat.st_mtime_ns:x}-{stat.st_size:x}" != sorteos.version:
+            # El CSV cambió después de parsearlo
+            return
+        encabezado = {
+            "formato": FORMATO,
+            "csv_hash": hash_archivo(ruta_csv),
+            "csv_tamano": stat.st_size,
+            "csv_mtime_ns": stat.st_mtime_ns,
+            "sorteos": len(sorteos),
+            "balotas": int(sorteos.bolas.shape[1]),
+        }
+        os.makedirs(directorio, exist_ok=True)
+
+        # Si el CSV cambió mientras se guardaba, el encabezado anterior
+        # ya no coincide y la instantánea se descarta
+        try:
+            os.remove(os.path.join(directorio, "header.json"))
+        except FileNotFoundError:
+            pass
+
+        for nombre in ARREGLOS:
+            _reemplazar(
+                directorio, f"{nombre}.npy",
+                lambda archivo, n=nombre: np.save(
+                    archivo, np.ascontiguousarray(getattr(sorteos, n))
+                )
+            )
+        _reemplazar(
+            directorio, "header.json",
+            lambda archivo: archivo.write(
+                json.dumps(encabezado, indent=2).encode()
+            )
+        )
+    except OSError as e:
+        logger.warning("Could not write snapshot %s: %s", directorio, e)
+
+
+def _reemplazar(directorio, nombre, escribir):
+    """Escribe un archivo temporal y lo mueve atómicamente a ``nombre``."""
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            escribir(archivo)
+        os.chmod(temporal, 0o644)
+        os.replace(temporal, os.path.join(directorio, nombre))
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+if __name__ == "__main__":
+    import sys
+    from app.services.data_loader import construir_instantanea
+    from app.services.juegos import obtener_juego
+
+    juego = obtener_juego(sys.argv[1] if len(sys.argv) > 1 else None)
+    construir_instantanea(juego.nombre)
+    print(f"Snapshot written to {ruta_instantanea(juego.archivo)}")
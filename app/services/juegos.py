@@ -0,0 +1,98 @@
+"""
+Juegos de lotería que puede analizar la API.
+
+Cada juego declara su archivo de sorteos, el rango de números y cuántas
+balotas salen por sorteo. El juego "miloto" sale de ``app.config``; los
+demás se leen del JSON de ``GAMES_FILE``.
+"""
+
+import json
+import os
+from fastapi import HTTPException
+from app.config import (
+    FILE_PATH, COLUMNAS_EXCLUIR, NUMERO_MINIMO, NUMERO_MAXIMO, BALOTAS,
+    JUEGOS_ARCHIVO, JUEGO_POR_DEFECTO
+)
+
+# Las máscaras por sorteo son de 64 bits y el bit 0 no se usa
+NUMERO_LIMITE = 63
+
+
+class Juego:
+    """
+    Definición de un juego.
+
+    Attributes:
+        nombre: Identificador del juego en la API.
+        archivo: Ruta del CSV de sorteos.
+        numero_minimo: Menor número que puede salir.
+        numero_maximo: Mayor número que puede salir.
+        balotas: Números por sorteo.
+        columnas_excluir: Columnas del CSV que no son números.
+    """
+
+    def __init__(self, nombre, archivo, numero_minimo=NUMERO_MINIMO,
+                 numero_maximo=NUMERO_MAXIMO, balotas=BALOTAS,
+                 columnas_excluir=COLUMNAS_EXCLUIR):
+        if not 1 <= numero_minimo <= numero_maximo <= NUMERO_LIMITE:
+            raise ValueError(
+                f"Juego {nombre}: el rango debe estar entre 1 y "
+                f"{NUMERO_LIMITE}"
+            )
+        if not 1 <= balotas <= numero_maximo - numero_minimo + 1:
+            raise ValueError(f"Juego {nombre}: balotas fuera de rango")
+        self.nombre = nombre
+        self.archivo = archivo
+        self.numero_minimo = numero_minimo
+        self.numero_maximo = numero_maximo
+        self.balotas = balotas
+        self.columnas_excluir = set(columnas_excluir)
+
+    def describir(self):
+        """Datos públicos del juego."""
+        return {
+            "name": self.nombre,
+            "min_number": self.numero_minimo,
+            "max_number": self.numero_maximo,
+            "balls": self.balotas,
+        }
+
+
+def leer_juegos(ruta):
+    """
+    Lee las definiciones de juegos de un archivo JSON.
+
+    Las rutas de los archivos de sorteos son relativas al JSON.
+    """
+    with open(ruta, encoding="utf-8") as archivo:
+        definiciones = json.load(archivo)
+
+    base = os.path.dirname(os.path.abspath(ruta))
+    juegos = {}
+    for nombre, datos in definiciones.items():
+        datos = dict(datos)
+        datos["archivo"] = os.path.join(base, datos["archivo"])
+        juegos[nombre] = Juego(nombre, **datos)
+    return juegos
+
+
+JUEGOS = {"miloto": Juego("miloto", FILE_PATH)}
+if JUEGOS_ARCHIVO:
+    JUEGOS.update(leer_juegos(JUEGOS_ARCHIVO))
+if JUEGO_POR_DEFECTO not in JUEGOS:
+    raise ValueError(f"Juego por defecto desconocido: {JUEGO_POR_DEFECTO}")
+
+
+def obtener_juego(nombre=None):
+    """
+    Devuelve el juego ``nombre`` (el juego por defecto si es None).
+
+    Raises:
+        HTTPException: Si el juego no existe.
+    """
+    juego = JUEGOS.get(nombre or JUEGO_POR_DEFECTO)
+    if juego is None:
+        raise HTTPException(
+            status_code=404, detail=f"Juego '{nombre}' no encontrado"
+        )
+    return juego
@@ -0,0 +1,250 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from fastapi import HTTPException
+from app.config import (
+    ODOO_STORE_PATH,
+    ODOO_LOTTERY_TYPE,
+    ODOO_PAGE_SIZE,
+    ODOO_SYNC_INTERVAL,
+    ODOO_FIELDS,
+    ODOO_DRAW_DATE_FIELD,
+    ODOO_NUMBER_FIELDS,
+)
+from app.core.odoo.client import get_odoo_client
+from app.services.data_loader import cargar_datos, agregar_sorteo
+from app.services.sorteos import dia_de_fecha
+
+logger = logging.getLogger(__name__)
+
+# Tipos de campo que no se sincronizan por defecto (pesados o relaciones)
+TIPOS_EXCLUIDOS = {"binary", "one2many", "many2many", "html"}
+
+_lock = threading.Lock()
+_ultima_sincronizacion = None
+
+
+def _conectar():
+    """Abre el almacén local y crea las tablas si no existen."""
+    os.makedirs(os.path.dirname(os.path.abspath(ODOO_STORE_PATH)),
+                exist_ok=True)
+    conexion = sqlite3.connect(ODOO_STORE_PATH)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute(
+        "CREATE TABLE IF NOT EXISTS registros ("
+        "id INTEGER PRIMARY KEY, write_date TEXT, datos TEXT NOT NULL)"
+    )
+    conexion.execute(
+        "CREATE TABLE IF NOT EXISTS estado ("
+        "clave TEXT PRIMARY KEY, valor TEXT NOT NULL)"
+    )
+    return conexion
+
+
+def _leer_estado(conexion, clave):
+    fila = conexion.execute(
+        "SELECT valor FROM estado WHERE clave = ?", (clave,)
+    ).fetchone()
+    return json.loads(fila[0]) if fila else None
+
+
+def _guardar_estado(conexion, clave, valor):
+    conexion.execute(
+        "INSERT OR REPLACE INTO estado (clave, valor) VALUES (?, ?)",
+        (clave, json.dumps(valor))
+    )
+
+
+def _campos(cliente):
+    """
+    Campos a pedir a Odoo. Sin ``ODOO_FIELDS`` se usan los campos simples
+    del modelo, que el cliente guarda en caché.
+    """
+    campos = ODOO_FIELDS or cliente.fields(
+        "lottery.baloto", exclude_types=TIPOS_EXCLUIDOS
+    )
+    return sorted(set(campos) | {"id", "write_date"})
+
+
+def _tipo_loteria(cliente):
+    """Id de ``lottery.baloto.type`` del juego configurado."""
+    tipo = cliente.lookup_id("lottery.baloto.type", ODOO_LOTTERY_TYPE)
+    if tipo is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Lottery type '{ODOO_LOTTERY_TYPE}' not found"
+        )
+    return tipo
+
+
+def _leer_cursor(conexion):
+    """
+    Último ``(write_date, id)`` guardado, o None si nunca se sincronizó.
+
+    Los almacenes anteriores solo guardaban la marca de agua; con id 0 se
+    vuelven a pedir una vez los registros de esa misma marca.
+    """
+    cursor = _leer_estado(conexion, "cursor")
+    if cursor:
+        return cursor["write_date"], cursor["id"]
+    marca = _leer_estado(conexion, "write_date")
+    return (marca, 0) if marca else None
+
+
+def _dominio_desde(tipo, cursor):
+    """
+    Dominio de los registros posteriores a ``cursor`` en el orden
+    ``write_date, id``: ``write_date > w`` o ``write_date = w`` e
+    ``id > i``.
+    """
+    dominio = [["lottery_type_id", "=", tipo]]
+    if cursor is not None:
+        marca, ultimo_id = cursor
+        dominio += [
+            "|",
+            ["write_date", ">", marca],
+            "&", ["write_date", "=", marca], ["id", ">", ultimo_id],
+        ]
+    return dominio
+
+
+def _agregar_a_analisis(registros):
+    """
+    Agrega al histórico del análisis los sorteos de Odoo posteriores al
+    último sorteo cargado.
+    """
+    sorteos = cargar_datos()
+    ultimo_dia = sorteos.ultimo_dia()
+    candidatos = []
+
+    for registro in registros:
+        try:
+            fecha = date.fromisoformat(
+                str(registro[ODOO_DRAW_DATE_FIELD])[:10]
+            )
+            numeros = [int(registro[campo]) for campo in ODOO_NUMBER_FIELDS]
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Odoo record %s is not a draw", registro.get("id"))
+            continue
+        if ultimo_dia is None or dia_de_fecha(fecha) > ultimo_dia:
+            candidatos.append((fecha, numeros))
+
+    for fecha, numeros in sorted(candidatos):
+        try:
+            agregar_sorteo(numeros, fecha)
+        except HTTPException as e:
+            logger.warning("Odoo draw %s skipped: %s", fecha, e.detail)
+
+
+def sincronizar_odoo(cliente=None, forzar=False):
+    """
+    Trae de Odoo los registros de ``lottery.baloto`` creados o modificados
+    desde la última sincronización y los guarda en el almacén local.
+
+    Pide solo los campos necesarios, por páginas de ``ODOO_PAGE_SIZE``
+    ordenadas por ``(write_date, id)``. Cada página empieza después del
+    último registro de la anterior (paginación por clave, no por
+    desplazamiento), así que un registro editado durante la
+    sincronización no desplaza a los demás: pasa al final y se trae
+    también. El cursor ``(write_date, id)`` se guarda después de cada
+    página, así que una sincronización interrumpida continúa donde quedó
+    y los registros del borde no se vuelven a descargar.
+
+    Dentro de ``ODOO_SYNC_INTERVAL`` segundos desde el intento anterior,
+    haya fallado o no, no se consulta Odoo; tampoco mientras otra
+    sincronización está en curso. Así, si Odoo no responde, las
+    peticiones no lo reintentan una tras otra y se sirven del almacén.
+
+    Args:
+        cliente: Cliente de Odoo; por defecto el compartido.
+        forzar: Sincronizar aunque no haya pasado el intervalo, esperando
+            a la sincronización en curso si la hay.
+
+    Returns:
+        int: Registros recibidos de Odoo.
+    """
+    global _ultima_sincronizacion
+
+    if not _lock.acquire(blocking=forzar):
+        return 0
+    try:
+        if (
+            not forzar
+            and _ultima_sincronizacion is not None
+            and time.monotonic() - _ultima_sincronizacion < ODOO_SYNC_INTERVAL
+        ):
+            return 0
+
+        _ultima_sincronizacion = time.monotonic()
+        cliente = cliente or get_odoo_client()
+        conexion = _conectar()
+        recibidos = []
+        try:
+            campos = _campos(cliente)
+            tipo = _tipo_loteria(cliente)
+            cursor = _leer_cursor(conexion)
+
+            while True:
+                pagina = cliente.execute_kw(
+                    "lottery.baloto",
+                    "search_read",
+                    [_dominio_desde(tipo, cursor)],
+                    {
+                        "fields": campos,
+                        "limit": ODOO_PAGE_SIZE,
+                        "order": "write_date asc, id asc",
+                    }
+                )
+                if pagina:
+                    conexion.executemany(
+                        "INSERT OR REPLACE INTO registros "
+                        "(id, write_date, datos) VALUES (?, ?, ?)",
+                        [
+                            (r["id"], r.get("write_date"), json.dumps(r))
+                            for r in pagina
+                        ]
+                    )
+                    ultimo = pagina[-1]
+                    cursor = (ultimo.get("write_date"), ultimo["id"])
+                    _guardar_estado(
+                        conexion, "cursor",
+                        {"write_date": cursor[0], "id": cursor[1]}
+                    )
+                    conexion.commit()
+                    recibidos.extend(pagina)
+
+                if len(pagina) < ODOO_PAGE_SIZE:
+                    break
+        finally:
+            conexion.close()
+
+        logger.info("Odoo sync received %d records", len(recibidos))
+    finally:
+        _lock.release()
+
+    if recibidos and ODOO_DRAW_DATE_FIELD and ODOO_NUMBER_FIELDS:
+        _agregar_a_analisis(recibidos)
+    return len(recibidos)
+
+
+def leer_registros(limite=None, desplazamiento=0):
+    """
+    Lee del almacén local los registros sincronizados, por id.
+
+    Args:
+        limite: Máximo de registros; ``None`` para todos.
+        desplazamiento: Registros a saltar.
+    """
+    conexion = _conectar()
+    try:
+        filas = conexion.execute(
+            "SELECT datos FROM registros ORDER BY id LIMIT ? OFFSET ?",
+            (-1 if limite is None else limite, desplazamiento)
+        ).fetchall()
+    finally:
+        conexion.close()
+    return [json.loads(datos) for (datos,) in filas]
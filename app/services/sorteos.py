@@ -0,0 +1,641 @@
+import numpy as np
+from datetime import date
+from functools import cached_property
+from itertools import combinations
+from app.config import NUMERO_MINIMO, NUMERO_MAXIMO
+from app.services.combinaciones import (
+    contar_combinaciones, contar_subconjuntos, rangos
+)
+
+# Marca de fecha no válida en el arreglo de días
+DIA_INVALIDO = np.iinfo(np.int32).min
+
+# Cada cuántos sorteos se guarda un acumulado de pares
+INTERVALO_PARES = 256
+
+
+def calcular_mascaras(bolas):
+    """
+    Convierte la matriz de bolas en una máscara de 64 bits por sorteo.
+
+    El bit ``n`` está encendido si el número ``n`` salió en el sorteo; las
+    celdas vacías (0) no encienden ningún bit.
+    """
+    bits = np.left_shift(np.uint64(1), bolas.astype(np.uint64))
+    return np.bitwise_or.reduce(bits, axis=1) & ~np.uint64(1)
+
+
+def dia_de_fecha(fecha):
+    """Convierte un ``datetime.date`` a días desde 1970-01-01."""
+    return (fecha - date(1970, 1, 1)).days
+
+
+def meses_de_dias(dias):
+    """Convierte días desde 1970-01-01 a meses desde 1970-01."""
+    return dias.astype("datetime64[D]").astype("datetime64[M]").astype(
+        np.int64
+    )
+
+
+def numeros_de_mascara(mascara):
+    """Lista ordenada de los números encendidos en una máscara."""
+    return [num for num in range(1, 64) if mascara >> num & 1]
+
+
+def _bytes_de(valor):
+    """Bytes de los arreglos de NumPy contenidos en ``valor``."""
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (tuple, list)):
+        return sum(_bytes_de(item) for item in valor)
+    if isinstance(valor, dict):
+        return sum(_bytes_de(item) for item in valor.values())
+    if isinstance(valor, (_Reserva, IndiceFechas, IndiceRecencia)):
+        return _bytes_de(vars(valor))
+    return 0
+
+
+class _Reserva:
+    """
+    Arreglo con capacidad de sobra que comparten instantáneas sucesivas.
+
+    Cada instantánea ve solo su prefijo, así que escribir más allá de
+    ``largo`` no altera a las anteriores.
+    """
+
+    def __init__(self, datos):
+        capacidad = max(2 * len(datos), 16)
+        self.datos = np.empty((capacidad,) + datos.shape[1:], datos.dtype)
+        self.datos[:len(datos)] = datos
+        self.largo = len(datos)
+
+
+def _agregar_fila(reserva, arreglo, fila):
+    """
+    Agrega ``fila`` al final de ``arreglo`` en O(1) amortizado.
+
+    Returns:
+        tuple: La reserva usada y la vista con la fila agregada.
+    """
+    largo = len(arreglo)
+    if (
+        reserva is None
+        or reserva.largo != largo
+        or largo == len(reserva.datos)
+    ):
+        reserva = _Reserva(arreglo)
+    reserva.datos[largo] = fila
+    reserva.largo = largo + 1
+    return reserva, reserva.datos[:largo + 1]
+
+
+def _conteos_por_sorteo(bolas, numero_maximo):
+    """Matriz (sorteos × números) con cuántas veces salió cada número."""
+    base = numero_maximo + 1
+    filas = np.repeat(np.arange(len(bolas)), bolas.shape[1])
+    planos = filas * base + bolas.ravel()
+    return np.bincount(planos, minlength=len(bolas) * base).reshape(-1, base)
+
+
+def _pares_de(bolas, numero_maximo):
+    """Conteo de pares ``[a, b]`` con ``a < b`` de los sorteos dados."""
+    return contar_subconjuntos(bolas, 2, numero_maximo).astype(np.int32)
+
+
+class IndiceFechas:
+    """
+    Sorteos en orden cronológico con conteos acumulados para consultar
+    ventanas de fechas sin recorrer el histórico.
+
+    Attributes:
+        orden: Fila de cada sorteo, del más antiguo al más reciente.
+        posiciones: Posición cronológica de cada fila (inversa de ``orden``).
+        dias: Días de los sorteos en orden cronológico.
+        acumulados: ``acumulados[i]`` cuenta cada número en los primeros
+            ``i`` sorteos cronológicos.
+        acumulados_pares: Conteo de pares en los primeros
+            ``j * INTERVALO_PARES`` sorteos, para cada ``j``.
+    """
+
+    def __init__(self, orden, posiciones, dias, acumulados,
+                 acumulados_pares):
+        self.orden = orden
+        self.posiciones = posiciones
+        self.dias = dias
+        self.acumulados = acumulados
+        self.acumulados_pares = acumulados_pares
+        self._reservas = {}
+
+    @classmethod
+    def construir(cls, bolas, dias, numero_maximo=NUMERO_MAXIMO):
+        orden = np.argsort(dias, kind="stable")
+        posiciones = np.empty_like(orden)
+        posiciones[orden] = np.arange(len(orden))
+
+        base = numero_maximo + 1
+        acumulados = np.zeros((len(orden) + 1, base), dtype=np.int32)
+        np.cumsum(_conteos_por_sorteo(bolas[orden], numero_maximo), axis=0,
+                  out=acumulados[1:])
+
+        puntos = len(orden) // INTERVALO_PARES
+        acumulados_pares = np.zeros((puntos + 1, base, base), dtype=np.int32)
+        for j in range(puntos):
+            bloque = orden[j * INTERVALO_PARES:(j + 1) * INTERVALO_PARES]
+            acumulados_pares[j + 1] = (
+                acumulados_pares[j] + _pares_de(bolas[bloque], numero_maximo)
+            )
+
+        return cls(orden, posiciones, dias[orden], acumulados,
+                   acumulados_pares)
+
+    def __len__(self):
+        return len(self.orden)
+
+    @property
+    def numero_maximo(self):
+        return self.acumulados.shape[1] - 1
+
+    def rango(self, desde=None, hasta=None, ultimos=None):
+        """
+        Posiciones cronológicas ``(inicio, fin)`` de una ventana.
+
+        Args:
+            desde: Primer día incluido (días desde 1970-01-01).
+            hasta: Último día incluido.
+            ultimos: Quedarse solo con los últimos N sorteos de la ventana.
+        """
+        inicio, fin = 0, len(self)
+        if desde is not None:
+            inicio = int(np.searchsorted(self.dias, desde, side="left"))
+        if hasta is not None:
+            fin = int(np.searchsorted(self.dias, hasta, side="right"))
+        fin = max(inicio, fin)
+        if ultimos is not None:
+            inicio = max(inicio, fin - ultimos)
+        return inicio, fin
+
+    def conteos(self, inicio, fin):
+        """Veces que salió cada número en la ventana."""
+        return self.acumulados[fin] - self.acumulados[inicio]
+
+    def pares(self, bolas, inicio, fin):
+        """
+        Matriz simétrica de pares de la ventana: diferencia de los
+        acumulados guardados más los sorteos de los bordes.
+        """
+        j_inicio = -(-inicio // INTERVALO_PARES)
+        j_fin = fin // INTERVALO_PARES
+        if j_inicio <= j_fin:
+            pares = (
+                self.acumulados_pares[j_fin] - self.acumulados_pares[j_inicio]
+            )
+            bordes = np.concatenate((
+                self.orden[inicio:j_inicio * INTERVALO_PARES],
+                self.orden[j_fin * INTERVALO_PARES:fin],
+            ))
+            pares = pares + _pares_de(bolas[bordes], self.numero_maximo)
+        else:
+            pares = _pares_de(
+                bolas[self.orden[inicio:fin]], self.numero_maximo
+            )
+        return pares + pares.T
+
+    def agregado(self, bolas, fila, dia):
+        """
+        Devuelve el índice con la fila ``fila`` (el sorteo más reciente,
+        ya presente en ``bolas``) al final.
+        """
+        conteo = (
+            self.acumulados[-1]
+            + _conteos_por_sorteo(bolas[[fila]], self.numero_maximo)[0]
+        )
+        columnas = {}
+        reservas = {}
+        for nombre, valor in (
+            ("orden", fila), ("posiciones", len(self)), ("dias", dia),
+            ("acumulados", conteo)
+        ):
+            reservas[nombre], columnas[nombre] = _agregar_fila(
+                self._reservas.get(nombre), getattr(self, nombre), valor
+            )
+
+        acumulados_pares = self.acumulados_pares
+        if len(columnas["orden"]) % INTERVALO_PARES == 0:
+            bloque = columnas["orden"][-INTERVALO_PARES:]
+            reservas["acumulados_pares"], acumulados_pares = _agregar_fila(
+                self._reservas.get("acumulados_pares"),
+                acumulados_pares,
+                acumulados_pares[-1]
+                + _pares_de(bolas[bloque], self.numero_maximo)
+            )
+        elif "acumulados_pares" in self._reservas:
+            reservas["acumulados_pares"] = self._reservas["acumulados_pares"]
+
+        nuevo = IndiceFechas(acumulados_pares=acumulados_pares, **columnas)
+        nuevo._reservas = reservas
+        return nuevo
+
+
+class IndiceRecencia:
+    """
+    Última aparición de cada número y distancias entre apariciones
+    seguidas, medidas en sorteos cronológicos.
+
+    Attributes:
+        ultima: Posición cronológica de la última aparición (-1 si nunca
+            salió).
+        ultima_fila: Fila del sorteo de la última aparición (-1 si nunca).
+        distancias: ``distancias[n, d]`` cuenta las veces que ``n`` volvió
+            a salir ``d`` sorteos después de su aparición anterior.
+        sorteos: Sorteos incluidos en el índice.
+    """
+
+    def __init__(self, ultima, ultima_fila, distancias, sorteos):
+        self.ultima = ultima
+        self.ultima_fila = ultima_fila
+        self.distancias = distancias
+        self.sorteos = sorteos
+
+    @classmethod
+    def construir(cls, bolas, dias, numero_maximo=NUMERO_MAXIMO):
+        """
+        Construye el índice con un único ordenamiento de las apariciones
+        por (número, posición cronológica).
+        """
+        base = numero_maximo + 1
+        orden = np.argsort(dias, kind="stable")
+        cronologicas = bolas[orden].astype(np.int64)
+        posiciones = np.broadcast_to(
+            np.arange(len(orden), dtype=np.int64)[:, np.newaxis],
+            cronologicas.shape
+        )
+        validas = cronologicas > 0
+        claves = np.sort(
+            cronologicas[validas] * len(orden) + posiciones[validas]
+        )
+        numeros = claves // max(len(orden), 1)
+        posiciones = claves - numeros * len(orden)
+
+        # La última clave de cada número es su aparición más reciente
+        finales = np.append(numeros[1:] != numeros[:-1], True)[:len(numeros)]
+        ultima = np.full(base, -1, dtype=np.int64)
+        ultima[numeros[finales]] = posiciones[finales]
+        ultima_fila = np.full(base, -1, dtype=np.int64)
+        vistos = ultima >= 0
+        ultima_fila[vistos] = orden[ultima[vistos]]
+
+        seguidas = numeros[1:] == numeros[:-1]
+        saltos = np.diff(posiciones)[seguidas]
+        ancho = int(saltos.max()) + 1 if len(saltos) else 1
+        distancias = np.bincount(
+            numeros[1:][seguidas] * ancho + saltos, minlength=base * ancho
+        ).reshape(base, ancho).astype(np.int32)
+        return cls(ultima, ultima_fila, distancias, len(orden))
+
+    def agregado(self, numeros, fila):
+        """
+        Devuelve el índice con un sorteo más, el más reciente, en la fila
+        ``fila``. El costo no depende del tamaño del histórico.
+        """
+        numeros = np.asarray(numeros, dtype=np.int64)
+        numeros = numeros[numeros > 0]
+        posicion = self.sorteos
+        anteriores = self.ultima[numeros]
+        vistos = anteriores >= 0
+        saltos = posicion - anteriores[vistos]
+
+        distancias = self.distancias
+        ancho = max(distancias.shape[1], int(saltos.max(initial=0)) + 1)
+        nuevas = np.zeros((distancias.shape[0], ancho), dtype=np.int32)
+        nuevas[:, :distancias.shape[1]] = distancias
+        np.add.at(nuevas, (numeros[vistos], saltos), 1)
+
+        ultima = self.ultima.copy()
+        ultima[numeros] = posicion
+        ultima_fila = self.ultima_fila.copy()
+        ultima_fila[numeros] = fila
+        return IndiceRecencia(ultima, ultima_fila, nuevas, posicion + 1)
+
+
+class Sorteos:
+    """
+    Histórico de sorteos en formato compacto.
+
+    Attributes:
+        bolas: Matriz ``uint8`` (sorteos × bolas); 0 indica celda vacía.
+        dias: Fecha de cada sorteo como días desde 1970-01-01 (``int32``).
+        mascaras: Máscara ``uint64`` con los números de cada sorteo.
+        version: Identificador del archivo del que se construyó.
+        numero_minimo: Menor número que puede salir en el juego.
+        numero_maximo: Mayor número que puede salir en el juego.
+    """
+
+    def __init__(self, bolas, dias, version, mascaras=None,
+                 numero_minimo=NUMERO_MINIMO, numero_maximo=NUMERO_MAXIMO):
+        self.bolas = bolas
+        self.dias = dias
+        self.numero_minimo = numero_minimo
+        self.numero_maximo = numero_maximo
+        self.mascaras = (
+            calcular_mascaras(bolas) if mascaras is None else mascaras
+        )
+        self.version = version
+        self._combinaciones = {}
+        self._reservas = {}
+
+    def __len__(self):
+        return len(self.bolas)
+
+    @cached_property
+    def conteos(self):
+        """Veces que salió cada número (índice = número, 0 = vacías)."""
+        return np.bincount(
+            self.bolas.ravel(), minlength=self.numero_maximo + 1
+        )
+
+    @cached_property
+    def apariciones(self):
+        """
+        Índice de apariciones agrupado por número.
+
+        Devuelve ``(filas, inicios, largo)``: las filas de
+        ``filas[inicios[n]:inicios[n + 1]]`` son los sorteos en los que salió
+        ``n``, del más reciente al más antiguo, entre los primeros ``largo``
+        sorteos. Se construye con un único ordenamiento de toda la matriz;
+        los sorteos agregados después se buscan en ``filas_numero``.
+        """
+        numeros = self.bolas.ravel()
+        filas = np.repeat(
+            np.arange(len(self.bolas), dtype=np.int32), self.bolas.shape[1]
+        )
+        orden = np.lexsort((-self.dias[filas].astype(np.int64), numeros))
+        inicios = np.zeros(self.numero_maximo + 2, dtype=np.int64)
+        np.cumsum(np.bincount(numeros, minlength=self.numero_maximo + 1),
+                  out=inicios[1:])
+        return filas[orden], inicios, len(self.bolas)
+
+    @cached_property
+    def indice_exactas(self):
+        """
+        Índice de sorteos por combinación exacta.
+
+        Devuelve ``(grupos, filas, inicios, largo)``: ``grupos`` asocia la
+        máscara de cada combinación a su grupo ``g`` y
+        ``filas[inicios[g]:inicios[g + 1]]`` son los sorteos, en orden
+        ascendente, en los que salió entre los primeros ``largo``. Se
+        construye con un único ``np.unique``; los sorteos agregados después
+        se buscan en ``sorteos_exactos``.
+        """
+        unicas, inversa, conteos = np.unique(
+            self.mascaras, return_inverse=True, return_counts=True
+        )
+        filas = np.argsort(inversa, kind="stable").astype(np.int32)
+        inicios = np.zeros(len(unicas) + 1, dtype=np.int64)
+        np.cumsum(conteos, out=inicios[1:])
+        grupos = dict(zip(unicas.tolist(), range(len(unicas))))
+        return grupos, filas, inicios, len(self.bolas)
+
+    def conteo_exactas(self):
+        """
+        Combinaciones exactas distintas en orden de primera aparición.
+
+        Devuelve ``(filas, conteos)``: la primera fila en que salió cada
+        combinación y las veces que salió.
+        """
+        _, primeras, conteos = np.unique(
+            self.mascaras, return_index=True, return_counts=True
+        )
+        orden = np.argsort(primeras)
+        return primeras[orden], conteos[orden]
+
+    def sorteos_exactos(self, mascara):
+        """
+        Filas de los sorteos con exactamente los números de ``mascara``,
+        en orden ascendente.
+        """
+        grupos, filas, inicios, largo = self.indice_exactas
+        grupo = grupos.get(mascara)
+        if grupo is None:
+            filas = filas[:0]
+        else:
+            filas = filas[inicios[grupo]:inicios[grupo + 1]]
+        if largo == len(self):
+            return filas
+
+        # Sorteos agregados después de construir el índice (los más nuevos)
+        nuevas = np.flatnonzero(self.mascaras[largo:] == mascara) + largo
+        return np.concatenate((filas, nuevas.astype(filas.dtype)))
+
+    @cached_property
+    def pares(self):
+        """
+        Matriz simétrica ``(N + 1) × (N + 1)`` con las veces que cada par de
+        números salió en el mismo sorteo.
+        """
+        pares = contar_subconjuntos(self.bolas, 2, self.numero_maximo)
+        return pares + pares.T
+
+    @cached_property
+    def triples(self):
+        """
+        Tensor ``(N + 1)³`` con las veces que salió cada trío. Solo se llenan
+        las posiciones ordenadas ``[a, b, c]`` con ``a < b < c``.
+        """
+        return contar_subconjuntos(self.bolas, 3, self.numero_maximo)
+
+    @cached_property
+    def conteo_mensual(self):
+        """
+        Veces que salió cada número por mes.
+
+        Devuelve ``(matriz, primer_mes)``: ``matriz[n, m]`` cuenta las
+        apariciones de ``n`` en el mes ``primer_mes + m`` (meses desde
+        1970-01). Los sorteos sin fecha válida no se cuentan.
+        """
+        filas = self.numero_maximo + 1
+        validos = self.dias != DIA_INVALIDO
+        if not validos.any():
+            return np.zeros((filas, 0), dtype=np.int32), 0
+
+        meses = meses_de_dias(self.dias[validos])
+        primer_mes = int(meses.min())
+        columnas = int(meses.max()) - primer_mes + 1
+        bolas = self.bolas[validos]
+
+        planos = (
+            bolas.astype(np.int64) * columnas
+            + (meses - primer_mes)[:, np.newaxis]
+        ).ravel()
+        matriz = np.bincount(
+            planos, minlength=filas * columnas
+        ).reshape(filas, columnas).astype(np.int32)
+        return matriz, primer_mes
+
+    @cached_property
+    def recencia(self):
+        """Índice de últimas apariciones y distancias de cada número."""
+        return IndiceRecencia.construir(
+            self.bolas, self.dias, self.numero_maximo
+        )
+
+    @cached_property
+    def indice_fechas(self):
+        """Índice cronológico para consultas por ventana de fechas."""
+        return IndiceFechas.construir(
+            self.bolas, self.dias, self.numero_maximo
+        )
+
+    def ultimo_dia(self):
+        """
+        Día del sorteo más reciente, o None si no hay sorteos. Se lee del
+        índice cronológico, sin recorrer el histórico.
+        """
+        if not len(self):
+            return None
+        return int(self.indice_fechas.dias[-1])
+
+    def bolas_ventana(self, ventana):
+        """Filas de los sorteos de una ventana cronológica (inicio, fin)."""
+        inicio, fin = ventana
+        return self.bolas[self.indice_fechas.orden[inicio:fin]]
+
+    def conteo_combinaciones(self, tamano):
+        """
+        Conteo denso de las combinaciones de ``tamano`` números indexado por
+        rango combinatorio (ver ``app.services.combinaciones``).
+        """
+        conteo = self._combinaciones.get(tamano)
+        if conteo is None:
+            conteo = contar_combinaciones(
+                self.bolas, tamano, self.numero_maximo
+            )
+            self._combinaciones[tamano] = conteo
+        return conteo
+
+    def precalcular(self):
+        """Construye los índices derivados que usan los endpoints."""
+        self.conteos
+        self.apariciones
+        self.pares
+        self.triples
+        self.indice_exactas
+        self.indice_fechas
+        self.recencia
+        self.conteo_mensual
+        self.conteo_combinaciones(4)
+        self.conteo_combinaciones(5)
+        return self
+
+    def agregar(self, numeros, dia, version):
+        """
+        Devuelve una nueva instantánea con un sorteo más al final.
+
+        Los índices que ya estén construidos se actualizan a partir de los
+        de esta instancia, con un costo que no depende del tamaño del
+        histórico; esta instancia no cambia. El sorteo nuevo debe ser
+        posterior a todos los anteriores.
+
+        Args:
+            numeros: Números distintos del sorteo, en orden ascendente.
+            dia: Fecha del sorteo en días desde 1970-01-01.
+            version: Versión del archivo que ya incluye el sorteo.
+        """
+        fila = np.zeros(self.bolas.shape[1], dtype=np.uint8)
+        fila[:len(numeros)] = numeros
+        mascara = calcular_mascaras(fila[np.newaxis, :])
+
+        reservas = {}
+        columnas = {}
+        for nombre, valor in (
+            ("bolas", fila), ("dias", dia), ("mascaras", mascara[0])
+        ):
+            reservas[nombre], columnas[nombre] = _agregar_fila(
+                self._reservas.get(nombre), getattr(self, nombre), valor
+            )
+
+        nuevo = Sorteos(
+            version=version, numero_minimo=self.numero_minimo,
+            numero_maximo=self.numero_maximo, **columnas
+        )
+        nuevo._reservas = reservas
+        indice = len(self)
+        derivados = self.__dict__
+
+        if "conteos" in derivados:
+            nuevo.conteos = self.conteos.copy()
+            np.add.at(nuevo.conteos, fila, 1)
+        if "apariciones" in derivados:
+            nuevo.apariciones = self.apariciones
+        if "pares" in derivados:
+            nuevo.pares = self.pares.copy()
+            for a, b in combinations(numeros, 2):
+                nuevo.pares[a, b] += 1
+                nuevo.pares[b, a] += 1
+        if "triples" in derivados:
+            nuevo.triples = self.triples.copy()
+            for trio in combinations(numeros, 3):
+                nuevo.triples[trio] += 1
+        if "indice_exactas" in derivados:
+            nuevo.indice_exactas = self.indice_exactas
+        if "conteo_mensual" in derivados:
+            matriz, primer_mes = self.conteo_mensual
+            mes = int(meses_de_dias(np.array([dia]))[0])
+            if matriz.shape[1] == 0:
+                primer_mes = mes
+            columna = mes - primer_mes
+            ancho = max(matriz.shape[1], columna + 1)
+            nueva = np.zeros((matriz.shape[0], ancho), dtype=matriz.dtype)
+            nueva[:, :matriz.shape[1]] = matriz
+            np.add.at(nueva[:, columna], fila, 1)
+            nuevo.conteo_mensual = nueva, primer_mes
+        if "recencia" in derivados:
+            nuevo.recencia = self.recencia.agregado(numeros, indice)
+        if "indice_fechas" in derivados:
+            nuevo.indice_fechas = self.indice_fechas.agregado(
+                nuevo.bolas, indice, dia
+            )
+        for tamano, conteo in self._combinaciones.items():
+            combos = np.array(list(combinations(numeros, tamano)))
+            conteo = conteo.copy()
+            if len(combos):
+                conteo[rangos(combos, self.numero_maximo)] += 1
+            nuevo._combinaciones[tamano] = conteo
+
+        return nuevo
+
+    def memoria(self):
+        """
+        Bytes aproximados de los arreglos y los índices ya construidos.
+
+        Los arreglos mapeados desde la instantánea cuentan completos,
+        aunque el sistema pueda descartar sus páginas.
+        """
+        total = 0
+        for nombre, valor in vars(self).items():
+            if nombre == "indice_exactas":
+                # El diccionario de grupos se estima por entrada
+                total += _bytes_de(valor) + len(valor[0]) * 100
+            else:
+                total += _bytes_de(valor)
+        return total
+
+    def filas_numero(self, num):
+        """Sorteos en los que salió ``num``, del más reciente al primero."""
+        filas, inicios, largo = self.apariciones
+        filas = filas[inicios[num]:inicios[num + 1]]
+        if largo == len(self):
+            return filas
+
+        # Sorteos agregados después de construir el índice (los más nuevos)
+        bit = np.uint64(1) << np.uint64(num)
+        nuevas = np.flatnonzero(self.mascaras[largo:] & bit)[::-1] + largo
+        return np.concatenate((nuevas.astype(filas.dtype), filas))
+
+    def fechas(self, indices=None):
+        """Convierte los días de los sorteos indicados a 'YYYY-MM-DD'."""
+        dias = self.dias if indices is None else self.dias[indices]
+        texto = np.datetime_as_string(dias.astype("datetime64[D]"))
+        return [
+            None if dia == DIA_INVALIDO else fecha
+            for dia, fecha in zip(dias.tolist(), texto.tolist())
+        ]
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with hit/miss counters.
+
+    Args:
+        maxsize: Maximum number of entries kept
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value for ``key`` or None.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Any: The cached value, or None on a miss
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store ``value`` under ``key``, evicting the oldest entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TTLCache:
+    """
+    Thread-safe cache whose entries expire ``ttl`` seconds after being
+    stored, with hit/miss counters.
+
+    Expired entries are kept ``stale`` more seconds so callers can serve
+    them while they refresh the value (stale-while-revalidate).
+
+    Args:
+        ttl: Seconds an entry stays fresh
+        stale: Seconds an expired entry can still be served by ``lookup``
+        maxsize: Maximum number of entries; unbounded if None
+    """
+
+    def __init__(
+        self, ttl: float, stale: float = 0.0, maxsize: Optional[int] = None
+    ):
+        self.ttl = ttl
+        self.stale = stale
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # Insertion order is expiry order, since every entry gets the same
+        # ttl: the first entry is always the closest to expiring
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Hashable) -> Optional[Tuple[Any, bool]]:
+        """
+        Return ``(value, fresh)`` for ``key``, or None if missing or past
+        its stale window.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            tuple: The cached value and whether it is still fresh
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] + self.stale <= now:
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1], entry[0] > now
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value for ``key`` or None if missing or expired.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Any: The cached value, or None on a miss
+        """
+        found = self.lookup(key)
+        if found is None or not found[1]:
+            return None
+        return found[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store ``value`` under ``key`` for ``ttl`` seconds, evicting the
+        entries closest to expiring if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
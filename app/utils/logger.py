@@ -1,20 +1,181 @@
+"""
+Application logging.
+
+:func:`configure_logging` is the only place that sets up handlers. Log
+calls put the record on a bounded in-memory queue and return; a
+``QueueListener`` thread formats the records and writes them to a
+size-rotated file. Messages are formatted on that thread, not by the
+caller, and long ones are truncated to ``LOG_MAX_MESSAGE`` characters.
+If the writer falls behind and the queue fills up, new records are
+dropped and counted instead of blocking the request path.
+"""
+
+import atexit
 import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional, Tuple
+
+from app.config import (
+    LOG_BACKUP_COUNT,
+    LOG_FILE,
+    LOG_LEVEL,
+    LOG_MAX_BYTES,
+    LOG_MAX_MESSAGE,
+    LOG_QUEUE_SIZE,
+)
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_handler: Optional["DroppingQueueHandler"] = None
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+class TruncatingFormatter(logging.Formatter):
+    """
+    Formatter that cuts messages longer than ``max_length`` characters.
+
+    Args:
+        fmt: Record format
+        max_length: Longest message kept whole
+    """
+
+    def __init__(self, fmt: str, max_length: int):
+        super().__init__(fmt)
+        self.max_length = max_length
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if len(message) > self.max_length:
+            record.msg = (
+                f"{message[:self.max_length]}... "
+                f"[{len(message) - self.max_length} chars truncated]"
+            )
+            record.args = None
+        return super().format(record)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks: when the queue is full the record
+    is dropped and counted.
+
+    Records are queued as they are; the listener merges the message and
+    its arguments, so objects passed as arguments should not be mutated
+    after the call.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Handler.handle holds the handler lock around emit
+            self.dropped += 1
+
+
+class _BlockingStopListener(QueueListener):
+    """Listener whose stop waits for room in a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+def _output_handler() -> logging.Handler:
+    if not LOG_FILE:
+        return logging.StreamHandler()
+    directory = os.path.dirname(LOG_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return RotatingFileHandler(
+        LOG_FILE,
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+
+
+def configure_logging() -> None:
+    """
+    Route the root logger through the queue to the rotating file.
+
+    Safe to call more than once; only the first call has an effect.
+    """
+    global _handler, _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        output = _output_handler()
+        output.setFormatter(TruncatingFormatter(LOG_FORMAT, LOG_MAX_MESSAGE))
+
+        log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+        _handler = DroppingQueueHandler(log_queue)
+        _listener = _BlockingStopListener(log_queue, output)
+        _listener.start()
+
+        root = logging.getLogger()
+        root.handlers = [_handler]
+        root.setLevel(LOG_LEVEL)
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Write the queued records and stop the writer thread."""
+    global _listener
+    with _configure_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def logging_stats() -> Dict[str, int]:
+    """
+    Queue depth and dropped records of the logging queue.
+
+    Returns:
+        dict: ``queued``, ``capacity`` and ``dropped``
+    """
+    if _handler is None:
+        return {"queued": 0, "capacity": LOG_QUEUE_SIZE, "dropped": 0}
+    return {
+        "queued": _handler.queue.qsize(),
+        "capacity": LOG_QUEUE_SIZE,
+        "dropped": _handler.dropped,
+    }
+
+
+def logging_samples() -> List[Tuple[str, str, dict, int]]:
+    """Logging queue gauges for ``/metrics``."""
+    stats = logging_stats()
+    return [
+        ("log_queue_depth", "Log records waiting to be written", {},
+         stats["queued"]),
+        ("log_queue_capacity", "Log records the queue can hold", {},
+         stats["capacity"]),
+        ("log_records_dropped_total", "Log records dropped on a full queue",
+         {}, stats["dropped"]),
+    ]
 
 
 def get_logger(name: str) -> logging.Logger:
     """
-    Configure and return a logger instance.
+    Return a logger; handlers are set up by :func:`configure_logging`.
 
     Args:
         name: Logger name
 
     Returns:
-        logging.Logger: Configured logger instance
+        logging.Logger: Logger instance
     """
-    logging.basicConfig(
-        filename="logs/app.log",
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        level=logging.INFO,
-        encoding='utf-8'
-    )
     return logging.getLogger(name)
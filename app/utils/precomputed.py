@@ -0,0 +1,129 @@
+"""
+Precomputed JSON response bodies.
+
+Analysis results only change with the dataset, so their JSON is encoded
+once with orjson, hashed into a strong ETag and compressed up front; each
+request then only picks the variant the client accepts.
+"""
+
+import gzip
+import hashlib
+from typing import Dict, Optional
+
+import orjson
+from fastapi import Response
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+
+def _accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Parse ``Accept-Encoding`` into ``{coding: q}``."""
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an ``If-None-Match`` header against the current ETag.
+
+    Args:
+        if_none_match: Raw header value, possibly a list of ETags or ``*``
+        etag: Current strong ETag, quoted
+
+    Returns:
+        bool: True if the client's copy is still current
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+class PrecomputedJSON:
+    """
+    A JSON body encoded once, with its ETag and compressed variants.
+
+    Args:
+        data: JSON-serializable value
+        version: Dataset version the body was built from
+    """
+
+    def __init__(self, data, version: str):
+        self.version = version
+        self.body = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        digest = hashlib.blake2b(self.body, digest_size=12).hexdigest()
+        self.etag = f'"{digest}"'
+        self.variants: Dict[str, bytes] = {}
+        if len(self.body) >= MIN_COMPRESS_SIZE:
+            self.variants["gzip"] = gzip.compress(self.body, 9, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(self.body, quality=11)
+
+    def _variant_etag(self, encoding: Optional[str]) -> str:
+        # Each representation needs its own strong ETag
+        return self.etag if encoding is None else (
+            f'{self.etag[:-1]}-{encoding}"'
+        )
+
+    def response(
+        self,
+        if_none_match: Optional[str],
+        accept_encoding: Optional[str],
+        headers: Dict[str, str] = None
+    ) -> Response:
+        """
+        Serve the best variant for the client, or 304 if it is current.
+
+        Args:
+            if_none_match: ``If-None-Match`` request header
+            accept_encoding: ``Accept-Encoding`` request header
+            headers: Extra response headers
+
+        Returns:
+            Response: JSON body, or an empty 304
+        """
+        accepted = _accepted_encodings(accept_encoding)
+        encoding = None
+        for coding in ("br", "gzip"):
+            if coding in self.variants and accepted.get(coding, 0) > 0:
+                encoding = coding
+                break
+
+        headers = dict(headers or {})
+        headers["ETag"] = self._variant_etag(encoding)
+        headers["Vary"] = "Accept-Encoding"
+
+        current = [self._variant_etag(None)] + [
+            self._variant_etag(coding) for coding in self.variants
+        ]
+        if any(etag_matches(if_none_match, etag) for etag in current):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            content = self.variants[encoding]
+        else:
+            content = self.body
+        return Response(
+            content=content, media_type="application/json", headers=headers
+        )
@@ -0,0 +1,128 @@
+"""
+Benchmark of Amazon product field extraction on saved HTML fixtures.
+
+Checks that every fixture in ``benchmarks/fixtures/amazon`` yields the
+fields recorded in ``expected.json`` and times the single-pass parser.
+With ``--browser`` (needs Chrome and chromedriver) each fixture is also
+loaded in a real browser and the single-pass ``execute_script`` strategy
+is timed against the previous one, which waited up to ``--timeout``
+seconds for every field in turn.
+
+Usage:
+    python -m benchmarks.amazon_extraction [--repeat N] [--browser]
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.routes.amazon.extractor import parse_product_html
+
+FIXTURES = Path(__file__).parent / "fixtures" / "amazon"
+
+
+def _sequential_waits(driver, url: str, timeout: float) -> dict:
+    """The extraction used before: one WebDriverWait per field."""
+    from selenium.webdriver.common.by import By  # type: ignore
+    from selenium.webdriver.support.ui import WebDriverWait  # type: ignore
+    from selenium.webdriver.support import (  # type: ignore
+        expected_conditions as EC
+    )
+    from selenium.common.exceptions import (  # type: ignore
+        TimeoutException, NoSuchElementException
+    )
+
+    def first(locator, default):
+        try:
+            element = WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located(locator)
+            )
+            return element.text.strip()
+        except TimeoutException:
+            return default
+
+    driver.get(url)
+    price = first(
+        (By.CSS_SELECTOR, "span.a-price > span.a-offscreen"), None
+    )
+    if price is None:
+        try:
+            price = driver.find_element(
+                By.CSS_SELECTOR, "span#price_inside_buybox"
+            ).text.strip()
+        except NoSuchElementException:
+            price = "Not available"
+    return {
+        "title": first((By.ID, "productTitle"), "Not found"),
+        "price": price,
+        "availability": first((By.ID, "availability"), "Not specified"),
+        "reviews": first(
+            (By.CSS_SELECTOR, "span#acrCustomerReviewText"), "Not available"
+        ),
+    }
+
+
+def bench_parser(fixtures, expected, repeat: int) -> None:
+    print(f"{'fixture':34} {'KiB':>6} {'parse ms':>9}  fields")
+    for path in fixtures:
+        html = path.read_text(encoding="utf-8")
+        result = parse_product_html(html)
+        if result != expected[path.name]:
+            raise SystemExit(f"{path.name}: {result} != expected")
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse_product_html(html)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{path.name:34} {len(html) / 1024:6.1f} "
+            f"{statistics.median(timings) * 1000:9.2f}  ok"
+        )
+
+
+def bench_browser(fixtures, expected, timeout: float) -> None:
+    from app.core.selenium.driver import get_selenium_driver
+    from app.routes.amazon.service import AmazonScraperService
+
+    profile_dir = tempfile.mkdtemp(prefix="chrome-profile-")
+    driver = get_selenium_driver(profile_dir)
+    scraper = AmazonScraperService()
+    try:
+        print(f"\n{'fixture':34} {'sequential s':>12} {'single-pass s':>13}")
+        for path in fixtures:
+            url = path.resolve().as_uri()
+            start = time.perf_counter()
+            _sequential_waits(driver, url, timeout)
+            sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = scraper._scrape_product_data(driver, url)
+            single = time.perf_counter() - start
+            if result != expected[path.name]:
+                raise SystemExit(f"{path.name}: {result} != expected")
+            print(f"{path.name:34} {sequential:12.2f} {single:13.2f}")
+    finally:
+        driver.quit()
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--browser", action="store_true")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    expected = json.loads((FIXTURES / "expected.json").read_text())
+    fixtures = sorted(FIXTURES.glob("*.html"))
+    bench_parser(fixtures, expected, args.repeat)
+    if args.browser:
+        bench_browser(fixtures, expected, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
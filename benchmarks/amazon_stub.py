@@ -0,0 +1,69 @@
+"""
+Local stand-in for Amazon product pages, serving the saved fixtures.
+
+``/dp/<name>`` returns ``fixtures/amazon/<name>.html`` and
+``/dp/status-<code>`` answers with that HTTP status, so the HTTP-first
+fetch and its browser fallback can be exercised offline:
+
+    python -m benchmarks.amazon_stub --port 8081
+    AMAZON_BASE_URL=http://127.0.0.1:8081/dp/ uvicorn app.main:app
+    curl localhost:8000/amazon/product2/product_full
+"""
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.amazon_extraction import FIXTURES
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        name = self.path.split("?")[0].rsplit("/", 1)[-1]
+        if name.startswith("status-"):
+            self._send(int(name.split("-", 1)[1]), b"")
+            return
+        path = FIXTURES / f"{name}.html"
+        if not path.is_file():
+            self._send(404, b"Not found")
+            return
+        self._send(200, path.read_bytes())
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 8081) -> ThreadingHTTPServer:
+    """
+    Create the stub server; call ``serve_forever()`` on it to run.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind, 0 for any free port
+
+    Returns:
+        ThreadingHTTPServer: The bound server
+    """
+    return ThreadingHTTPServer((host, port), FixtureHandler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+    server = serve(args.host, args.port)
+    print(f"Serving {FIXTURES} on http://{args.host}:{args.port}/dp/")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
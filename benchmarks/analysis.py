@@ -0,0 +1,289 @@
+"""
+Benchmark of the analysis layer on synthetic histories of growing size.
+
+For every size a seeded history is generated with
+:mod:`benchmarks.synthetic` and registered as its own game. Loading, the
+service functions and the endpoints (in-process, through the ASGI test
+client) are then timed, and run once more under ``tracemalloc`` to record
+the peak memory and the memory still allocated when the call returns.
+Endpoint caches are cleared before every run, so each request computes
+its response.
+
+Results are compared against ``baselines/analysis.json``; any case slower
+or heavier than the baseline by more than the tolerances is reported and
+the exit status is 1. Baselines are machine-specific: record one with
+``--save`` on the machine that runs the comparison.
+
+Usage:
+    python -m benchmarks.analysis [--sizes 1000,10000,100000] [--save]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from benchmarks.synthetic import generate_draws
+
+BASELINE = Path(__file__).parent / "baselines" / "analysis.json"
+DEFAULT_SIZES = "1000,10000,100000"
+NUMBER = 7
+
+
+def measure(func: Callable, repeat: int, setup: Callable = None) -> dict:
+    """
+    Time ``func`` and trace its memory. An untimed first run absorbs
+    one-off costs such as starting the worker processes.
+
+    Args:
+        func: Case to run
+        repeat: Timed runs; the median is kept
+        setup: Called before every run, outside the measurement
+
+    Returns:
+        dict: ``time_ms``, ``peak_kib``, ``retained_kib`` and
+        ``retained_blocks``
+    """
+    if setup:
+        setup()
+    func()
+
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        base, _ = tracemalloc.get_traced_memory()
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = after.compare_to(before, "filename")
+    del result
+
+    return {
+        "time_ms": round(statistics.median(timings) * 1000, 3),
+        "peak_kib": round((peak - base) / 1024, 1),
+        "retained_kib": round((current - base) / 1024, 1),
+        "retained_blocks": sum(stat.count_diff for stat in retained),
+    }
+
+
+def service_cases(game: str) -> List[Tuple[str, Callable, Callable]]:
+    """Loading steps and service functions, on the loaded dataset."""
+    from app.services import analisys
+    from app.services.data_loader import _leer_csv, _version_archivo
+    from app.services.data_loader import cargar_datos
+    from app.services.grafic import graficBarras
+    from app.services.instantanea import leer_instantanea
+    from app.services.juegos import obtener_juego
+    from app.services.sorteos import Sorteos
+
+    juego = obtener_juego(game)
+    version = _version_archivo(juego)
+    sorteos = cargar_datos(game)
+    months, counts = analisys.serie_mensual(sorteos, NUMBER)
+
+    def fresh():
+        return Sorteos(
+            sorteos.bolas, sorteos.dias, version,
+            numero_maximo=sorteos.numero_maximo
+        )
+
+    cases = [
+        ("load.parse_csv", lambda: _leer_csv(juego, version), None),
+        ("load.open_snapshot",
+         lambda: leer_instantanea(juego.archivo), None),
+        ("load.precalcular", lambda: fresh().precalcular(), None),
+        ("service.calcular_frecuencia",
+         lambda: analisys.calcular_frecuencia(sorteos), None),
+        ("service.obtener_combinaciones_comunes",
+         lambda: analisys.obtener_combinaciones_comunes(sorteos), None),
+        ("service.calcular_probabilidades",
+         lambda: analisys.calcular_probabilidades(sorteos), None),
+    ]
+    for size in (2, 3, 4, 5):
+        cases.append((
+            f"service.obtener_combinaciones_frecuentes[n={size}]",
+            lambda size=size: analisys.obtener_combinaciones_frecuentes(
+                sorteos, size, 10
+            ),
+            None,
+        ))
+    cases.append((
+        "service.graficBarras",
+        lambda: graficBarras(months, counts, str(NUMBER)),
+        None,
+    ))
+    return cases
+
+
+def endpoint_cases(
+    client, game: str
+) -> List[Tuple[str, Callable, Callable]]:
+    """Endpoint requests, with the response caches cleared before each."""
+    from app.routes.endpoints import json_cache
+    from app.services.grafic import cache_graficos
+
+    def clear():
+        json_cache.clear()
+        cache_graficos.clear()
+
+    def get(url):
+        separator = "&" if "?" in url else "?"
+
+        def call():
+            response = client.get(f"{url}{separator}game={game}")
+            if response.status_code != 200:
+                raise SystemExit(f"{url}: HTTP {response.status_code}")
+            return response.content
+        return call
+
+    urls = [
+        "/api/frequency",
+        f"/api/frequency/number?num={NUMBER}",
+        "/api/common-combinations",
+        "/api/probabilities",
+        "/api/frequent-combinations?n=3",
+        "/api/frequent-combinations?n=5",
+        "/api/frequent-combinations?n=3&last_n_draws=500",
+        f"/api/co-occurrence?numbers={NUMBER}&numbers={NUMBER + 1}",
+        f"/api/bar-chart?num={NUMBER}",
+    ]
+    return [(f"endpoint.GET {url}", get(url), clear) for url in urls]
+
+
+def run(sizes: List[int], repeat: int, data_dir: str) -> Dict[str, dict]:
+    """Generate each history, register it and measure every case."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.juegos import JUEGOS, Juego
+
+    client = TestClient(app)
+    results = {}
+    for size in sizes:
+        path = os.path.join(data_dir, f"synthetic-{size}.csv")
+        if not os.path.exists(path):
+            generate_draws(path, size)
+        game = f"synthetic-{size}"
+        JUEGOS[game] = Juego(game, path)
+
+        cases = service_cases(game) + endpoint_cases(client, game)
+        results[str(size)] = {}
+        for name, func, setup in cases:
+            stats = measure(func, repeat, setup)
+            results[str(size)][name] = stats
+            print(
+                f"{size:>8} {name:58} {stats['time_ms']:10.2f} ms "
+                f"{stats['peak_kib']:10.0f} KiB"
+            )
+    return results
+
+
+def compare(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    time_tolerance: float,
+    memory_tolerance: float,
+) -> List[str]:
+    """
+    List the cases slower or heavier than the baseline.
+
+    Cases under a millisecond or 64 KiB are only compared above those
+    floors, so timer and allocator noise do not show up as regressions.
+    """
+    regressions = []
+    for size, cases in results.items():
+        for name, stats in cases.items():
+            old = baseline.get(size, {}).get(name)
+            if old is None:
+                continue
+            checks = (
+                ("time_ms", time_tolerance, 1.0),
+                ("peak_kib", memory_tolerance, 64.0),
+            )
+            for metric, tolerance, floor in checks:
+                limit = max(old[metric], floor) * (1 + tolerance)
+                if stats[metric] > limit:
+                    regressions.append(
+                        f"{size} {name}: {metric} {old[metric]} -> "
+                        f"{stats[metric]}"
+                    )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true",
+                        help="write the results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.5)
+    parser.add_argument("--memory-tolerance", type=float, default=0.2)
+    parser.add_argument("--data-dir",
+                        help="keep the generated CSVs in this directory")
+    args = parser.parse_args()
+
+    # The API logs to logs/app.log relative to the working directory
+    os.makedirs("logs", exist_ok=True)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="draws-")
+    os.makedirs(data_dir, exist_ok=True)
+    try:
+        results = run(sizes, args.repeat, data_dir)
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save")
+        return
+    baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = compare(
+        results, baseline, args.time_tolerance, args.memory_tolerance
+    )
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        raise SystemExit(1)
+    print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Local stand-in for the Odoo XML-RPC API, enough to run the draw sync.
+
+It answers ``authenticate`` on ``/xmlrpc/2/common`` and, on
+``/xmlrpc/2/object``, ``execute_kw`` with ``fields_get`` and
+``search_read`` (domains in prefix notation with ``&``, ``|`` and ``!``,
+``order``, ``offset``, ``limit`` and ``fields``) over in-memory
+``lottery.baloto`` and ``lottery.baloto.type`` records. Every
+``search_read`` is logged, so checks can count pages and returned rows:
+
+    python -m benchmarks.odoo_stub --port 8069 --records 2000
+    ODOO_URL=http://127.0.0.1:8069 DB_NAME=stub ODOO_USER=admin \\
+        ODOO_PASSWORD=admin uvicorn app.main:app
+"""
+
+import argparse
+import operator
+import threading
+from datetime import datetime, timedelta
+from socketserver import ThreadingMixIn
+from typing import Callable, Dict, List, Optional
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+LOTTERY_TYPE = "MiLoto"
+START = datetime(2024, 1, 1)
+
+BALOTO_FIELDS = {
+    "id": "integer",
+    "name": "char",
+    "lottery_type_id": "many2one",
+    "draw_date": "date",
+    "number_1": "integer",
+    "number_2": "integer",
+    "number_3": "integer",
+    "number_4": "integer",
+    "number_5": "integer",
+    "ticket_image": "binary",
+    "prize_ids": "one2many",
+    "write_date": "datetime",
+}
+
+OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda value, options: value in options,
+}
+
+
+def matches(domain: list, record: dict) -> bool:
+    """Evaluate an Odoo domain in prefix notation against a record."""
+    stack = []
+    for term in reversed(domain):
+        if term == "!":
+            stack.append(not stack.pop())
+        elif term in ("&", "|"):
+            first, second = stack.pop(), stack.pop()
+            stack.append(
+                first and second if term == "&" else first or second
+            )
+        else:
+            field, op, value = term
+            stack.append(OPERATORS[op](record.get(field), value))
+    # Terms left side by side are joined with an implicit AND
+    return all(stack)
+
+
+class OdooStub:
+    """
+    In-memory Odoo database.
+
+    Attributes:
+        records: ``lottery.baloto`` records by id
+        searches: ``(model, domain, returned ids)`` of every search_read
+        before_search: Called with the domain before each
+            ``lottery.baloto`` search_read; it may edit records or raise
+    """
+
+    def __init__(self):
+        self.records: Dict[int, dict] = {}
+        self.types = {1: {"id": 1, "name": LOTTERY_TYPE}}
+        self.searches: List[tuple] = []
+        self.before_search: Optional[Callable[[list], None]] = None
+        self._clock = START
+        self._lock = threading.Lock()
+
+    def _tick(self) -> str:
+        self._clock += timedelta(seconds=1)
+        return self._clock.strftime("%Y-%m-%d %H:%M:%S")
+
+    def add(self, count: int, same_write_date: bool = False) -> List[int]:
+        """
+        Create ``count`` draws; with ``same_write_date`` they share one
+        timestamp, as records written in one transaction do.
+        """
+        with self._lock:
+            stamp = self._tick()
+            ids = []
+            for _ in range(count):
+                record_id = len(self.records) + 1
+                day = START.date() + timedelta(days=record_id)
+                self.records[record_id] = {
+                    "id": record_id,
+                    "name": f"Draw {record_id}",
+                    "lottery_type_id": 1,
+                    "draw_date": day.isoformat(),
+                    **{
+                        f"number_{i}": (record_id * 7 + i * 5) % 39 + 1
+                        for i in range(1, 6)
+                    },
+                    "ticket_image": "aW1hZ2U=",
+                    "prize_ids": [],
+                    "write_date": stamp if same_write_date else self._tick(),
+                }
+                ids.append(record_id)
+            return ids
+
+    def edit(self, record_id: int, **values) -> None:
+        """Change a record and move its ``write_date`` to now."""
+        with self._lock:
+            self.records[record_id].update(values, write_date=self._tick())
+
+    def authenticate(self, db, login, password, context):
+        return 2 if password else False
+
+    def execute_kw(self, db, uid, password, model, method, args,
+                   kwargs=None):
+        kwargs = kwargs or {}
+        if method == "fields_get":
+            fields = BALOTO_FIELDS if model == "lottery.baloto" else {}
+            return {name: {"type": kind} for name, kind in fields.items()}
+        if method == "search_read":
+            return self._search_read(model, args[0], **kwargs)
+        raise ValueError(f"Unsupported method {method}")
+
+    def _search_read(self, model, domain, fields=None, offset=0, limit=None,
+                     order=None):
+        if model == "lottery.baloto" and self.before_search:
+            self.before_search(domain)
+        with self._lock:
+            table = self.records if model == "lottery.baloto" else self.types
+            rows = [
+                dict(row) for row in table.values() if matches(domain, row)
+            ]
+        for part in reversed((order or "id").split(",")):
+            name, *direction = part.split()
+            rows.sort(
+                key=lambda row: row[name],
+                reverse=direction == ["desc"]
+            )
+        rows = rows[offset:offset + limit if limit else None]
+        if fields:
+            rows = [
+                {name: row[name] for name in fields if name in row}
+                for row in rows
+            ]
+        self.searches.append((model, domain, [row["id"] for row in rows]))
+        return rows
+
+
+class _Handler(SimpleXMLRPCRequestHandler):
+    protocol_version = "HTTP/1.1"
+    rpc_paths = ("/xmlrpc/2/common", "/xmlrpc/2/object")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+
+def serve(stub: OdooStub, host: str = "127.0.0.1",
+          port: int = 8069) -> SimpleXMLRPCServer:
+    """
+    Create the stub server; call ``serve_forever()`` on it to run.
+
+    Args:
+        stub: Database the server answers from
+        host: Interface to bind
+        port: Port to bind, 0 for any free port
+
+    Returns:
+        SimpleXMLRPCServer: The bound server
+    """
+    server = _Server(
+        (host, port), requestHandler=_Handler, allow_none=True,
+        logRequests=False
+    )
+    server.register_instance(stub)
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8069)
+    parser.add_argument("--records", type=int, default=1000)
+    args = parser.parse_args()
+    stub = OdooStub()
+    stub.add(args.records)
+    server = serve(stub, args.host, args.port)
+    print(f"Serving {args.records} draws on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Check of the Odoo draw sync against the local XML-RPC stand-in.
+
+Each scenario runs ``sincronizar_odoo`` against a fresh
+:mod:`benchmarks.odoo_stub` database and a temporary local store, and
+checks:
+
+- paging: every record arrives, in pages of ``ODOO_PAGE_SIZE``, including
+  pages that split records sharing one ``write_date``;
+- resume: a sync that fails halfway keeps the pages already stored, and
+  the next one continues after them without downloading them again;
+- edits during a sync: a record changed while the sync runs is still
+  fetched, and the records after it are not skipped;
+- incremental syncs: only new or changed records are downloaded;
+- field selection: binary and relation fields are left out, or only
+  ``ODOO_FIELDS`` are requested when it is set.
+
+Usage:
+    python -m benchmarks.odoo_sync_check
+"""
+
+import os
+import tempfile
+import threading
+import traceback
+import xmlrpc.client
+
+PAGE_SIZE = 10
+
+
+def _setup_environment(directory: str) -> None:
+    """Settings read by ``app.config``; must run before importing app."""
+    os.environ.update({
+        "ODOO_URL": "http://127.0.0.1:1",
+        "DB_NAME": "stub",
+        "ODOO_USER": "admin",
+        "ODOO_PASSWORD": "admin",
+        "ODOO_PAGE_SIZE": str(PAGE_SIZE),
+        "ODOO_SYNC_INTERVAL": "0",
+        "ODOO_FIELDS": "",
+        "ODOO_DRAW_DATE_FIELD": "",
+        "ODOO_NUMBER_FIELDS": "",
+        "ODOO_STORE_PATH": os.path.join(directory, "unused.sqlite"),
+        "LOG_FILE": "",
+        "LOG_LEVEL": "WARNING",
+    })
+
+
+class Scenario:
+    """A stub server, a client pointed at it and an empty store."""
+
+    def __init__(self, directory: str, name: str):
+        from app.core.odoo.client import OdooClient
+        from app.services import odoo_sync
+        from benchmarks.odoo_stub import OdooStub, serve
+
+        self.stub = OdooStub()
+        self.server = serve(self.stub, port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.client = OdooClient(url=f"http://{host}:{port}")
+        self.store = os.path.join(directory, f"{name}.sqlite")
+        odoo_sync.ODOO_STORE_PATH = self.store
+
+    def sync(self) -> int:
+        from app.services.odoo_sync import sincronizar_odoo
+        return sincronizar_odoo(self.client, forzar=True)
+
+    def pages(self) -> list:
+        """Ids returned by each lottery.baloto search_read, then reset."""
+        pages = [
+            ids for model, _, ids in self.stub.searches
+            if model == "lottery.baloto"
+        ]
+        self.stub.searches.clear()
+        return pages
+
+    def stored(self) -> dict:
+        from app.services.odoo_sync import leer_registros
+        return {record["id"]: record for record in leer_registros()}
+
+    def close(self) -> None:
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def check_paging(scenario: Scenario) -> None:
+    scenario.stub.add(12)
+    scenario.stub.add(6, same_write_date=True)
+    scenario.stub.add(7)
+    assert scenario.sync() == 25
+    pages = scenario.pages()
+    assert [len(page) for page in pages] == [10, 10, 5], pages
+    assert sorted(sum(pages, [])) == list(range(1, 26))
+    assert sorted(scenario.stored()) == list(range(1, 26))
+
+
+def check_resume(scenario: Scenario) -> None:
+    scenario.stub.add(25)
+    calls = []
+
+    def fail_on_second_page(domain):
+        calls.append(domain)
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+
+    scenario.stub.before_search = fail_on_second_page
+    try:
+        scenario.sync()
+    except xmlrpc.client.Fault:
+        pass
+    else:
+        raise AssertionError("the interrupted sync did not fail")
+    assert sorted(scenario.stored()) == list(range(1, 11))
+
+    scenario.stub.before_search = None
+    scenario.pages()
+    assert scenario.sync() == 15
+    assert sorted(sum(scenario.pages(), [])) == list(range(11, 26))
+    assert sorted(scenario.stored()) == list(range(1, 26))
+
+
+def check_edit_during_sync(scenario: Scenario) -> None:
+    scenario.stub.add(30)
+    calls = []
+
+    def edit_after_first_page(domain):
+        # Record 5 was already read; moving it to the end used to shift
+        # record 11 back into the first page and skip it
+        calls.append(domain)
+        if len(calls) == 2:
+            scenario.stub.edit(5, number_1=39)
+
+    scenario.stub.before_search = edit_after_first_page
+    scenario.sync()
+    scenario.stub.before_search = None
+    stored = scenario.stored()
+    assert sorted(stored) == list(range(1, 31)), sorted(stored)
+    assert stored[5]["number_1"] == 39
+
+
+def check_incremental(scenario: Scenario) -> None:
+    scenario.stub.add(15)
+    scenario.sync()
+    scenario.pages()
+
+    assert scenario.sync() == 0
+    assert scenario.pages() == [[]]
+
+    scenario.stub.edit(3, number_2=1)
+    scenario.stub.add(2)
+    assert scenario.sync() == 3
+    assert scenario.pages() == [[3, 16, 17]]
+    assert scenario.stored()[3]["number_2"] == 1
+
+
+def check_fields(scenario: Scenario) -> None:
+    from app.services import odoo_sync
+
+    scenario.stub.add(3)
+    scenario.sync()
+    record = scenario.stored()[1]
+    assert "ticket_image" not in record and "prize_ids" not in record
+    assert {"draw_date", "number_5", "write_date"} <= set(record)
+
+    scenario.stub.edit(2)
+    odoo_sync.ODOO_FIELDS = ["draw_date", "number_1"]
+    try:
+        scenario.sync()
+    finally:
+        odoo_sync.ODOO_FIELDS = []
+    assert set(scenario.stored()[2]) == {
+        "id", "write_date", "draw_date", "number_1"
+    }
+
+
+CHECKS = [
+    ("paging", check_paging),
+    ("resume after a failed page", check_resume),
+    ("edit during a sync", check_edit_during_sync),
+    ("incremental sync", check_incremental),
+    ("field selection", check_fields),
+]
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory(prefix="odoo-sync-") as directory:
+        _setup_environment(directory)
+        failures = 0
+        for name, check in CHECKS:
+            scenario = Scenario(directory, name.replace(" ", "-"))
+            try:
+                check(scenario)
+                print(f"ok      {name}")
+            except AssertionError as error:
+                failures += 1
+                line = traceback.extract_tb(error.__traceback__)[-1].lineno
+                print(f"FAILED  {name} (line {line}) {error}")
+            finally:
+                scenario.close()
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Seeded generator of synthetic draw histories shaped like ``Miloto.csv``.
+
+Each draw has ``--balls`` distinct numbers in random order, a
+``MM/DD/YYYY`` date and an ``Is Winner`` flag, so the files load through
+the same parser as the real dataset. Draws are one per day while they fit
+in ``MAX_SPAN_DAYS``; longer histories put several draws on the same day
+to stay inside the dates pandas can parse.
+
+Usage:
+    python -m benchmarks.synthetic --draws 100000 --out /tmp/draws.csv
+"""
+
+import argparse
+from datetime import date
+
+import numpy as np
+
+START = date(2000, 1, 1)
+# About a century of daily draws
+MAX_SPAN_DAYS = 36500
+# Draws generated per block, to bound memory on large histories
+BLOCK = 100_000
+
+
+def random_draws(
+    rng: np.random.Generator, count: int, balls: int, max_number: int
+) -> np.ndarray:
+    """
+    Draw ``count`` rows of ``balls`` distinct numbers in ``1..max_number``.
+
+    Returns:
+        np.ndarray: ``(count, balls)`` matrix of numbers, unsorted
+    """
+    keys = rng.random((count, max_number))
+    return np.argpartition(keys, balls - 1, axis=1)[:, :balls] + 1
+
+
+def generate_draws(
+    path: str,
+    draws: int,
+    seed: int = 0,
+    balls: int = 5,
+    max_number: int = 39,
+    winner_rate: float = 0.02,
+) -> None:
+    """
+    Write a synthetic draw history.
+
+    Args:
+        path: CSV file to write
+        draws: Number of draws
+        seed: Seed of the random generator; equal seeds give equal files
+        balls: Numbers per draw
+        max_number: Highest number that can be drawn
+        winner_rate: Share of draws flagged ``Is Winner = Yes``
+    """
+    rng = np.random.default_rng(seed)
+    span = min(draws, MAX_SPAN_DAYS)
+    header = ["Draw Date"] + [f"Ball {i}" for i in range(1, balls + 1)]
+    header.append("Is Winner")
+
+    # Only the distinct days need formatting
+    days = np.datetime64(START) + np.arange(span)
+    labels = np.array([
+        day.strftime("%m/%d/%Y") for day in days.astype(date)
+    ])
+
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        out.write(",".join(header) + "\n")
+        for start in range(0, draws, BLOCK):
+            count = min(BLOCK, draws - start)
+            positions = np.arange(start, start + count, dtype=np.int64)
+            day_index = positions * span // draws
+            numbers = random_draws(rng, count, balls, max_number)
+            winners = np.where(
+                rng.random(count) < winner_rate, "Yes", "No"
+            )
+            columns = [labels[day_index]]
+            columns += [numbers[:, i].astype(str) for i in range(balls)]
+            columns.append(winners)
+            rows = columns[0]
+            for column in columns[1:]:
+                rows = np.char.add(np.char.add(rows, ","), column)
+            out.write("\n".join(rows.tolist()) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--draws", type=int, required=True)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--balls", type=int, default=5)
+    parser.add_argument("--max-number", type=int, default=39)
+    args = parser.parse_args()
+    generate_draws(
+        args.out, args.draws, args.seed, args.balls, args.max_number
+    )
+    print(f"Wrote {args.draws} draws to {args.out}")
+
+
+if __name__ == "__main__":
+    main()